@@ -86,8 +86,8 @@ const EmployerDashboard = () => {
     queryFn: async () => {
       const map = {};
       for (const gigId of postedGigsIds) {
-        const applicants = await getApplications({ token, gigId });
-        map[gigId] = Array.isArray(applicants) ? applicants : [];
+        const data = await getApplications({ token, gigId });
+        map[gigId] = Array.isArray(data?.applicants) ? data.applicants : [];
       }
       return map;
     },
@@ -1,7 +1,35 @@
 export const API_URL = import.meta.env.VITE_FLASK_SERVER_URL;
 
 // Options: method, headers, body
-export async function apiFetch(endpoint, { token, ...options } = {}) {
+export async function apiFetch(endpoint, options = {}) {
+  const { data } = await request(endpoint, options);
+  return data;
+}
+
+// Like apiFetch, for list endpoints that page with a keyset cursor: also returns
+// the cursor for the next page (X-Next-Cursor), or null on the last page.
+export async function apiFetchPage(endpoint, options = {}) {
+  const { data, response } = await request(endpoint, options);
+  return { data, nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
+// Calls apiFetchPage with `cursor` set until a page comes back without one.
+// `collect(data)` returns the rows of one page; all pages' rows are returned
+// along with the first page's data.
+export async function apiFetchAllPages(endpoint, { collect = (data) => data, ...options } = {}) {
+  const url = new URL(endpoint, "http://placeholder");
+  let page = await apiFetchPage(`${url.pathname}${url.search}`, options);
+  const first = page.data;
+  const rows = [...(collect(first) ?? [])];
+  while (page.nextCursor) {
+    url.searchParams.set("cursor", page.nextCursor);
+    page = await apiFetchPage(`${url.pathname}${url.search}`, options);
+    rows.push(...(collect(page.data) ?? []));
+  }
+  return { first, rows };
+}
+
+async function request(endpoint, { token, ...options } = {}) {
   const safeEndpoint = endpoint.startsWith("/") ? endpoint : `/${endpoint}`;
 
   const headers = new Headers(options.headers ?? {});
@@ -13,7 +41,9 @@ export async function apiFetch(endpoint, { token, ...options } = {}) {
     headers.set("Authorization", `Bearer ${token}`);
   }
 
+  // credentials: the backend's read-after-write cookie (db_sticky) must come back.
   const response = await fetch(`${API_URL}${safeEndpoint}`, {
+    credentials: "include",
     ...options,
     headers,
   });
@@ -27,5 +57,5 @@ export async function apiFetch(endpoint, { token, ...options } = {}) {
     throw new Error("Network response was not ok");
   }
 
-  return data;
+  return { data, response };
 }
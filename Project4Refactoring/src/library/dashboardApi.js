@@ -1,4 +1,4 @@
-import { apiFetch } from "./api";
+import { apiFetch, apiFetchAllPages } from "./api";
 
 // 1. USER FUNCTION ROUTES
 export async function registerNewUser(details) {
@@ -31,6 +31,25 @@ export async function getUserProfile(token) {
   return data;
 }
 
+// All lookup lists (roles, skills, event_types, member_types, application_status)
+// plus a `version` that changes whenever any of them does.
+export async function getMeta() {
+  const data = await apiFetch("/meta", {
+    method: "GET",
+  });
+  return data;
+}
+
+// Everything needed to route to a dashboard after login, in one request:
+// { user, roles, skills, media, employers }
+export async function getBootstrap({ token }) {
+  const data = await apiFetch("/users/me/bootstrap", {
+    method: "GET",
+    token,
+  });
+  return data;
+}
+
 // Employer-facing (read-only) user profile for viewing applicants.
 // Backend must enforce that only authorized employers can view this.
 export async function getUserPublicProfile({ token, userId }) {
@@ -44,6 +63,19 @@ export async function getUserPublicProfile({ token, userId }) {
   );
   return data;
 }
+// Employer-facing profiles for many applicants at once, keyed by user_id.
+// Users the employer isn't allowed to see are left out of the result.
+export async function getUserPublicProfiles({ token, userIds }) {
+  if (!userIds?.length) return {};
+  const data = await apiFetch(
+    `/users/public?ids=${encodeURIComponent(userIds.join(","))}`,
+    {
+      method: "GET",
+      token,
+    },
+  );
+  return data;
+}
 // Optional: refresh access token (requires refresh token)
 export async function refreshAccessToken(refreshToken) {
   const data = await apiFetch("/users/refresh", {
@@ -164,8 +196,14 @@ export async function createGig({ token, ...details }) {
   return data;
 }
 
+// Largest page GET /gigs/ and GET /applications/?gig_id= will return.
+const MAX_PAGE_SIZE = 200;
+
 /**
  * Filters supported by backend (all optional): employer_id, type_name, posted_by_user_id
+ *
+ * The backend returns one page at a time; this follows X-Next-Cursor and returns
+ * every matching gig, newest first, since the dashboards filter the full list.
  */
 export async function getGigs({
   token,
@@ -173,20 +211,17 @@ export async function getGigs({
   typeName,
   postedByUserId,
 } = {}) {
-  const params = new URLSearchParams();
+  const params = new URLSearchParams({ limit: String(MAX_PAGE_SIZE) });
   if (employerId != null) params.set("employer_id", String(employerId));
   if (typeName != null) params.set("type_name", String(typeName));
   if (postedByUserId != null)
     params.set("posted_by_user_id", String(postedByUserId));
 
-  const qs = params.toString();
-  const endpoint = qs ? `/gigs/?${qs}` : "/gigs/";
-
-  const data = await apiFetch(endpoint, {
+  const { rows } = await apiFetchAllPages(`/gigs/?${params}`, {
     method: "GET",
     token,
   });
-  return data;
+  return rows;
 }
 
 export async function getPostedGigs({ token }) {
@@ -261,19 +296,29 @@ export async function createApplication({ token, gigId }) {
 }
 
 /**
- * If gigId is provided, backend treats it as employer view for that gig (must be posted_by current user).
+ * If gigId is provided, backend treats it as employer view for that gig (must be posted_by current user)
+ * and returns { gig, counts, applicants }; the applicants are paged, so every page is
+ * fetched and the result has all of them.
  * If omitted, backend returns the logged-in user's applications.
  */
 export async function getApplications({ token, gigId } = {}) {
-  const endpoint =
-    gigId != null
-      ? `/applications/?gig_id=${encodeURIComponent(String(gigId))}`
-      : "/applications/";
-  const data = await apiFetch(endpoint, {
+  if (gigId == null) {
+    return apiFetch("/applications/", {
+      method: "GET",
+      token,
+    });
+  }
+
+  const params = new URLSearchParams({
+    gig_id: String(gigId),
+    limit: String(MAX_PAGE_SIZE),
+  });
+  const { first, rows } = await apiFetchAllPages(`/applications/?${params}`, {
     method: "GET",
     token,
+    collect: (data) => data?.applicants,
   });
-  return data;
+  return { ...first, applicants: rows };
 }
 
 export async function getUserApplications({ token }) {
@@ -0,0 +1,113 @@
+"""Response encoding: Flask's default JSON provider vs the orjson provider.
+
+Builds synthetic payloads shaped like the real responses (RealDictRows with dates,
+timestamptz values and Decimals) for the big list endpoints and times building
+the Flask response for each with both providers. No database is needed.
+
+  python benchmarks/json_encoding.py
+  python benchmarks/json_encoding.py --rows 1000
+
+Run from the "PyCharm Flask" directory.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resources.json_provider import OrjsonProvider  # noqa: E402
+
+SGT = timezone(timedelta(hours=8))
+STATUSES = ["applied", "shortlisted", "accepted", "rejected"]
+
+
+def row(**values):
+    r = RealDictRow()
+    r.update(values)
+    return r
+
+
+def timestamp(rng):
+    return datetime(2026, 1, 1, tzinfo=SGT) + timedelta(seconds=rng.randrange(300 * 86400),
+                                                        microseconds=rng.randrange(10 ** 6))
+
+
+def payloads(n, rng):
+    gigs = [
+        row(gig_id=i, gig_name=f"Gig {i}", gig_date=date(2026, 1, 1) + timedelta(days=rng.randrange(365)),
+            gig_details="Rehearsal on the Friday before, two sets on the night. " * 3,
+            created_at=timestamp(rng), type_name="Concert", employer_id=rng.randrange(1, 50),
+            posted_by_user_id=rng.randrange(1, 500))
+        for i in range(n)
+    ]
+    feed = [
+        row(**g, roles=[{"role_name": role, "needed_count": 2, "pay_amount": "150.00",
+                         "pay_currency": "SGD", "pay_unit": "per_gig"} for role in ("Dancer", "Choreographer")],
+            my_application=None if i % 3 else {"application_id": i, "status": "applied"})
+        for i, g in enumerate(gigs)
+    ]
+    gig_roles = [
+        row(gig_id=i // 3, role_name=f"Role {i % 3}", needed_count=rng.randrange(1, 10),
+            pay_amount=Decimal(rng.randrange(5000, 50000)) / 100, pay_currency="SGD", pay_unit="per_gig")
+        for i in range(n)
+    ]
+    employers = [
+        row(employer_id=i, employer_name=f"Studio {i}", description="Contemporary dance company. " * 4,
+            website=f"https://studio{i}.example.com", email=f"hello@studio{i}.example.com",
+            phone="+65 6123 4567", created_at=timestamp(rng))
+        for i in range(n)
+    ]
+    applicants = {
+        "gig": {"gig_id": 1, "gig_name": "Gig 1", "gig_date": date(2026, 7, 1), "type_name": "Concert",
+                "gig_details": "Two sets."},
+        "counts": {"applied": n, "shortlisted": 0, "accepted": 0, "rejected": 0, "total": n},
+        "applicants": [
+            {"application_id": i, "user_id": i, "gig_id": 1, "status": rng.choice(STATUSES),
+             "applied_at": timestamp(rng), "applicant_name": f"Dancer {i}",
+             "applicant_email": f"dancer{i}@example.com"}
+            for i in range(n)
+        ],
+    }
+    return {
+        "GET /gigs/": gigs,
+        "GET /gigs/feed": feed,
+        "GET /gigs-roles/": gig_roles,
+        "GET /employers/": employers,
+        "GET /gigs/<id>/applicants": applicants,
+    }
+
+
+def timed(app, payload, number):
+    with app.app_context():
+        return min(timeit.repeat(lambda: app.json.response(payload), number=number, repeat=5)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200, help="rows per list payload")
+    parser.add_argument("--number", type=int, default=50, help="responses per timing run")
+    args = parser.parse_args()
+
+    default_app = Flask(__name__)
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask(__name__)
+    fast_app.json = OrjsonProvider(fast_app)
+
+    print(f"rows={args.rows}")
+    print(f"{'endpoint':<28}{'default':>10}{'orjson':>10}{'speedup':>10}   (ms per response)")
+    for label, payload in payloads(args.rows, random.Random(42)).items():
+        slow = timed(default_app, payload, args.number)
+        fast = timed(fast_app, payload, args.number)
+        print(f"{label:<28}{slow:>10.3f}{fast:>10.3f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
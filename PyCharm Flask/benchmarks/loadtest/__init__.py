@@ -0,0 +1,23 @@
+"""Load test: a local Postgres, synthetic data, and realistic traffic against the app.
+
+Run from the "PyCharm Flask" directory:
+
+  python -m benchmarks.loadtest up                # start Postgres, build the schema
+  python -m benchmarks.loadtest load --scale 2    # 4,000 users, 2,000 gigs, ...
+  python -m benchmarks.loadtest run --mix mixed --clients 16 --duration 60 \\
+      --save baseline.json
+  # ...change something...
+  python -m benchmarks.loadtest run --baseline baseline.json --save after.json
+  python -m benchmarks.loadtest compare baseline.json after.json
+  python -m benchmarks.loadtest down
+
+`run` starts the app with `flask run` on the benchmark database unless `--url`
+points at one that's already up, or `--app-cmd` gives another command (e.g.
+gunicorn). Settings such as DB_POOL_MAX or BCRYPT_WORKERS are passed through
+from the environment. `run --baseline` and `compare` exit with status 1 when
+an endpoint regressed (see report.compare).
+
+Clients run in this process, so give the load generator its own cores when the
+numbers matter; `--clients` beyond what it can drive shows up as client-side
+latency.
+"""
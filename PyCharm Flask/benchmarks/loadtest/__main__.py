@@ -0,0 +1,193 @@
+import argparse
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from benchmarks import loadtest
+from benchmarks.loadtest import dataset, postgres, report, traffic
+from benchmarks.loadtest.postgres import ROOT, Target
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_app(target, port, app_cmd=None):
+    env = {
+        **os.environ,
+        **target.app_env(),
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY") or "load-test-secret-key-not-for-production",
+        # Keep a replica from .env out of the measurement unless one was asked for.
+        "DB_REPLICA_HOST": os.getenv("DB_REPLICA_HOST", ""),
+    }
+    if app_cmd:
+        command = shlex.split(app_cmd.format(port=port))
+    else:
+        command = [sys.executable, "-m", "flask", "--app", "main", "run", "--port", str(port),
+                   "--with-threads", "--no-reload", "--no-debugger"]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            if requests.get(f"{base_url}/meta", timeout=1).status_code == 200:
+                return server, base_url
+        except requests.RequestException:
+            pass
+        if server.poll() is not None or time.monotonic() > deadline:
+            server.terminate()
+            raise SystemExit(f"app didn't come up on port {port}: {' '.join(command)}")
+        time.sleep(0.2)
+
+
+def cmd_up(args):
+    target = _target(args)
+    postgres.start(target, args.engine)
+    postgres.create_schema(target)
+    print(f"schema ready in {target.dbname} on {target.host}:{target.port}")
+
+
+def cmd_down(args):
+    postgres.stop(args.engine)
+
+
+def cmd_load(args):
+    started = time.perf_counter()
+    manifest = dataset.load(_target(args), scale=args.scale, seed=args.seed)
+    print(
+        f"loaded {manifest['users']} users, {manifest['employers']} employers, {manifest['gigs']} gigs, "
+        f"{manifest['applications']} applications in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def cmd_run(args):
+    try:
+        mix = traffic.parse_mix(args.mix)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    manifest = dataset.read_manifest(args.manifest)
+    target = _target(args)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_app(target, args.port, args.app_cmd)
+    try:
+        recorder, elapsed = traffic.run(
+            base_url, manifest, mix, clients=args.clients, duration=args.duration,
+            warmup=args.warmup, think=args.think, seed=args.seed,
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    result = report.summarize(recorder, elapsed, meta={
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "mix": mix,
+        "clients": args.clients,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "think": args.think,
+        "dataset": {key: manifest[key] for key in ("scale", "seed", "users", "employers", "gigs", "applications")},
+        "app": args.url or args.app_cmd or "flask run --with-threads",
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    })
+    print(report.format_table(result))
+    if args.save:
+        report.save(result, args.save)
+        print(f"saved {args.save}")
+    if args.baseline:
+        return _compare(report.read(args.baseline), result, args)
+    return 0
+
+
+def cmd_compare(args):
+    return _compare(report.read(args.baseline), report.read(args.current), args)
+
+
+def _compare(baseline, current, args):
+    if baseline["meta"].get("mix") != current["meta"].get("mix") or \
+            baseline["meta"].get("dataset") != current["meta"].get("dataset"):
+        print("warning: the runs used different mixes or datasets", file=sys.stderr)
+    rows, regressions = report.compare(baseline, current, threshold=args.threshold, min_ms=args.min_ms)
+    print(report.format_comparison(rows))
+    if regressions:
+        print("\nregressions:\n  " + "\n  ".join(regressions))
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+def _target(args):
+    return Target(args.host, args.port_db, args.user, args.password, args.dbname)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadtest", description=loadtest.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    database = argparse.ArgumentParser(add_help=False)
+    database.add_argument("--host", default="127.0.0.1")
+    database.add_argument("--port-db", type=int, default=54329, help="Postgres port")
+    database.add_argument("--user", default="postgres")
+    database.add_argument("--password", default="")
+    database.add_argument("--dbname", default="dancecentral_bench")
+    engine = argparse.ArgumentParser(add_help=False)
+    engine.add_argument("--engine", choices=["pg_ctl", "docker"], default="pg_ctl")
+    thresholds = argparse.ArgumentParser(add_help=False)
+    thresholds.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    thresholds.add_argument("--min-ms", type=float, default=2.0, help="ignore latency changes smaller than this")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("up", parents=[database, engine], help="start Postgres and create the schema").set_defaults(
+        func=cmd_up)
+    sub.add_parser("down", parents=[engine], help="stop Postgres").set_defaults(func=cmd_down)
+
+    load = sub.add_parser("load", parents=[database], help="replace the data with a synthetic dataset")
+    load.add_argument("--scale", type=float, default=1.0)
+    load.add_argument("--seed", type=int, default=42)
+    load.set_defaults(func=cmd_load)
+
+    run = sub.add_parser("run", parents=[database, thresholds], help="drive traffic and report")
+    run.add_argument("--mix", default="mixed",
+                     help=f"one of {', '.join(traffic.MIXES)}, or weights like dashboard=70,login=30")
+    run.add_argument("--clients", type=int, default=16)
+    run.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    run.add_argument("--warmup", type=float, default=5.0, help="seconds of traffic before measuring")
+    run.add_argument("--think", type=float, default=0.0, help="mean seconds a client pauses between actions")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--url", help="an app that's already running; otherwise one is started")
+    run.add_argument("--app-cmd", help="command to start the app, with {port}, e.g. "
+                                       "'gunicorn -w 4 -b 127.0.0.1:{port} main:app'")
+    run.add_argument("--port", type=int, default=5098, help="port for the app started by run")
+    run.add_argument("--manifest", default=dataset.MANIFEST)
+    run.add_argument("--save", help="write the results here as JSON")
+    run.add_argument("--baseline", help="compare against this saved result")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", parents=[thresholds], help="compare two saved results")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Synthetic data for the load test, at a chosen scale.
+
+Scale 1 is 2,000 users, 40 employers, 1,000 gigs and about 9,000
+applications; everything grows linearly with it. The layout is deterministic,
+so the traffic generator can work out who owns what from the manifest alone:
+
+- users 1..E own employers 1..E; every other user is a dancer;
+- gig g belongs to employer ((g - 1) % E) + 1 and was posted by its owner;
+- dancer u never has an application to gig g when (g + u) % APPLY_FREE_MOD == 0,
+  so those are free for the "apply" traffic to use and then withdraw.
+
+Every user's password is PASSWORD. All rows are written with COPY.
+"""
+import csv
+import io
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+
+from benchmarks.loadtest.postgres import STATE_DIR
+from resources import passwords
+
+PASSWORD = "load-test-password"
+EMAIL_FORMAT = "bench{}@example.com"
+APPLY_FREE_MOD = 7
+MANIFEST = os.path.join(STATE_DIR, "dataset.json")
+
+EVENT_TYPES = ("wedding", "corporate", "festival", "music video", "theatre", "competition", "party", "workshop")
+ROLES = ("dancer", "choreographer", "employer", "backup dancer", "instructor")
+GIG_ROLES = ("dancer", "choreographer", "backup dancer", "instructor")
+SKILLS = ("ballet", "contemporary", "hip hop", "jazz", "salsa", "tap", "breaking", "ballroom", "kpop", "waacking")
+STATUSES = ("applied", "shortlisted", "accepted", "rejected", "withdrawn")
+STATUS_WEIGHTS = (60, 15, 10, 10, 5)
+STYLES = ("Salsa", "Ballet", "Hip Hop", "Jazz", "Contemporary", "Tap", "Kpop", "Ballroom")
+OCCASIONS = ("Night", "Showcase", "Gala", "Launch", "Festival", "Recital", "Battle", "Revue")
+
+
+def sizes(scale):
+    users = max(20, int(2000 * scale))
+    employers = max(2, int(40 * scale))
+    return {"users": users, "employers": employers, "gigs": max(10, int(1000 * scale)), "apps_per_dancer": 5}
+
+
+def _copy(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(["\\N" if value is None else value for value in row])
+        count += 1
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer,
+    )
+    return count
+
+
+def load(target, scale=1.0, seed=42):
+    """Replace the benchmark database's rows with a fresh dataset; returns its manifest."""
+    rng = random.Random(seed)
+    size = sizes(scale)
+    n_users, n_employers, n_gigs = size["users"], size["employers"], size["gigs"]
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(passwords.BCRYPT_ROUNDS)).decode()
+
+    connection = target.connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "TRUNCATE users, employers, gigs, applications, applications_roles, gigs_roles, "
+                "users_roles, users_skills, employer_members, user_media, "
+                "event_types, roles, skills RESTART IDENTITY CASCADE"
+            )
+            _copy(cursor, "event_types", ("type_name",), ((name,) for name in EVENT_TYPES))
+            _copy(cursor, "roles", ("role_name",), ((name,) for name in ROLES))
+            _copy(cursor, "skills", ("skill_name",), ((name,) for name in SKILLS))
+
+            _copy(cursor, "users", ("user_id", "user_name", "email", "dob", "password_hash", "created_at"), (
+                (u, f"Bench User {u}", EMAIL_FORMAT.format(u),
+                 (now - timedelta(days=rng.randint(18 * 365, 45 * 365))).date(), password_hash,
+                 now - timedelta(days=rng.randint(0, 720)))
+                for u in range(1, n_users + 1)
+            ))
+            user_roles = []
+            user_skills = []
+            for u in range(1, n_users + 1):
+                roles = {"employer"} if u <= n_employers else {"dancer"}
+                if rng.random() < 0.3:
+                    roles.add("choreographer")
+                user_roles.extend((u, role) for role in sorted(roles))
+                user_skills.extend((u, skill) for skill in rng.sample(SKILLS, rng.randint(0, 3)))
+            _copy(cursor, "users_roles", ("user_id", "role_name"), user_roles)
+            _copy(cursor, "users_skills", ("user_id", "skill_name"), user_skills)
+
+            _copy(cursor, "employers", ("employer_id", "employer_name", "description", "website", "email", "phone"), (
+                (e, f"Bench Employer {e}", "Synthetic employer for load tests", f"https://employer{e}.example.com",
+                 f"hello@employer{e}.example.com", f"6{e:07d}")
+                for e in range(1, n_employers + 1)
+            ))
+            _copy(cursor, "employer_members", ("employer_id", "user_id", "member_role"), (
+                (e, e, "owner") for e in range(1, n_employers + 1)
+            ))
+
+            gig_created = {}
+            gigs = []
+            gig_roles = {}
+            for g in range(1, n_gigs + 1):
+                owner = (g - 1) % n_employers + 1
+                created = now - timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+                gig_created[g] = created
+                style, occasion = rng.choice(STYLES), rng.choice(OCCASIONS)
+                gigs.append((
+                    g, f"{style} {occasion} {g}", (created + timedelta(days=rng.randint(7, 120))).date(),
+                    f"Looking for {style.lower()} performers for a {occasion.lower()}.",
+                    rng.choice(EVENT_TYPES), owner, owner, created,
+                ))
+                gig_roles[g] = rng.sample(GIG_ROLES, rng.randint(1, 3))
+            _copy(cursor, "gigs", ("gig_id", "gig_name", "gig_date", "gig_details", "type_name", "employer_id",
+                                   "posted_by_user_id", "created_at"), gigs)
+            _copy(cursor, "gigs_roles", ("gig_id", "role_name", "needed_count", "pay_amount"), (
+                (g, role, rng.randint(1, 8), f"{rng.randint(8, 60) * 10}.00")
+                for g, roles in gig_roles.items() for role in roles
+            ))
+
+            applications = []
+            application_roles = []
+            for u in range(n_employers + 1, n_users + 1):
+                count = rng.randint(0, 2 * size["apps_per_dancer"])
+                for g in set(rng.randint(1, n_gigs) for _ in range(count)):
+                    if (g + u) % APPLY_FREE_MOD == 0:
+                        continue
+                    applications.append((
+                        len(applications) + 1, u, g, rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                        gig_created[g] + (now - gig_created[g]) * rng.random(),
+                    ))
+                    application_roles.append((len(applications), rng.choice(gig_roles[g])))
+            _copy(cursor, "applications", ("application_id", "user_id", "gig_id", "status", "applied_at"),
+                  applications)
+            _copy(cursor, "applications_roles", ("application_id", "role_name"), application_roles)
+
+            for table, column in (("users", "user_id"), ("employers", "employer_id"), ("gigs", "gig_id"),
+                                  ("applications", "application_id")):
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                    f"(SELECT COALESCE(max({column}), 0) + 1 FROM {table}), false)"
+                )
+        connection.commit()
+
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE")
+    finally:
+        connection.close()
+
+    manifest = {
+        "scale": scale,
+        "seed": seed,
+        "users": n_users,
+        "employers": n_employers,
+        "gigs": n_gigs,
+        "applications": len(applications),
+        "password": PASSWORD,
+        "email_format": EMAIL_FORMAT,
+        "apply_free_mod": APPLY_FREE_MOD,
+        "search_terms": [style.lower() for style in STYLES],
+    }
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(path=MANIFEST):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise SystemExit(f"{path} not found; run `load` first (or pass --manifest)")
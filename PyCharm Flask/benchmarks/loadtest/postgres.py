@@ -0,0 +1,168 @@
+"""A throwaway Postgres for the load test, built from the scripts in `SQL Commands/`.
+
+With `pg_ctl` (the default) the cluster lives in .loadtest/pgdata and only
+listens on 127.0.0.1; with `docker` it's a `postgres` container. Either way
+the database is dropped and recreated by `up`, so every run starts from the
+same schema.
+"""
+import os
+import shutil
+import subprocess
+import time
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SQL_DIR = os.path.join(os.path.dirname(ROOT), "SQL Commands")
+STATE_DIR = os.path.join(ROOT, ".loadtest")
+CONTAINER = "dancecentral-loadtest"
+
+# Columns the app uses that the creation scripts predate. Applied after the
+# tables exist and before the index scripts that depend on them.
+SCHEMA_CATCH_UP = """
+ALTER TABLE users ADD COLUMN IF NOT EXISTS email TEXT UNIQUE;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS password_hash TEXT;
+ALTER TABLE users ALTER COLUMN password DROP NOT NULL;
+
+ALTER TABLE gigs ADD COLUMN IF NOT EXISTS gig_details TEXT;
+ALTER TABLE gigs ADD COLUMN IF NOT EXISTS employer_id BIGINT REFERENCES employers(employer_id) ON DELETE CASCADE;
+ALTER TABLE gigs ADD COLUMN IF NOT EXISTS posted_by_user_id BIGINT REFERENCES users(user_id) ON DELETE SET NULL;
+
+ALTER TABLE applications ALTER COLUMN status SET DEFAULT 'applied';
+"""
+
+# Scripts in the order they're run; None is where SCHEMA_CATCH_UP goes.
+SCHEMA_STEPS = (
+    "DanceCentralTableCreation.sql",
+    "EmployersTableCreation.sql",
+    "Cloudinary.sql",
+    None,
+    "GigsPagination.sql",
+    "GigsSearch.sql",
+    "ApplicationsPagination.sql",
+)
+
+
+class Target:
+    """Where the benchmark database is, as the DB_* settings the app reads."""
+
+    def __init__(self, host="127.0.0.1", port=54329, user="postgres", password="", dbname="dancecentral_bench"):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.dbname = dbname
+
+    def connect(self, dbname=None):
+        return psycopg2.connect(
+            host=self.host, port=self.port, user=self.user, password=self.password or None,
+            dbname=dbname or self.dbname,
+        )
+
+    def app_env(self):
+        return {
+            "DB": self.dbname,
+            "DB_HOST": self.host,
+            "DB_PORT": str(self.port),
+            "DB_USER": self.user,
+            "DB_PASSWORD": self.password,
+        }
+
+    def describe(self):
+        return {"host": self.host, "port": self.port, "dbname": self.dbname}
+
+
+def _bin(name):
+    found = shutil.which(name)
+    if found:
+        return found
+    try:
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        bindir = ""
+    candidate = os.path.join(bindir, name)
+    if bindir and os.path.exists(candidate):
+        return candidate
+    raise SystemExit(f"{name} not found; install Postgres or use --engine docker")
+
+
+def start(target, engine):
+    if engine == "pg_ctl":
+        data_dir = os.path.join(STATE_DIR, "pgdata")
+        if not os.path.exists(os.path.join(data_dir, "PG_VERSION")):
+            os.makedirs(STATE_DIR, exist_ok=True)
+            subprocess.run(
+                [_bin("initdb"), "-D", data_dir, "-U", target.user, "--auth=trust", "-E", "UTF8"],
+                check=True, stdout=subprocess.DEVNULL,
+            )
+        status = subprocess.run([_bin("pg_ctl"), "-D", data_dir, "status"], stdout=subprocess.DEVNULL)
+        if status.returncode != 0:
+            options = f"-p {target.port} -c listen_addresses={target.host} -c unix_socket_directories=''"
+            subprocess.run(
+                [_bin("pg_ctl"), "-D", data_dir, "-l", os.path.join(STATE_DIR, "postgres.log"),
+                 "-o", options, "-w", "start"],
+                check=True,
+            )
+    elif engine == "docker":
+        running = subprocess.run(
+            ["docker", "ps", "-q", "-f", f"name={CONTAINER}"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        if not running:
+            subprocess.run(
+                ["docker", "run", "-d", "--rm", "--name", CONTAINER,
+                 "-e", "POSTGRES_HOST_AUTH_METHOD=trust", "-e", f"POSTGRES_USER={target.user}",
+                 "-p", f"{target.host}:{target.port}:5432", "postgres:16"],
+                check=True, stdout=subprocess.DEVNULL,
+            )
+    wait_ready(target)
+
+
+def stop(engine):
+    if engine == "pg_ctl":
+        data_dir = os.path.join(STATE_DIR, "pgdata")
+        if os.path.exists(data_dir):
+            subprocess.run([_bin("pg_ctl"), "-D", data_dir, "-m", "fast", "stop"], check=False)
+    elif engine == "docker":
+        subprocess.run(["docker", "stop", CONTAINER], check=False, stdout=subprocess.DEVNULL)
+
+
+def wait_ready(target, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            target.connect("postgres").close()
+            return
+        except psycopg2.OperationalError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def _read_script(name):
+    with open(os.path.join(SQL_DIR, name), encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    # Cloudinary.sql opens with a title line that isn't SQL.
+    while lines and not lines[0].lstrip().startswith(("--", "CREATE", "ALTER", "BEGIN", "INSERT")):
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def create_schema(target):
+    """Drop and recreate the benchmark database, then run the schema scripts in order."""
+    admin = target.connect("postgres")
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cursor:
+            cursor.execute(f'DROP DATABASE IF EXISTS "{target.dbname}" WITH (FORCE)')
+            cursor.execute(f'CREATE DATABASE "{target.dbname}"')
+    finally:
+        admin.close()
+
+    connection = target.connect()
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            for name in SCHEMA_STEPS:
+                cursor.execute(SCHEMA_CATCH_UP if name is None else _read_script(name))
+    finally:
+        connection.close()
@@ -0,0 +1,121 @@
+"""Summaries of a run, saved as JSON, and comparison against a saved baseline.
+
+A result file looks like:
+  {"meta": {...how the run was made...},
+   "total": {"requests": 5123, "errors": 0, "rps": 85.4, "p50_ms": ...},
+   "endpoints": {"GET /gigs/feed": {"requests": ..., "p95_ms": ..., ...}, ...}}
+
+`compare` flags an endpoint when its p95 or p99 got slower by more than the
+threshold (percent) and by more than `min_ms`, so sub-millisecond noise on
+fast endpoints doesn't fail a build; when its throughput dropped by more than
+the threshold; or when it started returning errors.
+"""
+import json
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def _stats(latencies, errors, elapsed):
+    values = sorted(latencies)
+    stats = {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+    }
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = round(percentile(values, p) * 1000, 2) if values else 0.0
+    stats["max_ms"] = round(values[-1] * 1000, 2) if values else 0.0
+    return stats
+
+
+def summarize(recorder, elapsed, meta=None):
+    endpoints = {
+        label: _stats(latencies, recorder.errors.get(label, 0), elapsed)
+        for label, latencies in sorted(recorder.latencies.items())
+    }
+    every = [seconds for latencies in recorder.latencies.values() for seconds in latencies]
+    return {
+        "meta": {**(meta or {}), "measured_seconds": round(elapsed, 2)},
+        "total": _stats(every, sum(recorder.errors.values()), elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def format_table(result):
+    columns = ("requests", "errors", "rps", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")
+    rows = [(label, stats) for label, stats in result["endpoints"].items()] + [("TOTAL", result["total"])]
+    width = max(len(label) for label, _ in rows)
+    lines = [f"{'endpoint':<{width}}  " + "  ".join(f"{name:>9}" for name in columns)]
+    for label, stats in rows:
+        lines.append(f"{label:<{width}}  " + "  ".join(f"{stats[name]:>9}" for name in columns))
+    return "\n".join(lines)
+
+
+def save(result, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(baseline, current, threshold=10.0, min_ms=2.0):
+    """(rows, regressions): one row per endpoint in either run, and the problems found."""
+    rows = []
+    regressions = []
+    labels = sorted(set(baseline["endpoints"]) | set(current["endpoints"]))
+    for label in [*labels, "TOTAL"]:
+        if label == "TOTAL":
+            before, after = baseline["total"], current["total"]
+        else:
+            before, after = baseline["endpoints"].get(label), current["endpoints"].get(label)
+        if before is None or after is None:
+            rows.append({"endpoint": label, "note": "only in baseline" if after is None else "new"})
+            continue
+        row = {"endpoint": label}
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            row[key] = (before[key], after[key], round(_change(before[key], after[key]), 1))
+        problems = []
+        for key in ("p95_ms", "p99_ms"):
+            slower_by = after[key] - before[key]
+            if slower_by > min_ms and _change(before[key], after[key]) > threshold:
+                problems.append(f"{key} {before[key]} -> {after[key]}")
+        if _change(before["rps"], after["rps"]) < -threshold:
+            problems.append(f"rps {before['rps']} -> {after['rps']}")
+        before_rate = before["errors"] / before["requests"] if before["requests"] else 0.0
+        after_rate = after["errors"] / after["requests"] if after["requests"] else 0.0
+        if after["errors"] and after_rate > before_rate:
+            problems.append(f"errors {before['errors']} -> {after['errors']}")
+        row["problems"] = problems
+        regressions.extend(f"{label}: {problem}" for problem in problems)
+        rows.append(row)
+    return rows, regressions
+
+
+def format_comparison(rows):
+    keys = ("rps", "p50_ms", "p95_ms", "p99_ms")
+    width = max(len(row["endpoint"]) for row in rows)
+    lines = [f"{'endpoint':<{width}}  " + "  ".join(f"{key:>24}" for key in keys)]
+    for row in rows:
+        if "note" in row:
+            lines.append(f"{row['endpoint']:<{width}}  ({row['note']})")
+            continue
+        cells = [f"{before} -> {after} ({change:+.1f}%)" for before, after, change in (row[key] for key in keys)]
+        flag = "  <-- regression" if row["problems"] else ""
+        lines.append(f"{row['endpoint']:<{width}}  " + "  ".join(f"{cell:>24}" for cell in cells) + flag)
+    return "\n".join(lines)
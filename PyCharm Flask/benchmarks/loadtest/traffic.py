@@ -0,0 +1,238 @@
+"""Traffic mixes and the clients that drive them.
+
+A mix weights four scenarios, e.g. "dashboard=60,apply=15,review=15,login=10".
+Each client thread picks a scenario by weight for every iteration and runs one
+of its actions, which makes one or two requests:
+
+- dashboard: a dancer polling their dashboard (bootstrap, gig feed, gig list,
+  search, their applications, reference data).
+- apply: a dancer browsing gigs, applying to one and withdrawing again, so the
+  dataset is the same after a run as before it.
+- review: an employer listing their gigs, paging a gig's applicants and
+  changing applicant statuses.
+- login: a full login, bcrypt check included.
+
+Every request is timed under a label naming the endpoint, not the URL, so
+/applications/?gig_id=12 and ?gig_id=40 land together.
+"""
+import random
+import threading
+import time
+
+import requests
+
+SCENARIOS = ("dashboard", "apply", "review", "login")
+MIXES = {
+    "mixed": {"dashboard": 60, "apply": 15, "review": 15, "login": 10},
+    "dashboard": {"dashboard": 1},
+    "apply": {"apply": 1},
+    "review": {"review": 1},
+    "login": {"login": 1},
+}
+
+
+def parse_mix(text):
+    """A preset name from MIXES, or "scenario=weight,..."."""
+    if text in MIXES:
+        return dict(MIXES[text])
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"weight for {name!r} must be a number") from None
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("a mix needs at least one scenario with a positive weight")
+    return mix
+
+
+class Recorder:
+    """Latencies and failures per endpoint label, shared by every client."""
+
+    def __init__(self):
+        self.latencies = {}  # label -> [seconds]
+        self.errors = {}  # label -> count
+        self.recording = False
+        self._lock = threading.Lock()
+
+    def add(self, label, seconds, ok):
+        if not self.recording:
+            return
+        with self._lock:
+            self.latencies.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+
+class Client:
+    """One simulated user: a dancer and an employer account, each with a session.
+
+    Clients get different dancers, so two of them never apply to the same gig as
+    the same user at once.
+    """
+
+    def __init__(self, index, base_url, manifest, recorder, rng, timeout=30.0):
+        self.base_url = base_url.rstrip("/")
+        self.manifest = manifest
+        self.recorder = recorder
+        self.rng = rng
+        self.timeout = timeout
+        dancers = manifest["users"] - manifest["employers"]
+        self.dancer_id = manifest["employers"] + 1 + index % dancers
+        self.employer_id = rng.randint(1, manifest["employers"])
+        self.dancer = requests.Session()
+        self.employer = requests.Session()
+
+    def request(self, session, label, method, path, ok=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(label, time.perf_counter() - started, False)
+            return None
+        self.recorder.add(label, time.perf_counter() - started, response.status_code in ok)
+        return response
+
+    def log_in(self, session, user_id):
+        response = self.request(session, "POST /users/login", "POST", "/users/login", json={
+            "email": self.manifest["email_format"].format(user_id),
+            "password": self.manifest["password"],
+        })
+        if response is not None and response.status_code == 200:
+            session.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    def start(self):
+        self.log_in(self.dancer, self.dancer_id)
+        self.log_in(self.employer, self.employer_id)
+
+    # dashboard
+
+    def bootstrap(self):
+        self.request(self.dancer, "GET /users/me/bootstrap", "GET", "/users/me/bootstrap")
+
+    def feed(self):
+        self.request(self.dancer, "GET /gigs/feed", "GET", "/gigs/feed", params={"limit": 20})
+
+    def gig_list(self):
+        self.request(self.dancer, "GET /gigs/", "GET", "/gigs/", params={"limit": 50})
+
+    def search(self):
+        term = self.rng.choice(self.manifest["search_terms"])
+        self.request(self.dancer, "GET /gigs/search", "GET", "/gigs/search", params={"q": term, "limit": 20})
+
+    def my_applications(self):
+        self.request(self.dancer, "GET /applications/", "GET", "/applications/")
+
+    def meta(self):
+        self.request(self.dancer, "GET /meta", "GET", "/meta", ok=(200, 304))
+
+    # apply
+
+    def apply_and_withdraw(self):
+        # A gig the dataset left free for this dancer: (gig_id + dancer_id) % mod == 0.
+        mod = self.manifest["apply_free_mod"]
+        gig_id = self.rng.randrange((-self.dancer_id) % mod or mod, self.manifest["gigs"] + 1, mod)
+        self.request(self.dancer, "POST /applications/", "POST", "/applications/", json={"gig_id": gig_id})
+        self.request(self.dancer, "DELETE /applications/", "DELETE", "/applications/", json={"gig_id": gig_id})
+
+    # review
+
+    def _own_gig(self):
+        employers = self.manifest["employers"]
+        owned = range(self.employer_id, self.manifest["gigs"] + 1, employers)
+        return self.rng.choice(owned)
+
+    def my_gigs(self):
+        self.request(self.employer, "GET /gigs/mygigs", "GET", "/gigs/mygigs")
+
+    def applicants(self):
+        response = self.request(
+            self.employer, "GET /applications/?gig_id", "GET", "/applications/",
+            params={"gig_id": self._own_gig(), "limit": 50},
+        )
+        if response is None or response.status_code != 200:
+            return []
+        return response.json().get("applicants", [])
+
+    def review_applicant(self):
+        applicants = self.applicants()
+        if not applicants:
+            return
+        applicant = self.rng.choice(applicants)
+        status = self.rng.choice(("shortlisted", "accepted", "rejected"))
+        self.request(
+            self.employer, "PATCH /applications/<id>", "PATCH", f"/applications/{applicant['application_id']}",
+            json={"status": status},
+        )
+
+    def bulk_review(self):
+        applicants = self.applicants()
+        if not applicants:
+            return
+        updates = [
+            {"application_id": applicant["application_id"], "status": "shortlisted"}
+            for applicant in self.rng.sample(applicants, min(len(applicants), 10))
+        ]
+        self.request(self.employer, "PATCH /applications/bulk", "PATCH", "/applications/bulk", json=updates)
+
+    # login
+
+    def login(self):
+        user_id = self.rng.randint(1, self.manifest["users"])
+        self.request(requests.Session(), "POST /users/login", "POST", "/users/login", json={
+            "email": self.manifest["email_format"].format(user_id),
+            "password": self.manifest["password"],
+        })
+
+    def actions(self):
+        """{scenario: ((action, weight), ...)}"""
+        return {
+            "dashboard": (
+                (self.bootstrap, 3), (self.feed, 4), (self.gig_list, 1), (self.search, 1),
+                (self.my_applications, 2), (self.meta, 1),
+            ),
+            "apply": ((self.feed, 2), (self.apply_and_withdraw, 3)),
+            "review": ((self.my_gigs, 2), (self.applicants, 4), (self.review_applicant, 2), (self.bulk_review, 1)),
+            "login": ((self.login, 1),),
+        }
+
+
+def run(base_url, manifest, mix, clients=16, duration=60.0, warmup=5.0, think=0.0, seed=1):
+    """Drive `mix` against `base_url`; returns (recorder, measured seconds)."""
+    recorder = Recorder()
+    scenarios = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in scenarios]
+    rng = random.Random(seed)
+    pool = [Client(i, base_url, manifest, recorder, random.Random(rng.random())) for i in range(clients)]
+    for client in pool:
+        client.start()
+
+    stop = threading.Event()
+
+    def drive(client):
+        actions = client.actions()
+        choices = {name: ([a for a, _ in actions[name]], [w for _, w in actions[name]]) for name in scenarios}
+        while not stop.is_set():
+            scenario = client.rng.choices(scenarios, weights)[0]
+            candidates, action_weights = choices[scenario]
+            client.rng.choices(candidates, action_weights)[0]()
+            if think:
+                stop.wait(client.rng.expovariate(1 / think))
+
+    threads = [threading.Thread(target=drive, args=(client,), daemon=True) for client in pool]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    recorder.recording = True
+    started = time.perf_counter()
+    time.sleep(duration)
+    recorder.recording = False
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=30)
+    return recorder, elapsed
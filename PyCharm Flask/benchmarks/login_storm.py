@@ -0,0 +1,121 @@
+"""Login storm: bcrypt inline vs on the password worker pool.
+
+Serves a small Flask app with a /login endpoint (one bcrypt check, as in
+users.login_user) and a /ping endpoint standing in for every other request, on a
+threaded server like the dev server. While `--logins` clients log in as fast as
+they can, one client keeps calling /ping. Reports login throughput and /ping
+latency percentiles. No database is needed.
+
+  python benchmarks/login_storm.py --mode inline
+  python benchmarks/login_storm.py --mode pool --workers 2
+
+Run from the "PyCharm Flask" directory.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import requests
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resources import passwords  # noqa: E402
+
+
+def build_app(password_hash):
+    app = Flask(__name__)
+
+    @app.post("/login")
+    def login():
+        ok = passwords.check_password(request.get_json()["password"], password_hash)
+        return jsonify(ok=ok), 200 if ok else 401
+
+    @app.errorhandler(passwords.PasswordHashingBusy)
+    def busy(e):
+        return jsonify(status="error", msg="server busy"), 503
+
+    @app.get("/ping")
+    def ping():
+        return jsonify(status="ok", items=list(range(50))), 200
+
+    return app
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inline", "pool"], default="pool")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--backoff", type=float, default=0.1, help="seconds a client waits after a 503")
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    passwords.BCRYPT_ROUNDS = args.rounds
+    passwords.BCRYPT_WORKERS = 0 if args.mode == "inline" else args.workers
+    passwords.BCRYPT_QUEUE = args.queue if args.queue is not None else 4 * max(args.workers, 1)
+
+    password_hash = passwords.hash_password("correct horse battery staple")
+    if args.mode == "pool":
+        # Start the workers before the clock starts.
+        passwords.check_password("warm up", password_hash)
+
+    server = make_server("127.0.0.1", args.port, build_app(password_hash), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{args.port}"
+
+    stop = time.monotonic() + args.seconds
+    login_results = {"ok": 0, "busy": 0, "other": 0}
+    results_lock = threading.Lock()
+    ping_latencies = []
+
+    def login_client():
+        session = requests.Session()
+        while time.monotonic() < stop:
+            r = session.post(f"{base}/login", json={"password": "correct horse battery staple"})
+            key = "ok" if r.status_code == 200 else "busy" if r.status_code == 503 else "other"
+            with results_lock:
+                login_results[key] += 1
+            if key == "busy":
+                time.sleep(args.backoff)
+
+    def ping_client():
+        session = requests.Session()
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            session.get(f"{base}/ping")
+            ping_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_client) for _ in range(args.logins)]
+    threads.append(threading.Thread(target=ping_client))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    server.shutdown()
+    passwords.shutdown()
+
+    print(f"mode={args.mode} workers={passwords.BCRYPT_WORKERS} rounds={args.rounds} "
+          f"login clients={args.logins} seconds={args.seconds:g}")
+    print(f"logins: {login_results['ok'] / args.seconds:.1f}/s ok, "
+          f"{login_results['busy']} rejected busy, {login_results['other']} other")
+    if ping_latencies:
+        print(f"/ping: n={len(ping_latencies)} p50={statistics.median(ping_latencies):.1f}ms "
+              f"p99={percentile(ping_latencies, 99):.1f}ms max={max(ping_latencies):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
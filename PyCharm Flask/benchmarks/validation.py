@@ -0,0 +1,79 @@
+"""Request validation: a new schema per request vs cached Schema.load vs the compiled loader.
+
+Loads valid and invalid payloads for the hot write paths (POST /applications/,
+PATCH /applications/<id>, POST /gigs/, PATCH /gigs/<id>, POST /gigs/bulk) and
+reports microseconds per load for each path. No database or server is needed.
+
+  python benchmarks/validation.py
+  python benchmarks/validation.py --number 50000
+
+Run from the "PyCharm Flask" directory.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+from marshmallow import RAISE, ValidationError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resources.validations.request import get_loader  # noqa: E402
+from resources.validations.schemas import (  # noqa: E402
+    ApplicationCreateSchema,
+    ApplicationUpdateStatusSchema,
+    GigBulkCreateSchema,
+    GigCreateSchema,
+    GigUpdateSchema,
+)
+
+GIG = {
+    "gig_name": "Summer showcase",
+    "gig_date": "2026-07-01",
+    "gig_details": "Two sets, contemporary and jazz.",
+    "type_name": "Concert",
+    "employer_id": 12,
+}
+ROLE = {"role_name": "Dancer", "needed_count": 4, "pay_amount": 150.0, "pay_currency": "SGD", "pay_unit": "per show"}
+
+# (label, schema class, many, partial, payload)
+CASES = [
+    ("apply", ApplicationCreateSchema, False, False, {"gig_id": 42}),
+    ("apply (invalid)", ApplicationCreateSchema, False, False, {"gig_id": "42", "extra": 1}),
+    ("update status", ApplicationUpdateStatusSchema, False, False, {"status": "Accepted"}),
+    ("create gig", GigCreateSchema, False, False, GIG),
+    ("update gig", GigUpdateSchema, False, True, {"gig_details": "Now three sets."}),
+    ("bulk gigs x10", GigBulkCreateSchema, True, False, [dict(GIG, roles=[ROLE, ROLE])] * 10),
+]
+
+
+def timed(load, payload, number):
+    def run():
+        try:
+            load(payload)
+        except ValidationError:
+            pass
+    return min(timeit.repeat(run, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="loads per timing run")
+    args = parser.parse_args()
+
+    print(f"{'payload':<18}{'new schema':>12}{'cached':>12}{'compiled':>12}   (us per load)")
+    for label, schema_class, many, partial, payload in CASES:
+        def per_request(value, schema_class=schema_class, many=many, partial=partial):
+            return schema_class(many=many).load(value, partial=partial, unknown=RAISE)
+
+        cached = get_loader(schema_class, many=many, partial=partial, fast=False)
+        compiled = get_loader(schema_class, many=many, partial=partial, fast=True)
+        number = max(args.number // (len(payload) if many else 1), 1)
+        print(f"{label:<18}"
+              f"{timed(per_request, payload, number):>12.1f}"
+              f"{timed(cached, payload, number):>12.1f}"
+              f"{timed(compiled, payload, number):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Admission control for requests that need a database connection.
+
+When the pool is exhausted, a request waits at most DB_POOL_TIMEOUT seconds for a
+connection and is then turned away with a 503 + Retry-After instead of failing
+half-way through with a 500.
+
+The last DB_POOL_RESERVED connections are kept for cheap lookup endpoints
+(DB_RESERVED_BLUEPRINTS) so slow, heavy endpoints can't starve them.
+
+Usage (main.py):
+  from db import admission
+  admission.init_app(app)
+"""
+import os
+
+from flask import jsonify, request
+
+from db.db_pool import PoolTimeout, checkout_reserve
+
+DEFAULT_RESERVED_BLUEPRINTS = "roles,skills,event_types,member_types,applications_status,meta"
+
+
+def init_app(app):
+    reserved = int(os.getenv("DB_POOL_RESERVED", "1"))
+    retry_after = os.getenv("DB_RETRY_AFTER", "1")
+    cheap = {
+        name.strip()
+        for name in os.getenv("DB_RESERVED_BLUEPRINTS", DEFAULT_RESERVED_BLUEPRINTS).split(",")
+        if name.strip()
+    }
+
+    @app.before_request
+    def _classify_request():
+        checkout_reserve.set(0 if request.blueprint in cheap else reserved)
+
+    @app.teardown_request
+    def _reset_request_class(exc=None):
+        checkout_reserve.set(0)
+
+    @app.errorhandler(PoolTimeout)
+    def _pool_exhausted(err):
+        app.logger.warning("%s %s rejected: %s", request.method, request.path, err)
+        response = jsonify(status="error", msg="server busy, please retry")
+        response.headers["Retry-After"] = retry_after
+        return response, 503
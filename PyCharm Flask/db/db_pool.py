@@ -1,25 +1,433 @@
 from dotenv import load_dotenv
 
+import functools
+import logging
 import os
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import psycopg2
 import psycopg2.pool
 import psycopg2.extras
+import psycopg2.extensions
+
+from db import instrumentation
 
 load_dotenv()
 
-pool = psycopg2.pool.SimpleConnectionPool(2, 3,
-                                          host=os.getenv("DB_HOST"),
-                                          user=os.getenv("DB_USER"),
-                                          database=os.getenv("DB"),
-                                          port=os.getenv("DB_PORT"))
+log = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no connection became free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    - Keeps at least `minconn` connections open and never more than `maxconn`.
+    - `getconn()` blocks (FIFO) until a connection is free, up to `timeout` seconds.
+      Callers can pass `reserve` to leave connections free for more important work.
+    - Idle connections older than `max_idle` seconds, and any connection older than
+      `max_lifetime` seconds, are closed and replaced instead of being handed out.
+    - With `track_checkouts=True` the stack of every checkout is kept so leaked
+      connections can be traced back to the code that took them.
+    """
+
+    def __init__(self, minconn, maxconn, *, timeout=5.0, max_idle=300.0, max_lifetime=3600.0,
+                 track_checkouts=False, connect=psycopg2.connect, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("expected 0 <= minconn <= maxconn and maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.track_checkouts = track_checkouts
+        self._connect = connect
+        self._connect_kwargs = connect_kwargs
+
+        self._lock = threading.Lock()
+        self._idle = deque()      # (connection, created_at, last_used_at)
+        self._used = {}           # id(connection) -> (connection, created_at, checked_out_at, stack)
+        self._waiters = deque()   # one _Waiter per blocked getconn(), oldest first
+        self._opening = 0         # connections being opened outside the lock
+        self._last_leak_report = float("-inf")
+        self.closed = False
+
+        for _ in range(minconn):
+            conn = self._connect(**self._connect_kwargs)
+            now = time.monotonic()
+            self._idle.append((conn, now, now))
+
+    # ---- public API -------------------------------------------------------
+
+    def getconn(self, timeout=None, reserve=0):
+        """Check out a connection, waiting up to `timeout` seconds for one to free up.
+
+        `reserve` holds that many connections back for other callers: this checkout only
+        goes ahead while more than `reserve` connections are still free. Waiters are
+        served in arrival order among those whose reserve can currently be met.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        reserve = min(max(reserve, 0), self.maxconn - 1)
+        deadline = time.monotonic() + timeout
+        waiter = None
+
+        while True:
+            with self._lock:
+                if self.closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+
+                if self._is_next(waiter, reserve):
+                    self._dequeue(waiter)
+                    conn = self._take_idle()
+                    if conn is None:
+                        # _is_next() guarantees there is room for one more.
+                        self._opening += 1
+                    self._wake_next()
+                    if conn is not None:
+                        return conn
+                    break
+
+                if waiter is None:
+                    waiter = _Waiter(reserve)
+                    self._waiters.append(waiter)
+
+                remaining = deadline - time.monotonic()
+                timed_out = remaining <= 0
+                if timed_out:
+                    self._dequeue(waiter)
+                    self._wake_next()
+                    in_use = len(self._used)
+                else:
+                    waiter.event.clear()
+
+            if timed_out:
+                self._log_long_held(timeout)
+                raise PoolTimeout(
+                    f"no database connection available within {timeout:g}s "
+                    f"({in_use}/{self.maxconn} in use)"
+                )
+            waiter.event.wait(remaining)
+
+        # Opening a connection can take a while; do it without holding the lock.
+        try:
+            conn = self._connect(**self._connect_kwargs)
+        except Exception:
+            with self._lock:
+                self._opening -= 1
+                self._wake_next()
+            raise
+
+        with self._lock:
+            self._opening -= 1
+            now = time.monotonic()
+            self._used[id(conn)] = (conn, now, now, self._stack())
+        return conn
+
+    def putconn(self, conn, close=False):
+        # Roll back any open transaction before the connection becomes visible to others.
+        if not close and not conn.closed:
+            close = not self._reset(conn)
+
+        with self._lock:
+            entry = self._used.pop(id(conn), None)
+            if entry is None:
+                raise psycopg2.pool.PoolError("trying to put unkeyed connection")
+            created_at = entry[1]
+
+            if close or self.closed or conn.closed or self._expired(created_at, time.monotonic()):
+                self._close(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._wake_next()
+
+    def closeall(self):
+        with self._lock:
+            self.closed = True
+            while self._idle:
+                self._close(self._idle.popleft()[0])
+            for entry in list(self._used.values()):
+                self._close(entry[0])
+            self._used.clear()
+            while self._waiters:
+                self._waiters.popleft().event.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": self._total(),
+                "idle": len(self._idle),
+                "in_use": len(self._used),
+                "waiting": len(self._waiters),
+            }
+
+    def connect(self):
+        """Open a connection with this pool's settings that the pool doesn't manage."""
+        return self._connect(**self._connect_kwargs)
+
+    def owns(self, conn):
+        with self._lock:
+            return id(conn) in self._used
+
+    def long_held(self, threshold):
+        """Checked-out connections held for more than `threshold` seconds: [(seconds, stack)]."""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(
+                ((now - checked_out_at, stack)
+                 for _, _, checked_out_at, stack in self._used.values()
+                 if now - checked_out_at > threshold),
+                key=lambda item: item[0],
+                reverse=True,
+            )
+
+    def _log_long_held(self, threshold):
+        # Exhaustion tends to come in bursts; one report every few seconds is plenty.
+        now = time.monotonic()
+        if now - self._last_leak_report < 10:
+            return
+        self._last_leak_report = now
+        for held, stack in self.long_held(threshold):
+            where = "".join(traceback.format_list(stack)) if stack else "(set DB_POOL_TRACK_CHECKOUTS=1 for stacks)\n"
+            log.warning("connection checked out for %.1fs, possible leak:\n%s", held, where)
+
+    # ---- internals (call with self._lock held) ----------------------------
+
+    def _total(self):
+        return len(self._idle) + len(self._used) + self._opening
+
+    def _has_room(self, reserve):
+        return len(self._used) + self._opening < self.maxconn - reserve
+
+    def _is_next(self, waiter, reserve):
+        """True if `waiter` (None for a new arrival) may take a connection right now."""
+        if not self._has_room(reserve):
+            return False
+        for queued in self._waiters:
+            if queued is waiter:
+                return True
+            if self._has_room(queued.reserve):
+                return False
+        return True
+
+    def _take_idle(self):
+        now = time.monotonic()
+        while self._idle:
+            # LIFO: the most recently used connection is the least likely to be stale.
+            conn, created_at, last_used = self._idle.pop()
+            if conn.closed or self._expired(created_at, now) or (
+                self.max_idle and now - last_used > self.max_idle
+                and self._total() >= self.minconn
+            ):
+                self._close(conn)
+                continue
+            self._used[id(conn)] = (conn, created_at, now, self._stack())
+            return conn
+        return None
+
+    def _stack(self):
+        if not self.track_checkouts:
+            return None
+        # Drop the pool's own frames so the first entry shown is the caller.
+        return traceback.extract_stack(limit=12)[:-3]
+
+    def _expired(self, created_at, now):
+        return bool(self.max_lifetime) and now - created_at > self.max_lifetime
+
+    def _reset(self, conn):
+        """Return a connection to a clean, idle state. False means it should be discarded."""
+        try:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            return True
+        except Exception:
+            return False
 
-def get_cursor():
-    connection = pool.getconn()
-    cursor = connection.cursor(
-        cursor_factory=psycopg2.extras.RealDictCursor
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _dequeue(self, waiter):
+        if waiter is not None:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _wake_next(self):
+        for queued in self._waiters:
+            if self._has_room(queued.reserve):
+                queued.event.set()
+                return
+
+
+class _Waiter:
+    __slots__ = ("event", "reserve")
+
+    def __init__(self, reserve):
+        self.event = threading.Event()
+        self.reserve = reserve
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def create_pool(prefix="DB", database_var="DB"):
+    """Build a pool from env vars, e.g. DB_HOST/DB_POOL_MAX or DB_REPLICA_HOST/DB_REPLICA_POOL_MAX.
+
+    Replica settings that aren't set fall back to the primary's.
+    """
+    def setting(name, default=None):
+        value = os.getenv(f"{prefix}_{name}")
+        if value in (None, "") and prefix != "DB":
+            value = os.getenv(f"DB_{name}")
+        return default if value in (None, "") else value
+
+    return ConnectionPool(
+        int(setting("POOL_MIN", 2)),
+        int(setting("POOL_MAX", 10)),
+        timeout=float(setting("POOL_TIMEOUT", 5.0)),
+        max_idle=float(setting("POOL_MAX_IDLE", 300.0)),
+        max_lifetime=float(setting("POOL_MAX_LIFETIME", 3600.0)),
+        track_checkouts=os.getenv("DB_POOL_TRACK_CHECKOUTS", "0") == "1",
+        host=setting("HOST"),
+        user=setting("USER"),
+        password=setting("PASSWORD"),
+        database=os.getenv(database_var) or os.getenv("DB"),
+        port=setting("PORT"),
     )
+
+
+# Created on first use so importing a blueprint doesn't require a running database.
+pool = None
+replica_pool = None
+_pool_lock = threading.Lock()
+
+# Set per request by db.routing: a callable that returns False while the current
+# user has to read their own recent writes from the primary.
+replica_allowed = ContextVar("replica_allowed", default=None)
+
+
+def replica_configured():
+    return bool(os.getenv("DB_REPLICA_HOST"))
+
+
+def get_pool(readonly=False):
+    """The primary pool, or the replica pool for read-only work when one is configured."""
+    global pool, replica_pool
+    if readonly and replica_configured():
+        allowed = replica_allowed.get()
+        if allowed is None or allowed():
+            if replica_pool is None:
+                with _pool_lock:
+                    if replica_pool is None:
+                        replica_pool = create_pool("DB_REPLICA", database_var="DB_REPLICA")
+            return replica_pool
+
+    if pool is None:
+        with _pool_lock:
+            if pool is None:
+                pool = create_pool()
+    return pool
+
+
+# How many connections the current checkout must leave free (see db.admission).
+checkout_reserve = ContextVar("checkout_reserve", default=0)
+
+
+def checkout(readonly=False):
+    """Check out a connection for the current request, recording how long that took."""
+    started = time.perf_counter()
+    connection = get_pool(readonly).getconn(reserve=checkout_reserve.get())
+    instrumentation.record_checkout(connection, time.perf_counter() - started)
+    return connection
+
+
+def cursor_factory(tuples=False):
+    """Cursor class for dict rows, or plain tuples with `tuples=True` (see db.instrumentation)."""
+    if instrumentation.INSTRUMENT_QUERIES:
+        return instrumentation.InstrumentedCursor if tuples else instrumentation.InstrumentedDictCursor
+    return None if tuples else psycopg2.extras.RealDictCursor
+
+
+def get_cursor(readonly=False, tuples=False):
+    """A connection and a cursor on it; rows are dicts, or plain tuples with `tuples=True`."""
+    connection = checkout(readonly)
+    cursor = connection.cursor(cursor_factory=cursor_factory(tuples))
     return connection, cursor
 
 
 def release_connection(connection):
-    pool.putconn(connection)
+    instrumentation.record_release(connection)
+    if replica_pool is not None and replica_pool.owns(connection):
+        replica_pool.putconn(connection)
+    else:
+        get_pool().putconn(connection)
+
+
+# Log a warning when a transaction() keeps its connection longer than this (seconds, 0 = off).
+HOLD_WARN_SECONDS = _env_float("DB_POOL_HOLD_WARN", 0)
+
+
+@contextmanager
+def transaction(readonly=False, tuples=False):
+    """Check out a connection for the duration of a `with` block.
+
+    Commits when the block exits normally (including an early `return`), rolls back
+    when it raises, and always gives the connection back to the pool:
+
+        with transaction() as cursor:
+            cursor.execute("SELECT ...")
+            rows = cursor.fetchall()
+
+    `readonly=True` lets the block run on the read replica, if one is configured.
+    `tuples=True` fetches plain tuples instead of dicts (see db.records).
+    """
+    connection, cursor = get_cursor(readonly, tuples)
+    started = time.monotonic()
+    try:
+        yield cursor
+        connection.commit()
+    except BaseException:
+        try:
+            connection.rollback()
+        except psycopg2.Error:
+            pass
+        raise
+    finally:
+        cursor.close()
+        release_connection(connection)
+        held = time.monotonic() - started
+        if HOLD_WARN_SECONDS and held > HOLD_WARN_SECONDS:
+            log.warning("database connection held for %.0fms", held * 1000)
+
+
+def with_cursor(view=None, *, readonly=False, tuples=False):
+    """Run a view inside `transaction()`, passing the cursor as the first argument.
+
+    Use as `@with_cursor` or `@with_cursor(readonly=True)`.
+    """
+    if view is None:
+        return functools.partial(with_cursor, readonly=readonly, tuples=tuples)
 
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with transaction(readonly, tuples) as cursor:
+            return view(cursor, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,220 @@
+"""Per-request query instrumentation and N+1 detection.
+
+Cursors handed out by db_pool record every execute() into the current request:
+a fingerprint of the SQL (literals and placeholders replaced by `?`), when it
+started, how long it took and how many rows it returned. Time spent waiting for
+a pool connection and time spent holding one are recorded separately.
+
+At the end of each request:
+- a debug log line gives the query count, database time and pool wait;
+- with DB_QUERY_HEADER=1 the same numbers go out in a Server-Timing header;
+- once one fingerprint has run DB_REPEAT_WARN times (default 10, 0 = off) in a
+  request, a warning names it. That's usually a loop issuing a query per item
+  (N+1), like fetching /gigs-roles/<id> once per gig.
+
+Statements slower than DB_SLOW_QUERY_MS are also handed to db.slow_queries.
+
+DB_INSTRUMENT=0 turns the cursor wrapping off entirely.
+
+Usage (main.py):
+  from db import instrumentation
+  instrumentation.init_app(app)
+"""
+import logging
+import os
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+import psycopg2.extensions
+import psycopg2.extras
+from flask import request
+
+from db import slow_queries
+
+log = logging.getLogger(__name__)
+
+INSTRUMENT_QUERIES = os.getenv("DB_INSTRUMENT", "1") == "1"
+QUERY_HEADER = os.getenv("DB_QUERY_HEADER", "0") == "1"
+REPEAT_WARN = int(os.getenv("DB_REPEAT_WARN", "10"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%(?:\(\w+\))?s")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_SPACE = re.compile(r"\s+")
+
+# Longer statements are fingerprinted without the cache. They're mostly
+# execute_values/mogrify output with the values inlined, so each one is new and
+# would only push the app's own statements out.
+MAX_CACHED_SQL = 2048
+
+
+def fingerprint(sql: str) -> str:
+    """The statement with values taken out, so the same query with other values matches."""
+    if len(sql) > MAX_CACHED_SQL:
+        return _fingerprint(sql)
+    return _cached_fingerprint(sql)
+
+
+def _fingerprint(sql: str) -> str:
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+_cached_fingerprint = lru_cache(maxsize=1024)(_fingerprint)
+
+
+class Query:
+    __slots__ = ("fingerprint", "sql", "started", "duration", "rows")
+
+    def __init__(self, fingerprint, sql, started, duration, rows):
+        self.fingerprint = fingerprint
+        self.sql = sql
+        self.started = started      # seconds since the request started
+        self.duration = duration    # seconds
+        self.rows = rows            # cursor.rowcount, -1 if unknown
+
+
+class RequestQueries:
+    """Everything the database did for one request."""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.queries = []
+        self.checkouts = 0
+        self.checkout_wait = 0.0
+        self.held = 0.0
+        self._held_since = {}
+        self._repeats = {}
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(query.duration for query in self.queries)
+
+    def record(self, sql, started, duration, rows):
+        fp = fingerprint(sql)
+        self.queries.append(Query(fp, sql, started - self.started, duration, rows))
+        repeats = self._repeats.get(fp, 0) + 1
+        self._repeats[fp] = repeats
+        if REPEAT_WARN and repeats == REPEAT_WARN:
+            log.warning("possible N+1 in %s: this query has run %d times so far: %s", self.label, repeats, fp)
+
+    def repeated(self, threshold=2):
+        """{fingerprint: count} for statements run at least `threshold` times."""
+        return {fp: n for fp, n in self._repeats.items() if n >= threshold}
+
+
+current_queries = ContextVar("current_queries", default=None)
+
+
+def record_checkout(connection, wait):
+    queries = current_queries.get()
+    if queries is not None:
+        queries.checkouts += 1
+        queries.checkout_wait += wait
+        queries._held_since[id(connection)] = time.perf_counter()
+
+
+def record_release(connection):
+    queries = current_queries.get()
+    if queries is not None:
+        since = queries._held_since.pop(id(connection), None)
+        if since is not None:
+            queries.held += time.perf_counter() - since
+
+
+class _Instrumented:
+    """Mixin timing execute()/executemany() into the current request's RequestQueries.
+
+    With DB_SLOW_QUERY_MS set, statements outside a request are timed too, so
+    slow ones reach db.slow_queries.
+    """
+
+    def execute(self, query, vars=None):
+        queries = current_queries.get()
+        if queries is None and not slow_queries.enabled():
+            return super().execute(query, vars)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._finished(queries, query, vars, started)
+
+    def executemany(self, query, vars_list):
+        queries = current_queries.get()
+        if queries is None and not slow_queries.enabled():
+            return super().executemany(query, vars_list)
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._finished(queries, query, None, started)
+
+    def _finished(self, queries, query, vars, started):
+        duration = time.perf_counter() - started
+        sql = self._sql_text(query)
+        if queries is not None:
+            queries.record(sql, started, duration, self.rowcount)
+        if slow_queries.enabled() and duration * 1000 >= slow_queries.SLOW_QUERY_MS:
+            try:
+                slow_queries.capture(self, sql, vars, duration, fingerprint(sql))
+            except Exception:
+                log.warning("could not capture slow query", exc_info=True)
+
+    def _sql_text(self, query):
+        if isinstance(query, bytes):
+            return query.decode("utf-8", "replace")
+        if isinstance(query, str):
+            return query
+        return query.as_string(self)  # psycopg2.sql.Composable
+
+
+class InstrumentedCursor(_Instrumented, psycopg2.extensions.cursor):
+    pass
+
+
+class InstrumentedDictCursor(_Instrumented, psycopg2.extras.RealDictCursor):
+    pass
+
+
+def server_timing(queries):
+    return (
+        f'db;dur={queries.db_time * 1000:.1f};desc="{queries.count} queries", '
+        f"db-wait;dur={queries.checkout_wait * 1000:.1f}"
+    )
+
+
+def init_app(app):
+    if not INSTRUMENT_QUERIES:
+        return
+
+    @app.before_request
+    def _start_query_log():
+        current_queries.set(RequestQueries(f"{request.method} {request.path}"))
+
+    @app.after_request
+    def _report_queries(response):
+        queries = current_queries.get()
+        if queries is not None:
+            if QUERY_HEADER:
+                response.headers["Server-Timing"] = server_timing(queries)
+            log.debug(
+                "%s: %d queries, %.1fms in database, %.1fms waiting for a connection, %.1fms holding one",
+                queries.label, queries.count, queries.db_time * 1000,
+                queries.checkout_wait * 1000, queries.held * 1000,
+            )
+        return response
+
+    @app.teardown_request
+    def _end_query_log(exc=None):
+        current_queries.set(None)
@@ -0,0 +1,81 @@
+"""Lightweight rows for list endpoints.
+
+RealDictCursor builds a dict per row in Python, column by column, which is most
+of the allocation cost of a wide list. A cursor from `transaction(tuples=True)`
+returns plain tuples instead. `fetch_records` then reads the column names once
+from `cursor.description` and wraps each tuple in a slotted dataclass. orjson
+serializes those directly, and with JSON_PROVIDER=default the stdlib provider turns
+each into a plain dict of its fields (see resources.json_provider), so
+`jsonify(records)` gives the same JSON objects as `jsonify(rows)` did.
+
+Records support `record["column"]` and `record.column`, so sort-key lambdas like
+`lambda r: (r["created_at"], r["gig_id"])` keep working.
+
+Usage:
+  with transaction(readonly=True, tuples=True) as cursor:
+      cursor.execute("SELECT gig_id, gig_name, created_at FROM gigs")
+      records = fetch_records(cursor)
+  return jsonify(records)
+
+Columns must have distinct names that are valid identifiers; alias them in SQL
+otherwise (`SELECT count(*) AS n`).
+"""
+from __future__ import annotations
+
+import dataclasses
+import operator
+from functools import lru_cache
+from typing import Any, Iterable, Sequence
+
+
+class Record:
+    """Base class for the dataclasses made by `record_type`."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def keys(self) -> tuple[str, ...]:
+        return self.__match_args__
+
+
+@lru_cache(maxsize=256)
+def record_type(fields: tuple[str, ...]) -> type[Record]:
+    """A slotted dataclass with these fields, made once per distinct column list.
+
+    Fields are declared in sorted order, matching the sorted keys of our JSON
+    responses, so `record_type(("b", "a"))(1, 2)` means a=1, b=2. Build records with
+    `to_records` rather than positionally.
+    """
+    if len(set(fields)) != len(fields):
+        raise ValueError(f"duplicate column names: {fields}")
+    try:
+        return dataclasses.make_dataclass("Row", sorted(fields), bases=(Record,), slots=True)
+    except TypeError as e:
+        raise ValueError(f"columns can't be used as record fields: {e}") from None
+
+
+def column_names(cursor) -> tuple[str, ...]:
+    return tuple(column.name for column in cursor.description)
+
+
+def to_records(rows: Iterable[Sequence[Any]], columns: Sequence[str],
+               fields: Sequence[str] | None = None) -> list[Record]:
+    """Wrap tuple rows laid out as `columns` in records with `fields` (default: all columns)."""
+    columns = tuple(columns)
+    cls = record_type(tuple(fields) if fields is not None else columns)
+    positions = [columns.index(name) for name in cls.__match_args__]
+    if len(positions) == 1:
+        position = positions[0]
+        return [cls(row[position]) for row in rows]
+    pick = operator.itemgetter(*positions)
+    return [cls(*pick(row)) for row in rows]
+
+
+def fetch_records(cursor) -> list[Record]:
+    """`fetchall()` from a tuple cursor as records."""
+    return to_records(cursor.fetchall(), column_names(cursor))
@@ -0,0 +1,93 @@
+"""Read-replica routing with read-your-writes stickiness.
+
+Handlers opt in with `transaction(readonly=True)` / `@with_cursor(readonly=True)`;
+those run on the replica when DB_REPLICA_HOST is set. After a user makes a
+successful POST/PATCH/PUT/DELETE, their reads go to the primary for
+DB_REPLICA_STICKY_SECONDS (default 5) so they always see their own changes
+even while the replica is catching up.
+
+The sticky deadline travels with the client as a signed, short-lived cookie
+(signed with JWT_SECRET_KEY, bound to the user's identity), so the next request
+stays on the primary whichever worker or instance it lands on. The frontend
+sends cookies with `credentials: "include"`.
+
+Usage (main.py):
+  from db import routing
+  routing.init_app(app)
+"""
+import os
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from db.db_pool import replica_allowed, replica_configured
+
+WRITE_METHODS = {"POST", "PATCH", "PUT", "DELETE"}
+STICKY_COOKIE = "db_sticky"
+
+
+def _current_identity():
+    # Only set once @jwt_required() has verified the token for this request.
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config["JWT_SECRET_KEY"], salt="db-routing-sticky")
+
+
+def _sticky_seconds():
+    return current_app.config["DB_REPLICA_STICKY_SECONDS"]
+
+
+def _replica_allowed():
+    identity = _current_identity()
+    token = request.cookies.get(STICKY_COOKIE)
+    if identity is None or not token:
+        return True
+    try:
+        # max_age rejects cookies older than the sticky window, however long the
+        # browser kept them.
+        sticky_identity = _serializer().loads(token, max_age=_sticky_seconds())
+    except BadSignature:  # includes SignatureExpired
+        return True
+    return sticky_identity != str(identity)
+
+
+def mark_sticky(response, identity):
+    """Send the cookie that keeps `identity`'s reads on the primary for the sticky window."""
+    seconds = _sticky_seconds()
+    response.set_cookie(
+        STICKY_COOKIE,
+        _serializer().dumps(str(identity)),
+        max_age=max(1, int(seconds)),
+        httponly=True,
+        samesite="Lax",
+        secure=request.is_secure,
+    )
+
+
+def init_app(app):
+    if not replica_configured():
+        return
+
+    app.config.setdefault("DB_REPLICA_STICKY_SECONDS", float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5")))
+
+    @app.before_request
+    def _route_reads():
+        replica_allowed.set(_replica_allowed)
+
+    @app.after_request
+    def _remember_writes(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            identity = _current_identity()
+            if identity is not None:
+                mark_sticky(response, identity)
+        return response
+
+    @app.teardown_request
+    def _reset_routing(exc=None):
+        replica_allowed.set(None)
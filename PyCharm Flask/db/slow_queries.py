@@ -0,0 +1,266 @@
+"""Slow query log with EXPLAIN capture.
+
+Any statement that takes longer than DB_SLOW_QUERY_MS (0 = off, the default) is
+recorded with its bound parameters and, rate-limited, its plan:
+
+- Reads (SELECT/WITH/VALUES without data-modifying parts or row locks) get
+  `EXPLAIN (ANALYZE, BUFFERS)`. Anything else gets a plain `EXPLAIN`, because
+  ANALYZE would run the write again. That includes SELECTs calling functions
+  whose effects a rollback doesn't undo, like `nextval()` (the bulk gig insert
+  takes its ids that way) or advisory locks.
+- EXPLAIN runs on a background thread over a separate connection to the same
+  database (primary or replica), never a pool connection. The transaction is
+  always rolled back, and DB_SLOW_EXPLAIN_TIMEOUT_MS (default 10000) caps how
+  long the plan may take.
+- At most DB_SLOW_EXPLAINS_PER_MINUTE plans (default 6) are captured, and at most
+  one per statement fingerprint every DB_SLOW_EXPLAIN_COOLDOWN seconds (default
+  300). Slow statements past those limits are still logged, without a plan.
+- Parameters are replaced by "[redacted]" for statements that mention a password,
+  and those get no plan, since EXPLAIN would need the values.
+
+Entries are written as JSON lines to DB_SLOW_LOG (default logs/slow_queries.log),
+rotated at 10MB with 5 backups. `summary()`, served at GET /admin/slow-queries,
+groups them by fingerprint.
+
+Statements are timed by db.instrumentation's cursors, so nothing is captured with
+DB_INSTRUMENT=0.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.extensions
+
+log = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "0"))
+SLOW_LOG = os.getenv("DB_SLOW_LOG", os.path.join("logs", "slow_queries.log"))
+EXPLAINS_PER_MINUTE = int(os.getenv("DB_SLOW_EXPLAINS_PER_MINUTE", "6"))
+EXPLAIN_COOLDOWN = float(os.getenv("DB_SLOW_EXPLAIN_COOLDOWN", "300"))
+EXPLAIN_TIMEOUT_MS = int(os.getenv("DB_SLOW_EXPLAIN_TIMEOUT_MS", "10000"))
+MAX_FINGERPRINTS = 500
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|VALUES|INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+_READ = re.compile(r"^\s*(SELECT|WITH|VALUES)\b", re.IGNORECASE)
+_WRITES = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE)\b|\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE
+)
+# Side effects that survive the rollback: sequences aren't transactional, and the rest
+# act outside the transaction too.
+_VOLATILE = re.compile(
+    r"\b(nextval|setval|pg_advisory\w*|pg_notify|pg_cancel_backend|pg_terminate_backend|dblink\w*)\s*\(",
+    re.IGNORECASE,
+)
+_SECRET = re.compile(r"password", re.IGNORECASE)
+
+
+def enabled():
+    return SLOW_QUERY_MS > 0
+
+
+class _Summary:
+    __slots__ = ("count", "total", "max", "last_seen", "last_plan", "last_plan_at")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last_seen = 0.0
+        self.last_plan = None
+        self.last_plan_at = float("-inf")
+
+
+_summaries = {}  # fingerprint -> _Summary
+_lock = threading.Lock()
+_recent_explains = []  # monotonic times of the explains started in the last minute
+_jobs = queue.Queue(maxsize=50)
+_worker = None
+_file_log = None
+
+
+def capture(cursor, query, vars, duration, fingerprint):
+    """Record a slow statement that just ran on `cursor`; called by db.instrumentation."""
+    redacted = vars is not None and _SECRET.search(query) is not None
+    sql = query
+    if vars is not None and not redacted:
+        try:
+            sql = cursor.mogrify(query, vars).decode("utf-8", "replace")
+        except Exception:
+            pass
+
+    entry = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "fingerprint": fingerprint,
+        "duration_ms": round(duration * 1000, 3),
+        "rows": cursor.rowcount,
+        "sql": sql,
+        "params": "[redacted]" if redacted else _params(vars),
+        "plan": None,
+    }
+
+    # A redacted statement still has its placeholders, so there's nothing to EXPLAIN.
+    explain = _take_explain_slot(fingerprint, duration) and not redacted and _EXPLAINABLE.match(sql) is not None
+    if explain:
+        pool = _pool_for(cursor.connection)
+        if pool is None or not _enqueue((entry, sql, pool)):
+            explain = False
+    if not explain:
+        _write(entry)
+
+
+def _params(vars):
+    if vars is None:
+        return None
+    try:
+        return json.loads(json.dumps(vars, default=str))
+    except (TypeError, ValueError):
+        return repr(vars)
+
+
+def _take_explain_slot(fingerprint, duration):
+    """Update the summary; True if a plan may be captured for this statement now."""
+    now = time.monotonic()
+    with _lock:
+        summary = _summaries.get(fingerprint)
+        if summary is None:
+            if len(_summaries) >= MAX_FINGERPRINTS:
+                del _summaries[min(_summaries, key=lambda fp: _summaries[fp].last_seen)]
+            summary = _summaries[fingerprint] = _Summary()
+        summary.count += 1
+        summary.total += duration
+        summary.max = max(summary.max, duration)
+        summary.last_seen = now
+
+        _recent_explains[:] = [t for t in _recent_explains if now - t < 60]
+        if len(_recent_explains) >= EXPLAINS_PER_MINUTE or now - summary.last_plan_at < EXPLAIN_COOLDOWN:
+            return False
+        _recent_explains.append(now)
+        summary.last_plan_at = now
+        return True
+
+
+def _pool_for(connection):
+    from db import db_pool
+
+    if db_pool.replica_pool is not None and db_pool.replica_pool.owns(connection):
+        return db_pool.replica_pool
+    return db_pool.pool
+
+
+def _enqueue(job):
+    global _worker
+    if _worker is None:
+        with _lock:
+            if _worker is None:
+                _worker = threading.Thread(target=_run_worker, name="slow-query-explain", daemon=True)
+                _worker.start()
+    try:
+        _jobs.put_nowait(job)
+        return True
+    except queue.Full:
+        return False
+
+
+def _run_worker():
+    connections = {}  # pool -> dedicated connection
+    while True:
+        entry, sql, pool = _jobs.get()
+        try:
+            connection = connections.get(pool)
+            if connection is None or connection.closed:
+                connection = connections[pool] = pool.connect()
+            entry["plan"] = explain(connection, sql)
+        except Exception as e:
+            entry["plan_error"] = str(e)
+            connection = connections.pop(pool, None)
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        _record_plan(entry)
+        _write(entry)
+        _jobs.task_done()
+
+
+def explain(connection, sql):
+    """The plan for `sql` (parameters already bound), run in a transaction that's rolled back."""
+    analyze = _READ.match(sql) is not None and _WRITES.search(sql) is None and _VOLATILE.search(sql) is None
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    try:
+        # A plain cursor: the EXPLAIN itself shouldn't come back here as a slow query.
+        with connection.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", (EXPLAIN_TIMEOUT_MS,))
+            cursor.execute(f"EXPLAIN ({options}) {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+    finally:
+        try:
+            connection.rollback()
+        except psycopg2.Error:
+            pass
+
+
+def _record_plan(entry):
+    with _lock:
+        summary = _summaries.get(entry["fingerprint"])
+        if summary is not None and entry.get("plan"):
+            summary.last_plan = entry["plan"]
+
+
+def _file_logger():
+    global _file_log
+    if _file_log is None:
+        with _lock:
+            if _file_log is None:
+                directory = os.path.dirname(SLOW_LOG)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    SLOW_LOG, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
+                )
+                # Not registered with logging, so the entries don't also reach the app's handlers.
+                file_log = logging.Logger("db.slow_queries.file", logging.INFO)
+                file_log.addHandler(handler)
+                _file_log = file_log
+    return _file_log
+
+
+def _write(entry):
+    try:
+        _file_logger().info(json.dumps(entry, default=str))
+    except Exception:
+        log.warning("could not write slow query log", exc_info=True)
+
+
+def summary():
+    """Slow statements grouped by fingerprint, most total time first."""
+    now = time.monotonic()
+    with _lock:
+        rows = [
+            {
+                "fingerprint": fingerprint,
+                "count": s.count,
+                "total_ms": round(s.total * 1000, 3),
+                "mean_ms": round(s.total / s.count * 1000, 3),
+                "max_ms": round(s.max * 1000, 3),
+                "last_seen_seconds_ago": round(now - s.last_seen, 1),
+                "last_plan": s.last_plan,
+            }
+            for fingerprint, s in _summaries.items()
+        ]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def reset():
+    """Forget the summary and rate-limit state (for tests)."""
+    with _lock:
+        _summaries.clear()
+        _recent_explains.clear()
@@ -0,0 +1,107 @@
+"""Server-side cursors for streaming large results.
+
+`fetchall()` pulls a whole result into memory before the first byte goes out.
+A RowStream runs the query on a named (server-side) psycopg2 cursor and hands
+rows out `batch_size` at a time with `fetchmany`, so memory stays bounded by
+one batch however large the result is.
+
+The connection stays checked out until the stream is closed, which happens once
+the response has been sent or the client goes away. Leaving the `with` block
+before `execute()` (e.g. to return a 403), or with an exception, releases it
+right away.
+
+Usage (in a blueprint, see resources.streaming):
+  with RowStream(readonly=True) as stream:
+      stream.execute("SELECT ... FROM employers ORDER BY created_at DESC")
+  return stream_response(stream, fmt)
+"""
+import itertools
+import logging
+import os
+
+import psycopg2
+
+from db.db_pool import checkout, cursor_factory, release_connection
+from db.records import column_names, to_records
+
+log = logging.getLogger(__name__)
+
+STREAM_BATCH_SIZE = int(os.getenv("DB_STREAM_BATCH", "500"))
+
+_names = itertools.count(1)
+
+
+class RowStream:
+    """One transaction with a server-side cursor whose rows are read in batches of records."""
+
+    def __init__(self, readonly=False, batch_size=None):
+        self.batch_size = batch_size or STREAM_BATCH_SIZE
+        self.columns = ()
+        self._connection = checkout(readonly)
+        self._cursors = []
+        self._named = None
+        self._first = None
+        self._failed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._failed = True
+        if exc_type is not None or self._named is None:
+            self.close()
+        return False
+
+    def cursor(self):
+        """A regular dict cursor in the same transaction, for lookups before `execute()`."""
+        cursor = self._connection.cursor(cursor_factory=cursor_factory())
+        self._cursors.append(cursor)
+        return cursor
+
+    def execute(self, sql, params=None):
+        """Open the server-side cursor and fetch the first batch, so errors surface here."""
+        self._named = self._connection.cursor(
+            name=f"stream_{next(_names)}", cursor_factory=cursor_factory(tuples=True)
+        )
+        self._named.itersize = self.batch_size
+        self._named.execute(sql, params)
+        self._first = self._named.fetchmany(self.batch_size)
+        # A named cursor only has a description once something has been fetched.
+        self.columns = column_names(self._named)
+
+    def __iter__(self):
+        """Lists of records (see db.records), one per batch; closes the stream at the end."""
+        try:
+            batch, self._first = self._first, None
+            while batch:
+                yield to_records(batch, self.columns)
+                if len(batch) < self.batch_size:
+                    break
+                batch = self._named.fetchmany(self.batch_size)
+        except BaseException:
+            self._failed = True
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            for cursor in [*self._cursors, self._named]:
+                if cursor is not None and not cursor.closed:
+                    cursor.close()
+            if self._failed:
+                connection.rollback()
+            else:
+                connection.commit()
+        except psycopg2.Error:
+            log.warning("error closing streamed query", exc_info=True)
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+        finally:
+            release_connection(connection)
@@ -3,6 +3,7 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from db import admission, instrumentation, routing
 from resources.users import users
 from resources.users_roles import users_roles
 from resources.roles import roles
@@ -19,11 +20,21 @@ from resources.application_status import application_status
 from resources.member_types import member_types
 from resources.uploads import uploads
 from resources.user_media import user_media
+from resources.meta import meta
+from resources import admin, json_provider, metrics, profiler
+from resources.pagination import NEXT_CURSOR_HEADER
 
 app = Flask(__name__)
-CORS(app)
+json_provider.init_app(app)
+# supports_credentials: the read-replica sticky cookie (db.routing) is sent cross-origin.
+CORS(app, expose_headers=[NEXT_CURSOR_HEADER], supports_credentials=True)
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
 JWTManager(app)
+instrumentation.init_app(app)
+metrics.init_app(app)
+profiler.init_app(app)
+admission.init_app(app)
+routing.init_app(app)
 
 # SECURITY
 # helmet => flask-talisman
@@ -45,6 +56,9 @@ app.register_blueprint(applications_roles, url_prefix='/applications-roles')
 app.register_blueprint(application_status, url_prefix='/application-status')
 app.register_blueprint(uploads, url_prefix='/uploads')
 app.register_blueprint(user_media, url_prefix='/users')
+app.register_blueprint(meta, url_prefix='/meta')
+app.register_blueprint(metrics.metrics, url_prefix='/metrics')
+app.register_blueprint(admin.admin, url_prefix='/admin')
 
 
 if __name__ == '__main__':
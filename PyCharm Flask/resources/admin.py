@@ -0,0 +1,57 @@
+"""Operator-only endpoints, for JWT identities listed in ADMIN_USER_IDS (comma separated).
+
+- GET /admin/slow-queries: statements over DB_SLOW_QUERY_MS grouped by
+  fingerprint, with their latest plan (see db.slow_queries). Statements are only
+  timed on instrumented cursors, so this stays empty with DB_INSTRUMENT=0.
+
+`admin_required` and `is_admin` are the admin check for other modules too
+(resources.profiler uses `is_admin` for `?profile=1`).
+"""
+import os
+from functools import wraps
+
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_request
+
+from db import instrumentation, slow_queries
+
+ADMIN_USER_IDS = {user_id.strip() for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+
+admin = Blueprint('admin', __name__)
+
+
+def _is_admin_identity(identity) -> bool:
+    return identity is not None and str(identity) in ADMIN_USER_IDS
+
+
+def is_admin() -> bool:
+    """True if the request has a valid JWT for an admin; never raises, for optional checks."""
+    if not ADMIN_USER_IDS:
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return False
+    return _is_admin_identity(identity)
+
+
+def admin_required(view):
+    """Like jwt_required(), plus a 403 unless the identity is in ADMIN_USER_IDS."""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not _is_admin_identity(get_jwt_identity()):
+            return jsonify({"error": "not authorized"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin.route('/slow-queries')
+@admin_required
+def get_slow_queries():
+    return jsonify({
+        "threshold_ms": slow_queries.SLOW_QUERY_MS,
+        "enabled": slow_queries.enabled() and instrumentation.INSTRUMENT_QUERIES,
+        "queries": slow_queries.summary(),
+    })
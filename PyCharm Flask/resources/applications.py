@@ -1,10 +1,24 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import PoolTimeout, transaction
+from db.records import column_names, fetch_records, to_records
+from db.streaming import RowStream
 import psycopg2
-
+from psycopg2.extras import execute_values
+
+from resources.pagination import (
+    NEXT_CURSOR_HEADER,
+    PaginationError,
+    cursor_int,
+    cursor_timestamp,
+    decode_cursor,
+    page_size,
+    split_page,
+)
+from resources.streaming import stream_format, stream_limit, stream_response
 from resources.validations.request import validate_json
 from resources.validations.schemas import (
+    ApplicationBulkStatusSchema,
     ApplicationCreateSchema,
     ApplicationDeleteSchema,
     ApplicationUpdateStatusSchema,
@@ -12,95 +26,200 @@ from resources.validations.schemas import (
 
 applications = Blueprint('applications', __name__)
 
+ALLOWED_FOR_EMPLOYER = {"accepted", "rejected", "shortlisted"}
+ALLOWED_FOR_USER = {"withdrawn", "applied"}
+
+MAX_BULK_UPDATES = 200
+
+# The gig (if the caller posted it) and its application count for every status.
+_GIG_HEADER_SQL = """
+    SELECT g.gig_id, g.gig_name, g.gig_date, g.type_name, g.gig_details,
+           (SELECT json_object_agg(s.status, COALESCE(c.n, 0))
+            FROM application_status s
+            LEFT JOIN (
+                SELECT status, count(*) AS n
+                FROM applications
+                WHERE gig_id = g.gig_id
+                GROUP BY status
+            ) c ON c.status = s.status) AS counts
+    FROM gigs g
+    WHERE g.gig_id = %s AND g.posted_by_user_id = %s
+"""
+
+APPLICANT_FIELDS = ("application_id", "user_id", "gig_id", "status", "applied_at", "applicant_name", "applicant_email")
+
+
+def _applicant_filters():
+    """WHERE clauses + params on `applications a` for the `status` and `cursor` query params."""
+    statuses = [s.strip() for s in request.args.get("status", "").split(",") if s.strip()]
+    after = decode_cursor(request.args.get("cursor"), cursor_timestamp, cursor_int)
+
+    where = []
+    params = []
+    if statuses:
+        where.append("a.status = ANY(%s)")
+        params.append(statuses)
+    if after:
+        where.append("(a.applied_at, a.application_id) < (%s::timestamptz, %s::bigint)")
+        params.extend(after)
+    return where, params
+
+
+def _with_total(counts):
+    counts = dict(counts or {})
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def _gig_applicants(cursor, gig_id, user_id):
+    """One page of applicants for a gig the caller posted, plus per-status totals.
+
+    Query params: `status` (comma separated), `limit`, `cursor`. Pages are ordered by
+    (applied_at, application_id) DESC. The gig, the totals for every status and the
+    page all come from one query; the gig columns ride along on each page row but are
+    only sent to the client once. Expects a tuple cursor (see db.records).
+    """
+    limit = page_size()
+    where, filter_params = _applicant_filters()
+    where.insert(0, "a.gig_id = h.gig_id")
+    params = [gig_id, user_id, *filter_params, limit + 1]
+
+    cursor.execute(
+        f"""
+        WITH h AS ({_GIG_HEADER_SQL})
+        SELECT h.gig_id, h.gig_name, h.gig_date, h.type_name, h.gig_details, h.counts,
+               p.application_id, p.user_id, p.status, p.applied_at, p.applicant_name, p.applicant_email
+        FROM h
+        LEFT JOIN LATERAL (
+            SELECT
+                a.application_id,
+                a.user_id,
+                a.status,
+                a.applied_at,
+                u.user_name AS applicant_name,
+                u.email AS applicant_email
+            FROM applications a
+            JOIN users u ON a.user_id = u.user_id
+            WHERE {" AND ".join(where)}
+            ORDER BY a.applied_at DESC, a.application_id DESC
+            LIMIT %s
+        ) p ON TRUE
+        ORDER BY p.applied_at DESC, p.application_id DESC
+        """,
+        params,
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return jsonify({"error": "not authorized"}), 403
+
+    columns = column_names(cursor)
+    first = dict(zip(columns, rows[0]))
+    gig = {key: first[key] for key in ("gig_id", "gig_name", "gig_date", "type_name", "gig_details")}
+    counts = _with_total(first["counts"])
+
+    # A gig with no (matching) applicants still comes back as one row of NULLs from the lateral join.
+    applicant_id = columns.index("application_id")
+    applicants = to_records((row for row in rows if row[applicant_id] is not None), columns, APPLICANT_FIELDS)
+    applicants, next_cursor = split_page(applicants, limit, lambda r: (r["applied_at"], r["application_id"]))
+
+    response = jsonify(gig=gig, counts=counts, applicants=applicants)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response, 200
+
+
+def _stream_gig_applicants(gig_id, user_id, fmt):
+    """Every applicant for a gig the caller posted (after `cursor`, up to an explicit
+    `limit`), streamed; see resources.streaming for the body format."""
+    limit = stream_limit()
+    where, params = _applicant_filters()
+    where.insert(0, "a.gig_id = %s")
+
+    with RowStream(readonly=True) as stream:
+        cursor = stream.cursor()
+        cursor.execute(_GIG_HEADER_SQL, (gig_id, user_id))
+        header = cursor.fetchone()
+        if header is None:
+            return jsonify({"error": "not authorized"}), 403
+
+        stream.execute(
+            f"""
+            SELECT a.application_id, a.user_id, a.gig_id, a.status, a.applied_at,
+                   u.user_name AS applicant_name, u.email AS applicant_email
+            FROM applications a
+            JOIN users u ON a.user_id = u.user_id
+            WHERE {" AND ".join(where)}
+            ORDER BY a.applied_at DESC, a.application_id DESC
+            LIMIT %s
+            """,
+            (gig_id, *params, limit),
+        )
+
+    gig = {key: header[key] for key in ("gig_id", "gig_name", "gig_date", "type_name", "gig_details")}
+    envelope = {"gig": gig, "counts": _with_total(header["counts"])}
+    return stream_response(stream, fmt, envelope=envelope, key="applicants")
+
+
 @applications.route("/", methods=["GET"])
 @jwt_required()
 def get_application():
     user_id = int(get_jwt_identity())
     gig_id_raw = request.args.get("gig_id")
-    conn, cursor = get_cursor()
+
+    gig_id = None
+    if gig_id_raw is not None:
+        try:
+            gig_id = int(gig_id_raw)
+        except ValueError:
+            return jsonify({"error": "gig_id must be an integer"}), 400
 
     try:
-        # Employer view: list applicants for a specific gig you posted
-        if gig_id_raw is not None:
-            try:
-                gig_id = int(gig_id_raw)
-            except ValueError:
-                return jsonify({"error": "gig_id must be an integer"}), 400
+        fmt = stream_format()
+        if gig_id is not None and fmt:
+            return _stream_gig_applicants(gig_id, user_id, fmt)
 
-            cursor.execute(
-                """
-                SELECT 1
-                FROM gigs
-                WHERE posted_by_user_id = %s AND gig_id = %s
-                """,
-                (user_id, gig_id),
-            )
-            posted = cursor.fetchone()
-            if not posted:
-                return jsonify({"error": "not authorized"}), 403
+        with transaction(readonly=True, tuples=True) as cursor:
+            # Employer view: list applicants for a specific gig you posted
+            if gig_id is not None:
+                return _gig_applicants(cursor, gig_id, user_id)
 
+            # User view: my applications
             cursor.execute(
                 """
                 SELECT
                     a.application_id,
-                    a.user_id,
                     a.gig_id,
                     a.status,
                     a.applied_at,
-                    u.user_name AS applicant_name,
-                    u.email AS applicant_email,
                     g.gig_name,
                     g.gig_date,
                     g.type_name,
                     g.gig_details
                 FROM applications a
-                JOIN users u ON a.user_id = u.user_id
                 JOIN gigs g ON a.gig_id = g.gig_id
-                WHERE a.gig_id = %s
+                WHERE a.user_id = %s
                 ORDER BY a.applied_at DESC
                 """,
-                (gig_id,),
+                (user_id,),
             )
 
-            applicants = cursor.fetchall() or []
-            return jsonify(applicants), 200
+            applied = fetch_records(cursor)
+            return jsonify(applied), 200
 
-        # User view: my applications
-        cursor.execute(
-            """
-            SELECT
-                a.application_id,
-                a.gig_id,
-                a.status,
-                a.applied_at,
-                g.gig_name,
-                g.gig_date,
-                g.type_name,
-                g.gig_details
-            FROM applications a
-            JOIN gigs g ON a.gig_id = g.gig_id
-            WHERE a.user_id = %s
-            ORDER BY a.applied_at DESC
-            """,
-            (user_id,),
-        )
-
-        applied = cursor.fetchall() or []
-        return jsonify(applied), 200
-
-    except Exception as e:
-        # During debugging, log the error so you don't silently swallow SQL issues
-        print("get_application error:", e)
-        return jsonify([]), 200
-
-    finally:
-        release_connection(conn)
+    except PaginationError as e:
+        return jsonify(status="error", msg=str(e)), 400
+    except PoolTimeout:
+        raise
+    except psycopg2.Error:
+        # A failed query must not look like "no applications".
+        current_app.logger.exception("could not list applications")
+        return jsonify(status="error", msg="could not load applications"), 500
 
 
 @applications.route('/', methods=['POST'])
 @jwt_required()
 def create_application():
-    data, err, status = validate_json(ApplicationCreateSchema())
+    data, err, status = validate_json(ApplicationCreateSchema)
     if err:
         return err, status
 
@@ -108,74 +227,139 @@ def create_application():
 
     user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-
     try:
-        cursor.execute(
-            """
-            INSERT INTO applications (gig_id, user_id)
-            VALUES (%s, %s)
-            RETURNING application_id, user_id, gig_id, status, applied_at""",
-            (gig_id, user_id)
-        )
-        applied = cursor.fetchone()
+        with transaction() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO applications (gig_id, user_id)
+                VALUES (%s, %s)
+                RETURNING application_id, user_id, gig_id, status, applied_at""",
+                (gig_id, user_id)
+            )
+            applied = cursor.fetchone()
 
         if not applied:
             return jsonify({'application failed'}), 400
 
-        conn.commit()
         return jsonify(status="applied", application=applied)
 
     except psycopg2.errors.ForeignKeyViolation:
-        conn.rollback()
         return jsonify({'application failed'}), 400
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
         return jsonify({'application already exists'}), 400
 
-    finally:
-        release_connection(conn)
-
 
 
 @applications.route('/', methods=['DELETE'])
 @jwt_required()
 def delete_application():
-    data, err, status = validate_json(ApplicationDeleteSchema())
+    data, err, status = validate_json(ApplicationDeleteSchema)
     if err:
         return err, status
 
     gig_id = data.get('gig_id')
     user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
 
-    try:
+    with transaction() as cursor:
         cursor.execute(
             """
             DELETE FROM applications WHERE user_id = %s AND gig_id = %s""",
             (user_id, gig_id)
         )
-        conn.commit()
-        return jsonify(status="deleted"), 200
-    finally:
-        release_connection(conn)
+    return jsonify(status="deleted"), 200
+
+@applications.route('/bulk', methods=['PATCH'])
+@jwt_required()
+def update_applications_bulk():
+    """Set the status of many applications to gigs the caller posted.
+
+    Body: [{"application_id": 1, "status": "shortlisted"}, ...]. Items the caller
+    can't change are reported and skipped; the rest are updated together. Returns
+    one result per item, in request order.
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list) and len(payload) > MAX_BULK_UPDATES:
+        return jsonify(status="error", msg=f"at most {MAX_BULK_UPDATES} updates per request"), 400
+
+    items, err, status = validate_json(ApplicationBulkStatusSchema, many=True)
+    if err:
+        return err, status
+
+    current_user_id = int(get_jwt_identity())
+    results = [{"application_id": item["application_id"]} for item in items]
+
+    with transaction() as cursor:
+        # Ownership for the whole batch in one query
+        cursor.execute(
+            """
+            SELECT a.application_id, g.posted_by_user_id
+            FROM applications a
+            JOIN gigs g ON a.gig_id = g.gig_id
+            WHERE a.application_id = ANY(%s)
+            """,
+            ([item["application_id"] for item in items],)
+        )
+        posted_by = {row["application_id"]: row["posted_by_user_id"] for row in cursor.fetchall()}
+
+        changes = {}
+        seen = set()
+        for item, result in zip(items, results):
+            application_id = item["application_id"]
+            # Every repeat is an error, even when the first copy was rejected.
+            if application_id in seen:
+                result["error"] = "Application listed more than once"
+            elif application_id not in posted_by:
+                result["error"] = "Application not found"
+            elif int(posted_by[application_id]) != current_user_id:
+                result["error"] = "not authorized"
+            elif item["status"] not in ALLOWED_FOR_EMPLOYER:
+                result["error"] = f"Employers cannot set status '{item['status']}'"
+            else:
+                changes[application_id] = item["status"]
+            seen.add(application_id)
+
+        updated = {}
+        if changes:
+            rows = execute_values(
+                cursor,
+                """
+                UPDATE applications AS a
+                SET status = v.status
+                FROM (VALUES %s) AS v(application_id, status)
+                WHERE a.application_id = v.application_id
+                RETURNING a.application_id, a.user_id, a.gig_id, a.status, a.applied_at
+                """,
+                list(changes.items()),
+                template="(%s::bigint, %s)",
+                page_size=len(changes),
+                fetch=True,
+            )
+            updated = {row["application_id"]: row for row in rows}
+
+    for result in results:
+        if "error" in result:
+            result["status"] = "error"
+        else:
+            result["status"] = "ok"
+            result["application"] = updated.get(result["application_id"])
+
+    return jsonify(results=results), 200
 
 @applications.route('/<application_id>', methods=['PATCH'])
 @jwt_required()
 def update_application(application_id):
-    data, err, status = validate_json(ApplicationUpdateStatusSchema())
+    data, err, status = validate_json(ApplicationUpdateStatusSchema)
     if err:
         return err, status
 
     new_status = data.get('status')
     current_user_id = int(get_jwt_identity())
 
-    allowed_for_employer = {"accepted", "rejected", "shortlisted"}
+    allowed_for_employer = ALLOWED_FOR_EMPLOYER
     # NOTE: this was previously a single string inside a set; keep intended values.
-    allowed_for_user = {"withdrawn", "applied"}
+    allowed_for_user = ALLOWED_FOR_USER
 
-    conn, cursor = get_cursor()
-    try:
+    with transaction() as cursor:
         # Load the application + ownership info in one query
         cursor.execute(
             """
@@ -223,14 +407,5 @@ def update_application(application_id):
             (new_status, application_id)
         )
         updated = cursor.fetchone()
-        conn.commit()
-
-        return jsonify(updated), 200
-
-    finally:
-        release_connection(conn)
-
-
-
-
 
+    return jsonify(updated), 200
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import transaction, with_cursor
+from db.records import fetch_records
+from db.streaming import RowStream
 import psycopg2
 
+from resources.streaming import stream_format, stream_response
 from resources.validations.request import validate_json
 from resources.validations.schemas import EmployerCreateSchema, EmployerUpdateSchema
 
@@ -11,7 +14,7 @@ employers = Blueprint("employers", __name__)
 @employers.route("/", methods=["POST"])
 @jwt_required()
 def create_employer():
-    data, err, status = validate_json(EmployerCreateSchema())
+    data, err, status = validate_json(EmployerCreateSchema)
     if err:
         return err, status
 
@@ -21,47 +24,48 @@ def create_employer():
     email = data.get("email")
     phone = data.get("phone")
 
-    conn, cursor = get_cursor()
     try:
-        cursor.execute(
-            """
-            INSERT INTO employers (employer_name, description, website, email, phone)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING employer_id, employer_name, description, website, email, phone, created_at
-            """,
-            (employer_name, description, website, email, phone),
-        )
-        # RETURNING IS REQUIRED since we want to fetch immediately
-        employer = cursor.fetchone()
-        conn.commit()
-    except psycopg2.error.UniqueViolation:
-        conn.rollback()
-        release_connection(conn)
+        with transaction() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO employers (employer_name, description, website, email, phone)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING employer_id, employer_name, description, website, email, phone, created_at
+                """,
+                (employer_name, description, website, email, phone),
+            )
+            # RETURNING IS REQUIRED since we want to fetch immediately
+            employer = cursor.fetchone()
+    except psycopg2.errors.UniqueViolation:
         return jsonify(status="error", msg="company already registered"), 400
 
-    release_connection(conn)
     return jsonify(status="ok", employer=employer), 201
 
 @employers.route("/")
 @jwt_required()
 def get_employers():
-    conn, cursor = get_cursor()
-    cursor.execute(
-        """
+    sql = """
         SELECT employer_id, employer_name, description, website, email, phone, created_at
         FROM employers
         ORDER BY created_at DESC
         """
-    )
-    employers = cursor.fetchall()
-    release_connection(conn)
+
+    fmt = stream_format()
+    if fmt:
+        with RowStream(readonly=True) as stream:
+            stream.execute(sql)
+        return stream_response(stream, fmt)
+
+    with transaction(readonly=True, tuples=True) as cursor:
+        cursor.execute(sql)
+        employers = fetch_records(cursor)
 
     return jsonify(employers), 200
 
 @employers.route("/<employer_id>")
 @jwt_required()
-def get_employer(employer_id):
-    conn, cursor = get_cursor()
+@with_cursor(readonly=True)
+def get_employer(cursor, employer_id):
     cursor.execute(
         """
         SELECT employer_id, employer_name, description, website, email, phone, created_at
@@ -71,7 +75,6 @@ def get_employer(employer_id):
         (employer_id,),
     )
     found = cursor.fetchone()
-    release_connection(conn)
 
     if not found:
         return jsonify(status="error", msg="employer not found"), 404
@@ -81,7 +84,7 @@ def get_employer(employer_id):
 @employers.route("/<employer_id>", methods=["PATCH"])
 @jwt_required()
 def update_employer(employer_id):
-    data, err, status = validate_json(EmployerUpdateSchema(), partial=True)
+    data, err, status = validate_json(EmployerUpdateSchema, partial=True)
     if err:
         return err, status
 
@@ -91,25 +94,22 @@ def update_employer(employer_id):
     email = data.get("email")
     phone = data.get("phone")
 
-    conn, cursor = get_cursor()
-
-    cursor.execute(
-        """
-        UPDATE employers
-        SET employer_name = COALESCE(%s, employer_name),
-            description   = COALESCE(%s, description),
-            website       = COALESCE(%s, website),
-            email         = COALESCE(%s, email),
-            phone         = COALESCE(%s, phone)
-        WHERE employer_id = %s
-        RETURNING employer_id, employer_name, description, website, email, phone, created_at
-        """,
-        (employer_name, description, website, email, phone, employer_id),
-    )
+    with transaction() as cursor:
+        cursor.execute(
+            """
+            UPDATE employers
+            SET employer_name = COALESCE(%s, employer_name),
+                description   = COALESCE(%s, description),
+                website       = COALESCE(%s, website),
+                email         = COALESCE(%s, email),
+                phone         = COALESCE(%s, phone)
+            WHERE employer_id = %s
+            RETURNING employer_id, employer_name, description, website, email, phone, created_at
+            """,
+            (employer_name, description, website, email, phone, employer_id),
+        )
 
-    updated = cursor.fetchone()
-    conn.commit()
-    release_connection(conn)
+        updated = cursor.fetchone()
 
     if not updated:
         return jsonify(status="error", msg="employer not found"), 404
@@ -119,13 +119,9 @@ def update_employer(employer_id):
 @employers.route("/<employer_id>", methods=["DELETE"])
 @jwt_required()
 def delete_employer(employer_id):
-    conn, cursor = get_cursor()
-
-    cursor.execute("DELETE FROM employers WHERE employer_id = %s", (employer_id,))
-    conn.commit()
-
-    found = cursor.rowcount
-    release_connection(conn)
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM employers WHERE employer_id = %s", (employer_id,))
+        found = cursor.rowcount
 
     if found == 0:
         return jsonify(status="error", msg="employer not found"), 404
@@ -1,21 +1,9 @@
-from flask import jsonify, Blueprint
-from db.db_pool import get_cursor, release_connection
+from flask import Blueprint
+
+from resources import reference_cache
 
 event_types = Blueprint('event_types', __name__)
 
 @event_types.route('/')
 def get_event_types():
-    conn, cursor = get_cursor()
-
-    cursor.execute(
-        """
-        SELECT type_name
-        FROM event_types
-        ORDER BY type_name ASC
-        """
-    )
-    results = cursor.fetchall()
-
-    release_connection(conn)
-
-    return jsonify([r["type_name"] for r in results]), 200
+    return reference_cache.reference_response("event_types")
@@ -1,17 +1,32 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import PoolTimeout, transaction, with_cursor
+from db.records import fetch_records
+from db.streaming import RowStream
 import psycopg2
-
+from psycopg2.extras import execute_values
+
+from resources.pagination import (
+    PaginationError,
+    cursor_float,
+    cursor_int,
+    cursor_timestamp,
+    decode_cursor,
+    page_response,
+    page_size,
+)
+from resources.streaming import stream_format, stream_limit, stream_response
 from resources.validations.request import validate_json
-from resources.validations.schemas import GigCreateSchema, GigUpdateSchema
+from resources.validations.schemas import GigBulkCreateSchema, GigCreateSchema, GigUpdateSchema
 
 gigs = Blueprint("gigs", __name__)
 
+MAX_BULK_GIGS = 100
+
 @gigs.route("/", methods=["POST"])
 @jwt_required()
 def create_gig():
-    data, err, status = validate_json(GigCreateSchema())
+    data, err, status = validate_json(GigCreateSchema)
     if err:
         return err, status
 
@@ -23,38 +38,151 @@ def create_gig():
 
     posted_by_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
     try:
-        cursor.execute(
-            """
-            INSERT INTO gigs (gig_name, gig_date, gig_details, type_name, employer_id, posted_by_user_id)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING gig_id, gig_name, gig_date, gig_details, created_at, type_name, employer_id, posted_by_user_id
-            """,
-            (gig_name, gig_date, gig_details, type_name, employer_id, posted_by_user_id)
-        )
-        gig = cursor.fetchone()
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO gigs (gig_name, gig_date, gig_details, type_name, employer_id, posted_by_user_id)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                RETURNING gig_id, gig_name, gig_date, gig_details, created_at, type_name, employer_id, posted_by_user_id
+                """,
+                (gig_name, gig_date, gig_details, type_name, employer_id, posted_by_user_id)
+            )
+            gig = cursor.fetchone()
 
     except psycopg2.errors.ForeignKeyViolation:
-        conn.rollback()
-        release_connection(conn)
         return jsonify(status="error", msg="invalid type_name/employer_id/posted_by_user_id"), 400
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
-        release_connection(conn)
         return jsonify(status="error", msg="gig already posted"), 400
 
-    release_connection(conn)
     return jsonify(status="ok", gig=gig), 201
 
-# NOTE: GET requests should avoid using body. Use query strings
-@gigs.route("/")
+def _bulk_reference_errors(cursor, items):
+    """Per-item errors for type_name/employer_id/role_name values that don't exist.
+
+    Checked up front (three queries for the whole batch) so the caller learns about
+    every bad item at once instead of just the first foreign key violation.
+    """
+    type_names = list({item["type_name"] for item in items})
+    employer_ids = list({item["employer_id"] for item in items})
+    role_names = list({role["role_name"] for item in items for role in item["roles"]})
+
+    cursor.execute("SELECT type_name FROM event_types WHERE type_name = ANY(%s)", (type_names,))
+    known_types = {row["type_name"] for row in cursor.fetchall()}
+    cursor.execute("SELECT employer_id FROM employers WHERE employer_id = ANY(%s)", (employer_ids,))
+    known_employers = {row["employer_id"] for row in cursor.fetchall()}
+    cursor.execute("SELECT role_name FROM roles WHERE role_name = ANY(%s)", (role_names,))
+    known_roles = {row["role_name"] for row in cursor.fetchall()}
+
+    errors = {}
+    for index, item in enumerate(items):
+        item_errors = {}
+        if item["type_name"] not in known_types:
+            item_errors["type_name"] = ["Unknown event type."]
+        if item["employer_id"] not in known_employers:
+            item_errors["employer_id"] = ["Unknown employer."]
+
+        seen = set()
+        for role_index, role in enumerate(item["roles"]):
+            role_name = role["role_name"]
+            if role_name not in known_roles:
+                item_errors.setdefault("roles", {})[role_index] = {"role_name": ["Unknown role."]}
+            elif role_name in seen:
+                item_errors.setdefault("roles", {})[role_index] = {"role_name": ["Role listed twice."]}
+            seen.add(role_name)
+
+        if item_errors:
+            errors[index] = item_errors
+    return errors
+
+
+@gigs.route("/bulk", methods=["POST"])
 @jwt_required()
-def get_gigs():
+def create_gigs_bulk():
+    """Create many gigs, each with its roles, in a single transaction.
+
+    Body: a JSON list of GigCreateSchema objects, each with an optional "roles" list
+    of GigRoleCreateSchema objects (without gig_id). Either every gig is created or
+    none is; errors are keyed by the index of the offending item.
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list) and len(payload) > MAX_BULK_GIGS:
+        return jsonify(status="error", msg=f"at most {MAX_BULK_GIGS} gigs per request"), 400
+
+    items, err, status = validate_json(GigBulkCreateSchema, many=True)
+    if err:
+        return err, status
+    if not items:
+        return jsonify(status="error", msg="no gigs given"), 400
+
+    posted_by_user_id = int(get_jwt_identity())
+
+    try:
+        with transaction() as cursor:
+            errors = _bulk_reference_errors(cursor, items)
+            if errors:
+                return jsonify(status="error", msg="Validation error", errors=errors), 422
+
+            # Take the ids from the sequence first and insert them explicitly: RETURNING
+            # order isn't guaranteed to follow VALUES order, so it can't tie roles to gigs.
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence('gigs', 'gig_id')) AS gig_id FROM generate_series(1, %s)",
+                (len(items),),
+            )
+            gig_ids = [row["gig_id"] for row in cursor.fetchall()]
+
+            execute_values(
+                cursor,
+                """
+                INSERT INTO gigs (gig_id, gig_name, gig_date, gig_details, type_name, employer_id, posted_by_user_id)
+                VALUES %s
+                """,
+                [
+                    (gig_id, item["gig_name"], item["gig_date"], item["gig_details"],
+                     item["type_name"], item["employer_id"], posted_by_user_id)
+                    for gig_id, item in zip(gig_ids, items)
+                ],
+                page_size=len(items),
+            )
+
+            role_rows = [
+                (gig_id, role["role_name"], role["needed_count"], role["pay_amount"],
+                 role["pay_currency"], role["pay_unit"])
+                for gig_id, item in zip(gig_ids, items)
+                for role in item["roles"]
+            ]
+            if role_rows:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO gigs_roles (gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit)
+                    VALUES %s
+                    """,
+                    role_rows,
+                    page_size=1000,
+                )
+
+    except psycopg2.errors.ForeignKeyViolation:
+        return jsonify(status="error", msg="invalid type_name/employer_id/role_name"), 400
+    except psycopg2.errors.UniqueViolation:
+        return jsonify(status="error", msg="gig already posted"), 400
+    except psycopg2.DataError:
+        # The schemas follow the column sizes, so this only happens if the two drift apart.
+        current_app.logger.exception("bulk gig insert rejected a value")
+        return jsonify(status="error", msg="a value does not fit its column"), 422
+
+    return jsonify(status="ok", gig_ids=gig_ids), 201
+
+def _gig_list_filters():
+    """WHERE clauses + params for the gig list filters and the keyset cursor.
+
+    Pages are ordered by (created_at, gig_id) DESC; see SQL Commands/GigsPagination.sql
+    for the indexes that make every page an index range scan.
+    """
     employer_id = request.args.get("employer_id")
     type_name = request.args.get("type_name")
     posted_by_user_id = request.args.get("posted_by_user_id")
+    after = decode_cursor(request.args.get("cursor"), cursor_timestamp, cursor_int)
 
     where = []
     params = []
@@ -68,51 +196,186 @@ def get_gigs():
     if posted_by_user_id:
         where.append("g.posted_by_user_id = %s")
         params.append(int(posted_by_user_id))
+    if after:
+        where.append("(g.created_at, g.gig_id) < (%s::timestamptz, %s::bigint)")
+        params.extend(after)
+
+    return where, params
+
+
+# NOTE: GET requests should avoid using body. Use query strings
+@gigs.route("/")
+@jwt_required()
+def get_gigs():
+    fmt = stream_format()
+    try:
+        # Streamed lists aren't paged, so their limit isn't clamped to a page size.
+        limit = stream_limit() if fmt else page_size()
+        where, params = _gig_list_filters()
+    except PaginationError as e:
+        return jsonify(status="error", msg=str(e)), 400
 
     # THIS IS ABIT SIAO
     # " AND ".join(where) joins the [list] as X AND Y AND Z
     # WHERE X AND Y AND Z if (condition: list exists) else "" (give an empty string)
     where_sql = (" WHERE " + " AND ".join(where)) if where else ""
-
-    conn, cursor = get_cursor()
-    cursor.execute(
-        f"""
+    sql = f"""
         SELECT g.gig_id, g.gig_name, g.gig_date, g.gig_details, g.created_at,
                g.type_name, g.employer_id, g.posted_by_user_id
         FROM gigs g
         {where_sql}
-        ORDER BY g.created_at DESC
-        """,
-        tuple(params)
-    )
-    rows = cursor.fetchall()
-    release_connection(conn)
+        ORDER BY g.created_at DESC, g.gig_id DESC
+        LIMIT %s
+        """
 
-    return jsonify(rows), 200
+    # Streamed lists aren't paged: every matching gig (after `cursor`, up to an explicit
+    # `limit`) is sent. LIMIT NULL means no limit.
+    if fmt:
+        with RowStream(readonly=True) as stream:
+            stream.execute(sql, (*params, limit))
+        return stream_response(stream, fmt)
 
-@gigs.route("/mygigs")
+    with transaction(readonly=True, tuples=True) as cursor:
+        cursor.execute(sql, (*params, limit + 1))
+        rows = fetch_records(cursor)
+
+    return page_response(rows, limit, lambda r: (r["created_at"], r["gig_id"]))
+
+@gigs.route("/feed")
 @jwt_required()
-def get_all_gigs_posted():
+def get_gig_feed():
+    """Gigs with their roles and the caller's own application, in one query.
+
+    Takes the same filters and cursor as GET /gigs/, plus `?role=dancer` (comma
+    separated for several) to only return gigs that need one of those roles.
+    Replaces GET /gigs/ + one GET /gigs-roles/<id> per gig + GET /applications/.
+    """
     user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
+    roles = [r.strip().lower() for r in request.args.get("role", "").split(",") if r.strip()]
 
     try:
+        limit = page_size()
+        where, params = _gig_list_filters()
+    except PaginationError as e:
+        return jsonify(status="error", msg=str(e)), 400
+
+    if roles:
+        where.append(
+            "EXISTS (SELECT 1 FROM gigs_roles fr WHERE fr.gig_id = g.gig_id AND fr.role_name = ANY(%s))"
+        )
+        params.append(roles)
+
+    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+
+    with transaction(readonly=True) as cursor:
+        # pay_amount is sent as text to match what GET /gigs-roles/<id> returns.
         cursor.execute(
-            """
-            SELECT g.gig_id, g.gig_name, g.gig_date, g.gig_details
+            f"""
+            SELECT g.gig_id, g.gig_name, g.gig_date, g.gig_details, g.created_at,
+                   g.type_name, g.employer_id, g.posted_by_user_id,
+                   COALESCE(r.roles, '[]'::json) AS roles,
+                   CASE WHEN a.application_id IS NULL THEN NULL
+                        ELSE json_build_object('application_id', a.application_id, 'status', a.status)
+                   END AS my_application
             FROM gigs g
-            WHERE g.posted_by_user_id = %s""",
-            (user_id,)
+            LEFT JOIN LATERAL (
+                SELECT json_agg(
+                           json_build_object(
+                               'role_name', gr.role_name,
+                               'needed_count', gr.needed_count,
+                               'pay_amount', gr.pay_amount::text,
+                               'pay_currency', gr.pay_currency,
+                               'pay_unit', gr.pay_unit
+                           )
+                           ORDER BY gr.role_name
+                       ) AS roles
+                FROM gigs_roles gr
+                WHERE gr.gig_id = g.gig_id
+            ) r ON TRUE
+            LEFT JOIN applications a ON a.gig_id = g.gig_id AND a.user_id = %s
+            {where_sql}
+            ORDER BY g.created_at DESC, g.gig_id DESC
+            LIMIT %s
+            """,
+            (user_id, *params, limit + 1)
+        )
+        rows = cursor.fetchall()
+
+    return page_response(rows, limit, lambda r: (r["created_at"], r["gig_id"]))
+
+@gigs.route("/search")
+@jwt_required()
+def search_gigs():
+    """Ranked full-text search over gig name, event type and details.
+
+    `?q=` uses web-search syntax ("quoted phrases", -exclusions, or). Results are
+    ordered by relevance and paginated with the same cursor scheme as GET /gigs/.
+    Needs SQL Commands/GigsSearch.sql.
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify(status="error", msg="missing search query q"), 400
+
+    try:
+        limit = page_size(default=20, maximum=50)
+        after = decode_cursor(request.args.get("cursor"), cursor_float, cursor_int)
+    except PaginationError as e:
+        return jsonify(status="error", msg=str(e)), 400
+
+    after_sql = "WHERE (r.rank, r.gig_id) < (%s::float8, %s::bigint)" if after else ""
+
+    with transaction(readonly=True) as cursor:
+        # Headlines are the expensive part, so they're only built for the rows on this page.
+        cursor.execute(
+            f"""
+            WITH ranked AS (
+                SELECT g.gig_id, g.gig_name, g.gig_date, g.gig_details, g.created_at,
+                       g.type_name, g.employer_id, g.posted_by_user_id,
+                       ts_rank(g.search_vector, query)::float8 AS rank,
+                       query
+                FROM gigs g, websearch_to_tsquery('english', %s) AS query
+                WHERE g.search_vector @@ query
+            ), page AS (
+                SELECT r.*
+                FROM ranked r
+                {after_sql}
+                ORDER BY r.rank DESC, r.gig_id DESC
+                LIMIT %s
+            )
+            SELECT gig_id, gig_name, gig_date, gig_details, created_at,
+                   type_name, employer_id, posted_by_user_id, rank,
+                   ts_headline('english', gig_name, query,
+                               'HighlightAll=true, StartSel=<mark>, StopSel=</mark>') AS gig_name_highlight,
+                   ts_headline('english', coalesce(gig_details, ''), query,
+                               'MaxFragments=2, MaxWords=20, MinWords=5, StartSel=<mark>, StopSel=</mark>') AS snippet
+            FROM page
+            ORDER BY rank DESC, gig_id DESC
+            """,
+            (q, *(after or ()), limit + 1)
         )
         rows = cursor.fetchall()
-        return jsonify(rows), 200
-    finally:
-        release_connection(conn)
+
+    return page_response(rows, limit, lambda r: (r["rank"], r["gig_id"]))
+
+@gigs.route("/mygigs")
+@jwt_required()
+@with_cursor(readonly=True, tuples=True)
+def get_all_gigs_posted(cursor):
+    user_id = int(get_jwt_identity())
+    cursor.execute(
+        """
+        SELECT g.gig_id, g.gig_name, g.gig_date, g.gig_details
+        FROM gigs g
+        WHERE g.posted_by_user_id = %s""",
+        (user_id,)
+    )
+    rows = fetch_records(cursor)
+    return jsonify(rows), 200
 
 @gigs.route("/<gig_id>", methods=["PATCH"])
 @jwt_required()
 def update_gig(gig_id):
-    data, err, status = validate_json(GigUpdateSchema(), partial=True)
+    data, err, status = validate_json(GigUpdateSchema, partial=True)
     if err:
         return err, status
 
@@ -124,58 +387,50 @@ def update_gig(gig_id):
 
     current_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-
-    # Ensure gig exists and is owned by current user
-    cursor.execute(
-        "SELECT posted_by_user_id FROM gigs WHERE gig_id = %s",
-        (gig_id,)
-    )
-    row = cursor.fetchone()
-    if not row:
-        release_connection(conn)
-        return jsonify(status="error", msg="gig not found"), 404
-
-    if int(row["posted_by_user_id"]) != current_user_id:
-        release_connection(conn)
-        return jsonify(status="error", msg="not allowed to update this gig"), 403
-
     try:
-        cursor.execute(
-            """
-            UPDATE gigs
-            SET gig_name   = COALESCE(%s, gig_name),
-                gig_date   = COALESCE(%s, gig_date),
-                gig_details= COALESCE(%s, gig_details),
-                type_name    = COALESCE(%s, type_name),
-                employer_id= COALESCE(%s, employer_id)
-            WHERE gig_id = %s
-            RETURNING gig_id, gig_name, gig_date, gig_details, created_at, type_name, employer_id, posted_by_user_id
-            """,
-            (gig_name, gig_date, gig_details, type_name, employer_id, gig_id)
-        )
-        updated = cursor.fetchone()
-        conn.commit()
+        with transaction() as cursor:
+            # Ensure gig exists and is owned by current user
+            cursor.execute(
+                "SELECT posted_by_user_id FROM gigs WHERE gig_id = %s",
+                (gig_id,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return jsonify(status="error", msg="gig not found"), 404
+
+            if int(row["posted_by_user_id"]) != current_user_id:
+                return jsonify(status="error", msg="not allowed to update this gig"), 403
+
+            cursor.execute(
+                """
+                UPDATE gigs
+                SET gig_name   = COALESCE(%s, gig_name),
+                    gig_date   = COALESCE(%s, gig_date),
+                    gig_details= COALESCE(%s, gig_details),
+                    type_name    = COALESCE(%s, type_name),
+                    employer_id= COALESCE(%s, employer_id)
+                WHERE gig_id = %s
+                RETURNING gig_id, gig_name, gig_date, gig_details, created_at, type_name, employer_id, posted_by_user_id
+                """,
+                (gig_name, gig_date, gig_details, type_name, employer_id, gig_id)
+            )
+            updated = cursor.fetchone()
 
     except psycopg2.errors.ForeignKeyViolation:
-        conn.rollback()
-        release_connection(conn)
         return jsonify(status="error", msg="invalid type_name or employer_id"), 400
+    except PoolTimeout:
+        raise
     except psycopg2.Error:
-        conn.rollback()
-        release_connection(conn)
         return jsonify(status="error", msg="could not update gig"), 400
 
-    release_connection(conn)
     return jsonify(status="ok", gig=updated), 200
 
 @gigs.route("/<gig_id>", methods=["DELETE"])
 @jwt_required()
-def delete_gig(gig_id):
+@with_cursor
+def delete_gig(cursor, gig_id):
     current_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-
     cursor.execute(
         "SELECT posted_by_user_id FROM gigs WHERE gig_id = %s",
         (gig_id,)
@@ -183,15 +438,11 @@ def delete_gig(gig_id):
     row = cursor.fetchone()
 
     if not row:
-        release_connection(conn)
         return jsonify(status="error", msg="gig not found"), 404
 
     if int(row["posted_by_user_id"]) != current_user_id:
-        release_connection(conn)
         return jsonify(status="error", msg="not allowed to delete this gig"), 403
 
     cursor.execute("DELETE FROM gigs WHERE gig_id = %s", (gig_id,))
-    conn.commit()
-    release_connection(conn)
 
     return jsonify(status="ok", msg="gig deleted"), 200
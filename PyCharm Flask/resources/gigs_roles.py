@@ -1,17 +1,23 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import PoolTimeout, transaction
 import psycopg2
+from marshmallow import ValidationError
 
-from resources.validations.request import validate_json
-from resources.validations.schemas import GigRoleCreateSchema, GigRoleDeleteSchema, GigRoleUpdateSchema
+from resources.validations.request import get_loader, validate_json
+from resources.validations.schemas import (
+    GigRoleCreateSchema,
+    GigRoleDeleteSchema,
+    GigRoleLookupSchema,
+    GigRoleUpdateSchema,
+)
 
 gigs_roles = Blueprint('gigs_roles', __name__)
 
 @gigs_roles.route('/', methods=['POST'])
 @jwt_required()
 def create_gigs_roles():
-    data, err, status = validate_json(GigRoleCreateSchema())
+    data, err, status = validate_json(GigRoleCreateSchema)
     if err:
         return err, status
 
@@ -24,54 +30,46 @@ def create_gigs_roles():
 
     current_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-
     try:
-        cursor.execute(
-            """
-            SELECT 1
-            FROM gigs
-            WHERE gig_id = %s AND posted_by_user_id = %s""",
-            (gig_id, current_user_id)
-        )
-
-        allowed = cursor.fetchone()
-        if not allowed:
-            return jsonify({"message": "Only the employer who posted this gig can add roles"}), 403
-
-        cursor.execute(
-            """
-            INSERT INTO gigs_roles
-             (gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit)
-            VALUES (%s, %s, %s, %s, %s,%s) 
-            RETURNING gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit""",
-            (gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit)
-        )
-        entered = cursor.fetchone()
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT 1
+                FROM gigs
+                WHERE gig_id = %s AND posted_by_user_id = %s""",
+                (gig_id, current_user_id)
+            )
+
+            allowed = cursor.fetchone()
+            if not allowed:
+                return jsonify({"message": "Only the employer who posted this gig can add roles"}), 403
+
+            cursor.execute(
+                """
+                INSERT INTO gigs_roles
+                 (gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit)
+                VALUES (%s, %s, %s, %s, %s,%s) 
+                RETURNING gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit""",
+                (gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit)
+            )
+            entered = cursor.fetchone()
         return jsonify(entered), 201
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
         return jsonify({"Role already added to gig"}), 400
     except psycopg2.errors.ForeignKeyViolation:
-        conn.rollback()
         return jsonify({"Invalid id or role"}), 400
 
-    finally:
-        release_connection(conn)
-
 @gigs_roles.route('/<gig_id>', methods=['DELETE'])
 @jwt_required()
 def delete_gigs_roles(gig_id):
-    data, err, status = validate_json(GigRoleDeleteSchema())
+    data, err, status = validate_json(GigRoleDeleteSchema)
     if err:
         return err, status
 
     role_name = data.get('role_name')
 
     current_user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
-    try:
+    with transaction() as cursor:
         cursor.execute(
             """
             SELECT 1
@@ -89,15 +87,12 @@ def delete_gigs_roles(gig_id):
             WHERE gig_id = %s AND role_name = %s""",
             (gig_id, role_name)
         )
-        conn.commit()
-        return jsonify(status="deleted"), 200
-    finally:
-        release_connection(conn)
+    return jsonify(status="deleted"), 200
 
 @gigs_roles.route('/<gig_id>', methods=['PATCH'])
 @jwt_required()
 def update_gigs_roles(gig_id):
-    data, err, status = validate_json(GigRoleUpdateSchema(), partial=True)
+    data, err, status = validate_json(GigRoleUpdateSchema, partial=True)
     if err:
         return err, status
 
@@ -109,9 +104,7 @@ def update_gigs_roles(gig_id):
 
     current_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-
-    try:
+    with transaction() as cursor:
         cursor.execute(
             """
             SELECT 1
@@ -137,29 +130,76 @@ def update_gigs_roles(gig_id):
         )
 
         updated = cursor.fetchone()
-        conn.commit()
-        return jsonify(updated), 200
-
-    finally:
-        release_connection(conn)
+    return jsonify(updated), 200
 
 @gigs_roles.route('/<gig_id>')
 @jwt_required()
 def get_gigs_roles(gig_id):
-    conn, cursor = get_cursor()
     try:
-        cursor.execute(
-            """
-            SELECT * FROM gigs_roles
-            WHERE gig_id = %s
-            """,
-            (gig_id,),
-        )
-        entered = cursor.fetchall()
+        with transaction(readonly=True) as cursor:
+            cursor.execute(
+                """
+                SELECT gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit
+                FROM gigs_roles
+                WHERE gig_id = %s
+                """,
+                (gig_id,),
+            )
+            entered = cursor.fetchall()
         # No roles for a gig isn't an error. Return an empty list so the
         # frontend can treat it as "no restriction".
         return jsonify(entered or []), 200
+    except PoolTimeout:
+        raise
     except Exception:
         return jsonify([]), 200
-    finally:
-        release_connection(conn)
+
+
+def _roles_by_gig(gig_ids):
+    """{gig_id: [roles]} for every requested id, in one query. Gigs without roles map to []."""
+    gig_ids = list(dict.fromkeys(gig_ids))
+    with transaction(readonly=True) as cursor:
+        cursor.execute(
+            """
+            SELECT gig_id, role_name, needed_count, pay_amount, pay_currency, pay_unit
+            FROM gigs_roles
+            WHERE gig_id = ANY(%s)
+            ORDER BY gig_id, role_name
+            """,
+            (gig_ids,),
+        )
+        rows = cursor.fetchall()
+
+    grouped = {str(gig_id): [] for gig_id in gig_ids}
+    for row in rows:
+        grouped[str(row['gig_id'])].append(row)
+    return grouped
+
+
+@gigs_roles.route('/', methods=['GET'])
+@jwt_required()
+def get_roles_for_gigs():
+    """Roles for several gigs at once: GET /gigs-roles/?gig_ids=1,2,3"""
+    raw = [part.strip() for part in request.args.get('gig_ids', '').split(',') if part.strip()]
+    try:
+        gig_ids = [int(part) for part in raw]
+    except ValueError:
+        return jsonify(status="error", msg="gig_ids must be a comma separated list of integers"), 400
+
+    try:
+        data = get_loader(GigRoleLookupSchema)({'gig_ids': gig_ids})
+    except ValidationError as err:
+        return jsonify(status="error", msg="Validation error", errors=err.messages), 422
+
+    return jsonify(_roles_by_gig(data['gig_ids'])), 200
+
+
+@gigs_roles.route('/lookup', methods=['POST'])
+@jwt_required()
+def lookup_roles_for_gigs():
+    """Same as GET /gigs-roles/?gig_ids=..., for lists too long for a query string."""
+    data, err, status = validate_json(GigRoleLookupSchema)
+    if err:
+        return err, status
+
+    return jsonify(_roles_by_gig(data['gig_ids'])), 200
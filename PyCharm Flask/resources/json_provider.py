@@ -0,0 +1,139 @@
+"""orjson-backed JSON provider for Flask responses.
+
+Every list endpoint returns `jsonify(rows)` over RealDictRows full of dates,
+timestamps and Decimals. orjson encodes those lists several times faster than the
+stdlib encoder. The output is the same as Flask's default provider: keys sorted,
+dates and datetimes as HTTP dates ("Wed, 01 Jul 2026 00:00:00 GMT"), Decimals and
+UUIDs as strings, pretty-printed in debug mode. The only difference is that
+non-ASCII text is sent as UTF-8 instead of \\u escapes.
+
+JSON_PROVIDER=default switches to the stdlib encoder (StdlibProvider, Flask's
+provider plus a cheap conversion for db.records); so does orjson not being
+installed.
+
+Usage (main.py):
+  from resources import json_provider
+  json_provider.init_app(app)
+"""
+from __future__ import annotations
+
+import dataclasses
+import decimal
+import logging
+import os
+import typing as t
+import uuid
+from datetime import date, datetime, timezone
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+
+from db.records import Record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _http_datetime(value: datetime) -> str:
+    """werkzeug.http.http_date for a datetime, without going through email.utils."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+        _WEEKDAYS[value.weekday()], value.day, _MONTHS[value.month - 1], value.year,
+        value.hour, value.minute, value.second,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _http_date(value: date) -> str:
+    # Plain dates (gig_date, dob) repeat a lot within and across responses.
+    return "%s, %02d %s %04d 00:00:00 GMT" % (
+        _WEEKDAYS[value.weekday()], value.day, _MONTHS[value.month - 1], value.year,
+    )
+
+
+def _record_dict(o: Record) -> dict[str, t.Any]:
+    # dataclasses.asdict would deep-copy every value; the encoder only needs the fields.
+    return {name: getattr(o, name) for name in o.__match_args__}
+
+
+def _default(o: t.Any) -> t.Any:
+    # Same conversions as flask.json.provider._default.
+    if isinstance(o, datetime):
+        return _http_datetime(o)
+    if isinstance(o, date):
+        return _http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, Record):
+        return _record_dict(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _stdlib_default(o: t.Any) -> t.Any:
+    if isinstance(o, Record):
+        return _record_dict(o)
+    return DefaultJSONProvider.default(o)
+
+
+class StdlibProvider(DefaultJSONProvider):
+    """Flask's provider, with records encoded from their fields instead of `dataclasses.asdict`."""
+
+    default: t.Callable[[t.Any], t.Any] = staticmethod(_stdlib_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding and decoding."""
+
+    # Datetimes go through _default so they keep Flask's HTTP date format
+    # rather than orjson's ISO 8601. Dataclasses (db.records) are encoded natively.
+    _options = 0 if orjson is None else (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if kwargs:
+            # Custom json.dumps arguments (indent, cls, ...) only the stdlib understands.
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = self._encode(obj, orjson.OPT_INDENT_2 if pretty else 0)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+    def _encode(self, obj: t.Any, extra_options: int = 0) -> bytes:
+        if self.sort_keys:
+            extra_options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=self._options | extra_options)
+
+
+def init_app(app) -> None:
+    choice = os.getenv("JSON_PROVIDER", "orjson").strip().lower()
+    if choice == "default":
+        app.json = StdlibProvider(app)
+        return
+    if orjson is None:
+        log.warning("orjson is not installed; using the stdlib JSON provider")
+        app.json = StdlibProvider(app)
+        return
+    app.json = OrjsonProvider(app)
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import transaction, with_cursor
 import psycopg2
 
 employer_members = Blueprint('employer_members', __name__)
@@ -17,26 +17,19 @@ def create_member():
 
     user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-
     try:
-        cursor.execute(
-            "INSERT INTO employer_members (employer_id, user_id, member_role) "
-            "VALUES (%s, %s, %s) RETURNING employer_id, user_id, member_role, joined_at",
-            (employer_id, user_id, member_role)
-        )
-        member = cursor.fetchone()
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO employer_members (employer_id, user_id, member_role) "
+                "VALUES (%s, %s, %s) RETURNING employer_id, user_id, member_role, joined_at",
+                (employer_id, user_id, member_role)
+            )
+            member = cursor.fetchone()
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
         return jsonify({"member already created"}), 400
     except psycopg2.errors.ForeignKeyViolation:
-        conn.rollback()
         return jsonify(status="error", msg="invalid employer_id or user_id"), 400
 
-    finally:
-        release_connection(conn)
-
     return jsonify(status="created", member=member), 201
 
 # STRETCH REFINE THIS FOR ADMINS OWNERS TO UPDATE ONLY, AND CAN EDIT OTHER USER'S ROLE
@@ -51,9 +44,8 @@ def update_member():
         return jsonify(status="error", msg="missing employer_id or member_role"), 400
 
     current_user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
 
-    try:
+    with transaction() as cursor:
         cursor.execute('SELECT employer_id, user_id FROM employer_members WHERE employer_id = %s AND user_id = %s',
                        (int(employer_id), current_user_id))
         member = cursor.fetchone()
@@ -74,11 +66,7 @@ def update_member():
         )
 
         updated = cursor.fetchone()
-        conn.commit()
-        return jsonify(status="updated", member=updated), 200
-
-    finally:
-        release_connection(conn)
+    return jsonify(status="updated", member=updated), 200
 
 @employer_members.route('/', methods=['DELETE'])
 @jwt_required()
@@ -91,15 +79,11 @@ def delete_member():
 
     current_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-    try:
+    with transaction() as cursor:
         cursor.execute(
         "DELETE FROM employer_members WHERE employer_id = %s AND user_id = %s", (int(employer_id), current_user_id)
         )
-        conn.commit()
-        return jsonify(status="deleted"), 200
-    finally:
-        release_connection(conn)
+    return jsonify(status="deleted"), 200
 
 @employer_members.route('/')
 @jwt_required()
@@ -110,8 +94,7 @@ def get_employer_members():
 
     current_user_id = int(get_jwt_identity())
 
-    conn, cursor = get_cursor()
-    try:
+    with transaction(readonly=True) as cursor:
         cursor.execute(
             """
             SELECT 1 FROM employer_members 
@@ -132,28 +115,23 @@ def get_employer_members():
             (int(employer_id),)
         )
         members = cursor.fetchall()
-        return jsonify(status="success", members=members), 200
-    finally:
-        release_connection(conn)
+    return jsonify(status="success", members=members), 200
 
 @employer_members.route('/me')
 @jwt_required()
-def get_employer_from_user():
+@with_cursor(readonly=True)
+def get_employer_from_user(cursor):
     user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
-    try:
-        cursor.execute(
-            """
-            SELECT employer_id, member_role FROM employer_members 
-            WHERE user_id = %s
-            """,
-            (user_id,)
-        )
-        employer = cursor.fetchone()
-
-        if not employer:
-         return jsonify(status="error", msg="no employer found"), 400
-        return jsonify(employer), 200
-    finally:
-        release_connection(conn)
+    cursor.execute(
+        """
+        SELECT employer_id, member_role FROM employer_members 
+        WHERE user_id = %s
+        """,
+        (user_id,)
+    )
+    employer = cursor.fetchone()
+
+    if not employer:
+     return jsonify(status="error", msg="no employer found"), 400
+    return jsonify(employer), 200
 
@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify, make_response, request
+
+from resources import reference_cache
+
+meta = Blueprint('meta', __name__)
+
+@meta.route('')
+def get_meta():
+    """Every lookup list the forms need, in one payload.
+
+    `version` changes whenever any list does. Clients that kept an earlier payload
+    send its version back, as `If-None-Match` or `?version=`, and get a 304 with no
+    body while nothing has changed.
+    """
+    current = reference_cache.snapshot()
+
+    if request.args.get('version') == current.version:
+        response = make_response("", 304)
+    else:
+        response = jsonify(version=current.version, **current.data)
+
+    response.set_etag(current.version)
+    response.cache_control.public = True
+    response.cache_control.max_age = int(reference_cache.REFERENCE_CACHE_TTL)
+    return response.make_conditional(request)
@@ -0,0 +1,308 @@
+"""Prometheus-style metrics, served as text at GET /metrics.
+
+- http_request_duration_seconds{endpoint,method,status}: latency histogram for
+  every request, up to the point the view's response is ready. For streamed
+  responses that doesn't include sending the body.
+- http_request_db_seconds{endpoint}: time spent in queries per request (see
+  db.instrumentation).
+- http_requests_in_flight{endpoint}
+- db_pool_connections{pool,state}, db_pool_waiting{pool}, db_pool_max{pool}
+- db_pool_checkout_wait_seconds: time requests spent waiting for a connection.
+- bcrypt_duration_seconds{op}, bcrypt_busy_total{op}
+- cache_requests_total{cache,result}: hits and misses for in-process caches.
+
+Counters and histograms are split over stripes, each with its own lock. A thread
+always writes to the same stripe, so request threads rarely contend, and a
+scrape adds the stripes up. The numbers are per process.
+
+Set METRICS_TOKEN to require `Authorization: Bearer <token>` on /metrics.
+
+Usage (main.py):
+  from resources import metrics
+  metrics.init_app(app)
+  app.register_blueprint(metrics.metrics, url_prefix='/metrics')
+"""
+from __future__ import annotations
+
+import bisect
+import hmac
+import itertools
+import math
+import os
+import threading
+import time
+from typing import Callable, Iterable, Sequence
+
+from flask import Blueprint, Response, g, request
+
+from db import db_pool
+from db.instrumentation import current_queries
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+STRIPES = 16
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+BCRYPT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0)
+
+_thread = threading.local()
+_next_stripe = itertools.count()
+
+
+def _stripe_index() -> int:
+    try:
+        return _thread.stripe
+    except AttributeError:
+        _thread.stripe = next(_next_stripe) % STRIPES
+        return _thread.stripe
+
+
+class _Stripe:
+    __slots__ = ("lock", "values")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}  # label values -> float, or [bucket counts..., sum] for histograms
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._stripes = [_Stripe() for _ in range(STRIPES)]
+        REGISTRY.append(self)
+
+    def _merged(self) -> dict:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. requests served."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        stripe = self._stripes[_stripe_index()]
+        with stripe.lock:
+            stripe.values[labels] = stripe.values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._merged().get(labels, 0.0)
+
+    def _merged(self) -> dict:
+        merged = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                items = list(stripe.values.items())
+            for labels, value in items:
+                merged[labels] = merged.get(labels, 0.0) + value
+        return merged
+
+    def samples(self):
+        for labels, value in sorted(self._merged().items()):
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Gauge(Counter):
+    """A value that goes up and down (in-flight requests). Stripes hold deltas."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class CallbackGauge(_Metric):
+    """A gauge read at scrape time: `read()` returns {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], read: Callable[[], dict]):
+        super().__init__(name, help, labelnames)
+        self._read = read
+
+    def samples(self):
+        for labels, value in sorted(self._read().items()):
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        # Non-cumulative counts per bucket (last slot is +Inf), then the running sum.
+        index = bisect.bisect_left(self.buckets, value)
+        stripe = self._stripes[_stripe_index()]
+        with stripe.lock:
+            counts = stripe.values.get(labels)
+            if counts is None:
+                counts = stripe.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def _merged(self) -> dict:
+        merged = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                items = [(labels, list(counts)) for labels, counts in stripe.values.items()]
+            for labels, counts in items:
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = counts
+                else:
+                    for i, n in enumerate(counts):
+                        total[i] += n
+        return merged
+
+    def count(self, *labels: str) -> int:
+        counts = self._merged().get(labels)
+        return sum(counts[:-1]) if counts else 0
+
+    def samples(self):
+        for labels, counts in sorted(self._merged().items()):
+            label_dict = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                yield f"{self.name}_bucket", {**label_dict, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", label_dict, counts[-1]
+            yield f"{self.name}_count", label_dict, cumulative
+
+
+REGISTRY: list[_Metric] = []
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _pool_stats() -> dict:
+    # Only report pools that exist; reading them must not open a database connection.
+    return {
+        name: pool.stats()
+        for name, pool in (("primary", db_pool.pool), ("replica", db_pool.replica_pool))
+        if pool is not None
+    }
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to handle a request.", ("endpoint", "method", "status"),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent running queries per request.", ("endpoint",),
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled.", ("endpoint",))
+POOL_CONNECTIONS = CallbackGauge(
+    "db_pool_connections", "Pool connections by state.", ("pool", "state"),
+    lambda: {
+        (name, state): stats[state]
+        for name, stats in _pool_stats().items()
+        for state in ("size", "idle", "in_use")
+    },
+)
+POOL_WAITING = CallbackGauge(
+    "db_pool_waiting", "Callers waiting for a pool connection.", ("pool",),
+    lambda: {(name,): stats["waiting"] for name, stats in _pool_stats().items()},
+)
+POOL_MAX = CallbackGauge(
+    "db_pool_max", "Most connections the pool will open.", ("pool",),
+    lambda: {(name,): stats["max"] for name, stats in _pool_stats().items()},
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time requests waited for a pool connection.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0),
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds", "Password hash/check time, including waiting for a worker.", ("op",),
+    buckets=BCRYPT_BUCKETS,
+)
+BCRYPT_BUSY = Counter("bcrypt_busy_total", "Password hash/checks turned away as busy.", ("op",))
+CACHE_REQUESTS = Counter("cache_requests_total", "In-process cache lookups.", ("cache", "result"))
+
+
+def cache_hit(cache: str) -> None:
+    CACHE_REQUESTS.inc(cache, "hit")
+
+
+def cache_miss(cache: str) -> None:
+    CACHE_REQUESTS.inc(cache, "miss")
+
+
+metrics = Blueprint("metrics", __name__)
+
+
+@metrics.route("")
+def get_metrics():
+    if METRICS_TOKEN:
+        sent = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app) -> None:
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_endpoint = request.endpoint or "unmatched"
+        g.metrics_recorded = False
+        IN_FLIGHT.inc(g.metrics_endpoint)
+
+    @app.after_request
+    def _record_request(response):
+        if "metrics_started" in g:
+            _record(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc=None):
+        if "metrics_started" not in g:
+            return
+        if not g.metrics_recorded:
+            # An unhandled exception skips after_request; Flask answers it with a 500.
+            _record(500)
+        IN_FLIGHT.dec(g.metrics_endpoint)
+
+
+def _record(status: int) -> None:
+    endpoint = g.metrics_endpoint
+    REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_started, endpoint, request.method, str(status))
+    queries = current_queries.get()
+    if queries is not None:
+        REQUEST_DB_TIME.observe(queries.db_time, endpoint)
+        if queries.checkouts:
+            POOL_WAIT.observe(queries.checkout_wait)
+    g.metrics_recorded = True
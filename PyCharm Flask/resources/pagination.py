@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination helpers for list endpoints.
+
+A page is fetched with `LIMIT page_size + 1`; the extra row only tells us there is
+another page. The sort key of the last row returned is handed back to the client
+as an opaque cursor in the `X-Next-Cursor` header, so the response body keeps
+its existing shape. The client sends it back as `?cursor=` to get the next page.
+
+Usage:
+  limit = page_size()
+  after = decode_cursor(request.args.get("cursor"), cursor_timestamp, cursor_int)
+  ...execute "... AND (created_at, id) < (%s, %s) ... LIMIT %s" with limit + 1...
+  return page_response(rows, limit, lambda r: (r["created_at"], r["id"]))
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import math
+from datetime import date, datetime
+from typing import Any, Callable, Sequence
+
+from flask import jsonify, request
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PaginationError(ValueError):
+    """Bad `limit` or `cursor` query parameter."""
+
+
+def page_size(default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Read `?limit=` and clamp it to [1, maximum]."""
+    raw = request.args.get("limit")
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise PaginationError("limit must be an integer") from None
+    return max(1, min(value, maximum))
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None, *parsers: Callable[[Any], Any]) -> list[Any] | None:
+    """Decode a cursor made by `encode_cursor`; None if no cursor was sent.
+
+    Takes one parser per value (`cursor_timestamp`, `cursor_int`, `cursor_float`),
+    so a tampered cursor is a PaginationError (400) here instead of a cast error
+    from the database.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise PaginationError("invalid cursor") from None
+    if not isinstance(values, list) or len(values) != len(parsers):
+        raise PaginationError("invalid cursor")
+    try:
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (TypeError, ValueError):
+        raise PaginationError("invalid cursor") from None
+
+
+def cursor_timestamp(value: Any) -> datetime:
+    """An ISO 8601 timestamp, as `encode_cursor` writes datetimes."""
+    if not isinstance(value, str):
+        raise TypeError("timestamp must be a string")
+    return datetime.fromisoformat(value)
+
+
+def cursor_int(value: Any) -> int:
+    """An integer that fits a bigint column."""
+    if isinstance(value, bool) or not isinstance(value, int) or not -2**63 <= value < 2**63:
+        raise ValueError("not a bigint")
+    return value
+
+
+def cursor_float(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError("not a finite number")
+    return float(value)
+
+
+def split_page(rows: Sequence[Any], limit: int, cursor_key: Callable[[Any], tuple]):
+    """(first `limit` rows, cursor for the next page or None)."""
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = list(rows[:limit])
+    return rows, encode_cursor(*cursor_key(rows[-1]))
+
+
+def page_response(rows: Sequence[Any], limit: int, cursor_key: Callable[[Any], tuple]):
+    """jsonify the first `limit` rows and set the next-page cursor if there were more."""
+    rows, cursor = split_page(rows, limit, cursor_key)
+    response = jsonify(rows)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response, 200
@@ -0,0 +1,140 @@
+"""Password hashing and checking on a bounded process pool.
+
+A bcrypt call at cost 12 is roughly 250ms of CPU. Done inline, a burst of logins
+keeps every request thread busy hashing while everything else queues behind
+them. Here the bcrypt work runs in a small pool of worker processes instead, and
+there is a limit on how much of it may be queued at once:
+
+  BCRYPT_ROUNDS   cost factor for new hashes (default 12). Hashes made with a
+                  different cost are upgraded on the user's next login.
+  BCRYPT_WORKERS  worker processes (default: CPU count). 0 runs bcrypt inline.
+  BCRYPT_QUEUE    calls that may wait for a free worker (default 4 per worker).
+                  Past that, calls fail straight away with PasswordHashingBusy.
+  BCRYPT_TIMEOUT  seconds a caller waits for its result (default 10).
+
+Each app process gets its own pool, so with several app processes running, set
+BCRYPT_WORKERS so that their total doesn't go far over the number of cores.
+Workers are started with "spawn", which imports the script that started the app,
+so that script must keep its startup code under `if __name__ == "__main__":`
+(main.py does).
+
+Usage:
+  password_hash = hash_password(password)
+  if check_password(password, password_hash) and needs_rehash(password_hash): ...
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from resources import metrics
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS") or os.cpu_count() or 1)
+BCRYPT_QUEUE = int(os.getenv("BCRYPT_QUEUE") or 4 * max(BCRYPT_WORKERS, 1))
+BCRYPT_TIMEOUT = float(os.getenv("BCRYPT_TIMEOUT", "10"))
+
+
+class PasswordHashingBusy(RuntimeError):
+    """The pool is full or didn't answer in time; the caller should retry later."""
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _slots = threading.BoundedSemaphore(BCRYPT_WORKERS + BCRYPT_QUEUE)
+                # spawn, not fork: forking a process that already runs request threads
+                # can copy a lock some other thread was holding.
+                _executor = ProcessPoolExecutor(
+                    max_workers=BCRYPT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def shutdown():
+    """Stop the worker processes; the next call starts a new pool with the current settings."""
+    global _executor, _slots
+    with _lock:
+        executor, _executor, _slots = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _run(fn, *args):
+    if BCRYPT_WORKERS <= 0:
+        return fn(*args)
+
+    executor = _get_executor()
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy("too many password checks in progress")
+
+    try:
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot stays taken until a worker is done with the call, even if the caller
+        # has given up waiting; otherwise timed-out work would pile up unbounded.
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=BCRYPT_TIMEOUT)
+        except FutureTimeout:
+            future.cancel()
+            raise PasswordHashingBusy(f"password check took longer than {BCRYPT_TIMEOUT:g}s") from None
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start a fresh pool on the next call.
+        shutdown()
+        raise PasswordHashingBusy("password worker pool restarted") from None
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _checkpw(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+def _timed(op, fn, *args):
+    started = time.perf_counter()
+    try:
+        result = _run(fn, *args)
+    except PasswordHashingBusy:
+        metrics.BCRYPT_BUSY.inc(op)
+        raise
+    metrics.BCRYPT_DURATION.observe(time.perf_counter() - started, op)
+    return result
+
+
+def hash_password(password: str) -> str:
+    return _timed("hash", _hashpw, password.encode("utf-8"), BCRYPT_ROUNDS).decode("utf-8")
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    return _timed("check", _checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True if the hash wasn't made with the current BCRYPT_ROUNDS (format: $2b$12$...)."""
+    try:
+        return int(password_hash.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
@@ -0,0 +1,244 @@
+"""On-demand profiling of single requests.
+
+A request is profiled when one of these holds:
+- it carries a valid `X-Profile-Signature` header (see `sign()`), made with
+  PROFILE_SECRET for that method and path and not yet expired;
+- it has `?profile=1` and the caller's JWT identity is in ADMIN_USER_IDS (see
+  resources.admin);
+- it is picked by sampling: one request in PROFILE_SAMPLE_N (0 = off, the default).
+
+Each profile is written to PROFILE_DIR (default "profiles") under an id that is
+also sent back in the `X-Profile-Id` response header:
+- <id>.folded: collapsed stacks ("a;b;c count"), ready for flamegraph.pl or
+  speedscope. They're sampled every PROFILE_INTERVAL_MS (default 1) from the
+  request's thread, so time spent waiting on the database shows up too.
+- <id>.prof: with PROFILE_MODE=cprofile, a cProfile dump for pstats/snakeviz
+  instead of the folded stacks.
+- <id>.sql.json: the request's queries in order, from db.instrumentation: when
+  each started, how long it took, rows, and the statement fingerprint.
+
+Only one request per process is profiled at a time; others run normally.
+
+Signing a request from a shell:
+  python -m resources.profiler sign GET /applications/12
+  curl -H "X-Profile-Signature: <output>" ...
+
+Usage (main.py):
+  from resources import profiler
+  profiler.init_app(app)
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from flask import g, request
+
+from db.instrumentation import current_queries
+from resources.admin import is_admin
+
+log = logging.getLogger(__name__)
+
+PROFILE_SECRET = os.getenv("PROFILE_SECRET", "")
+PROFILE_SAMPLE_N = int(os.getenv("PROFILE_SAMPLE_N", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sample")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+
+SIGNATURE_HEADER = "X-Profile-Signature"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# cProfile (and sys.monitoring since 3.12) allows one active profiler per process.
+_busy = threading.Lock()
+
+
+def _signature(secret: str, method: str, path: str, expires: int) -> str:
+    message = f"{expires}:{method.upper()}:{path}".encode("utf-8")
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def sign(method: str, path: str, ttl: int = 300, secret: str | None = None) -> str:
+    """Header value that turns on profiling for `method path` for the next `ttl` seconds."""
+    expires = int(time.time()) + ttl
+    return f"{expires}:{_signature(secret or PROFILE_SECRET, method, path, expires)}"
+
+
+def _valid_signature(value: str) -> bool:
+    if not PROFILE_SECRET or not value:
+        return False
+    expires, _, digest = value.partition(":")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = _signature(PROFILE_SECRET, request.method, request.path, int(expires))
+    return hmac.compare_digest(digest, expected)
+
+
+def wants_profile() -> bool:
+    if _valid_signature(request.headers.get(SIGNATURE_HEADER, "")):
+        return True
+    if request.args.get("profile") == "1" and is_admin():
+        return True
+    return PROFILE_SAMPLE_N > 0 and random.randrange(PROFILE_SAMPLE_N) == 0
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    root = os.getcwd() + os.sep
+    if filename.startswith(root):
+        filename = filename[len(root):]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop_event = threading.Event()
+        self._labels = {}
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    def __init__(self, mode: str):
+        endpoint = (request.endpoint or "unmatched").replace(".", "-")
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        self.label = f"{request.method} {request.full_path.rstrip('?')}"
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        if mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+            self._profiler.start()
+
+    def stop(self):
+        if self.mode == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.elapsed = time.perf_counter() - self.started
+
+    def save(self, directory: str, queries=None) -> None:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.id)
+        if self.mode == "cprofile":
+            self._profiler.dump_stats(base + ".prof")
+        else:
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                f.write(self._profiler.folded())
+        with open(base + ".sql.json", "w", encoding="utf-8") as f:
+            json.dump(sql_timeline(self, queries), f, indent=2)
+
+
+def sql_timeline(profile: RequestProfile, queries) -> dict:
+    timeline = {"request": profile.label, "elapsed_ms": round(profile.elapsed * 1000, 3), "queries": []}
+    if queries is None:
+        return timeline
+    timeline.update(
+        query_count=queries.count,
+        db_ms=round(queries.db_time * 1000, 3),
+        checkout_wait_ms=round(queries.checkout_wait * 1000, 3),
+        repeated=queries.repeated(),
+        queries=[
+            {
+                "start_ms": round(query.started * 1000, 3),
+                "duration_ms": round(query.duration * 1000, 3),
+                "rows": query.rows,
+                "sql": query.fingerprint,
+            }
+            for query in queries.queries
+        ],
+    )
+    return timeline
+
+
+def init_app(app) -> None:
+    @app.before_request
+    def _start_profile():
+        if not wants_profile() or not _busy.acquire(blocking=False):
+            return
+        try:
+            g.request_profile = RequestProfile(PROFILE_MODE)
+        except Exception:
+            _busy.release()
+            log.warning("could not start request profiler", exc_info=True)
+
+    @app.after_request
+    def _save_profile(response):
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return response
+        try:
+            profile.stop()
+            profile.save(PROFILE_DIR, current_queries.get())
+            response.headers[PROFILE_ID_HEADER] = profile.id
+            log.info("profiled %s in %.1fms: %s", profile.label, profile.elapsed * 1000, profile.id)
+        except Exception:
+            log.warning("could not save request profile", exc_info=True)
+        finally:
+            _busy.release()
+        return response
+
+    @app.teardown_request
+    def _abandon_profile(exc=None):
+        # after_request doesn't run when the view raised.
+        profile = g.pop("request_profile", None)
+        if profile is not None:
+            try:
+                profile.stop()
+            finally:
+                _busy.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign a request for profiling (needs PROFILE_SECRET).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sign_parser = sub.add_parser("sign")
+    sign_parser.add_argument("method")
+    sign_parser.add_argument("path")
+    sign_parser.add_argument("--ttl", type=int, default=300)
+    args = parser.parse_args()
+    if not PROFILE_SECRET:
+        parser.error("PROFILE_SECRET is not set")
+    print(sign(args.method, args.path, args.ttl))
+
+
+if __name__ == "__main__":
+    main()
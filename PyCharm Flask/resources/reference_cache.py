@@ -0,0 +1,122 @@
+"""In-memory snapshot of the reference tables, served with HTTP caching headers.
+
+roles, skills, event types, member types and application statuses change a few
+times a year but are fetched on nearly every screen. They're loaded together with
+one query, kept in memory for REFERENCE_CACHE_TTL seconds (default 300), and
+served with a strong ETag so browsers can revalidate with If-None-Match and get
+a 304 back.
+
+The snapshot is per process: `invalidate()` makes this process reload on its
+next request, other processes pick up changes once their TTL runs out.
+
+Usage (in a blueprint):
+  return reference_response("roles")
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import jsonify, request
+
+from db.db_pool import transaction
+from resources import metrics
+
+log = logging.getLogger(__name__)
+
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+
+_SNAPSHOT_SQL = """
+    SELECT
+        (SELECT COALESCE(json_agg(role_name ORDER BY role_name), '[]'::json) FROM roles) AS roles,
+        (SELECT COALESCE(json_agg(skill_name ORDER BY skill_name), '[]'::json) FROM skills) AS skills,
+        (SELECT COALESCE(json_agg(type_name ORDER BY type_name), '[]'::json) FROM event_types) AS event_types,
+        (SELECT COALESCE(json_agg(member_type ORDER BY member_type), '[]'::json) FROM members) AS member_types,
+        (SELECT COALESCE(json_agg(to_json(s) ORDER BY s.status), '[]'::json) FROM application_status s)
+            AS application_status
+"""
+
+
+def _etag(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()[:32]
+
+
+class Snapshot:
+    """One load of every reference table, with an ETag per table and one for the lot."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.etags = {key: _etag(value) for key, value in data.items()}
+        self.version = _etag(self.etags)
+        self.loaded_at = time.monotonic()
+
+    def expired(self, now: float) -> bool:
+        return now - self.loaded_at > REFERENCE_CACHE_TTL
+
+
+_snapshot: Snapshot | None = None
+_lock = threading.Lock()
+
+
+def _load() -> Snapshot:
+    with transaction(readonly=True) as cursor:
+        cursor.execute(_SNAPSHOT_SQL)
+        row = cursor.fetchone()
+    return Snapshot(dict(row))
+
+
+def snapshot() -> Snapshot:
+    """The current snapshot, reloading it first if it's missing or past its TTL."""
+    global _snapshot
+    current = _snapshot
+    if current is not None and not current.expired(time.monotonic()):
+        metrics.cache_hit("reference")
+        return current
+
+    with _lock:
+        # Another thread may have reloaded while we waited for the lock.
+        current = _snapshot
+        if current is not None and not current.expired(time.monotonic()):
+            metrics.cache_hit("reference")
+            return current
+        metrics.cache_miss("reference")
+        try:
+            _snapshot = _load()
+        except Exception:
+            if current is None:
+                raise
+            # Serving slightly old reference data beats failing the request.
+            log.warning("reference cache reload failed, serving the previous snapshot", exc_info=True)
+            current.loaded_at = time.monotonic()
+            return current
+        return _snapshot
+
+
+def invalidate():
+    """Drop the snapshot so the next request in this process reloads it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def get(key: str):
+    return snapshot().data[key]
+
+
+def reference_response(key: str, *, private: bool = False):
+    """200 with the cached table, or 304 if the client's If-None-Match still matches."""
+    current = snapshot()
+    response = jsonify(current.data[key])
+    response.set_etag(current.etags[key])
+    response.cache_control.max_age = int(REFERENCE_CACHE_TTL)
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    # make_conditional switches the response to a bodiless 304 when the ETag matches.
+    return response.make_conditional(request)
@@ -0,0 +1,118 @@
+"""Streaming JSON and NDJSON responses for list endpoints.
+
+A client opts in with `?stream=json` or `?stream=ndjson`, or by sending
+`Accept: application/x-ndjson`. The rows come from a db.streaming.RowStream and
+are encoded one batch at a time, so the first bytes go out as soon as the first
+batch is fetched and the whole body is never held in memory.
+
+- json: the same JSON array the endpoint normally returns, sent in chunks.
+- ndjson: one JSON object per line.
+
+Endpoints that wrap their list in an object (the applicant list) pass the other
+fields as `envelope`. In json mode the list goes in under `key`, and the body has
+the same shape as the buffered response. In ndjson mode the envelope is the first
+line and each row follows on its own line.
+
+Streamed lists aren't paged, so `?limit=` isn't clamped to the page size the way
+`page_size()` clamps it: `stream_limit()` returns exactly what the client asked
+for (any positive integer), or None (no limit) when it isn't sent.
+
+Usage:
+  fmt = stream_format()
+  if fmt:
+      limit = stream_limit()
+      with RowStream(readonly=True) as stream:
+          stream.execute(sql + " LIMIT %s", (*params, limit))
+      return stream_response(stream, fmt)
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+from flask import current_app, request
+
+from resources.pagination import PaginationError
+
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_FORMATS = ("json", "ndjson")
+
+
+def stream_format() -> str | None:
+    """"json", "ndjson" or None (buffered response) for the current request."""
+    requested = request.args.get("stream")
+    if requested in STREAM_FORMATS:
+        return requested
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return "ndjson"
+    return None
+
+
+def stream_limit() -> int | None:
+    """`?limit=` for a streamed list: None if absent, else a positive integer, unclamped."""
+    raw = request.args.get("limit")
+    if raw in (None, ""):
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise PaginationError("limit must be an integer") from None
+    if value < 1:
+        raise PaginationError("limit must be at least 1")
+    return value
+
+
+class _Body:
+    """Response iterable that releases the stream's connection even if it's never iterated."""
+
+    def __init__(self, chunks: Iterator[str], stream):
+        self._chunks = chunks
+        self._stream = stream
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self._chunks.close()
+        self._stream.close()
+
+
+def _json_chunks(stream, dumps, envelope, key) -> Iterator[str]:
+    if envelope is None:
+        prefix, suffix = "[", "]"
+    else:
+        # Splice the list into the envelope so the keys stay in the provider's order.
+        placeholder = "__stream_rows__"
+        head, tail = dumps({**envelope, key: placeholder}).split(dumps(placeholder), 1)
+        prefix, suffix = head + "[", "]" + tail
+
+    yield prefix
+    first = True
+    for records in stream:
+        # Encoding a whole batch is much cheaper than one row at a time; drop its brackets.
+        body = dumps(records)[1:-1]
+        yield body if first else "," + body
+        first = False
+    yield suffix + "\n"
+
+
+def _ndjson_chunks(stream, dumps, envelope) -> Iterator[str]:
+    if envelope is not None:
+        yield dumps(envelope) + "\n"
+    for records in stream:
+        yield "".join(dumps(record) + "\n" for record in records)
+
+
+def stream_response(stream, fmt: str, *, envelope: dict[str, Any] | None = None, key: str | None = None):
+    """A chunked response streaming `stream`'s rows as `fmt` ("json" or "ndjson")."""
+    # The body is produced after the app context is gone; bind the encoder now.
+    dumps = current_app.json.dumps
+    if fmt == "ndjson":
+        chunks, mimetype = _ndjson_chunks(stream, dumps, envelope), NDJSON_MIMETYPE
+    else:
+        chunks, mimetype = _json_chunks(stream, dumps, envelope, key), JSON_MIMETYPE
+
+    response = current_app.response_class(_Body(chunks, stream), mimetype=mimetype)
+    # Don't let a reverse proxy buffer the whole body.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import transaction, with_cursor
 
 user_media = Blueprint("user_media", __name__)
 
@@ -15,34 +15,31 @@ def _normalize_kind(kind: str):
 
 @user_media.get("/me/media")
 @jwt_required()
-def get_my_media():
+@with_cursor(readonly=True)
+def get_my_media(cur):
     """Return the user's active media (0-1 rows per kind)."""
     user_id = get_jwt_identity()
-    conn, cur = get_cursor()
-    try:
-        cur.execute(
-            """
-            SELECT media_id, user_id, kind, is_active,
-                   resource_type, public_id, secure_url, format, bytes, created_at
-              FROM user_media
-             WHERE user_id = %s
-               AND is_active = TRUE
-             ORDER BY created_at DESC
-            """,
-            (user_id,),
-        )
-        rows = cur.fetchall() or []
-
-        # Return as a mapping by kind for easy frontend consumption.
-        out = {"profile_photo": None, "resume": None, "showreel": None}
-        for r in rows:
-            k = r.get("kind")
-            if k in out and out[k] is None:
-                out[k] = r
-
-        return jsonify(out), 200
-    finally:
-        release_connection(conn)
+    cur.execute(
+        """
+        SELECT media_id, user_id, kind, is_active,
+               resource_type, public_id, secure_url, format, bytes, created_at
+          FROM user_media
+         WHERE user_id = %s
+           AND is_active = TRUE
+         ORDER BY created_at DESC
+        """,
+        (user_id,),
+    )
+    rows = cur.fetchall() or []
+
+    # Return as a mapping by kind for easy frontend consumption.
+    out = {"profile_photo": None, "resume": None, "showreel": None}
+    for r in rows:
+        k = r.get("kind")
+        if k in out and out[k] is None:
+            out[k] = r
+
+    return jsonify(out), 200
 
 
 @user_media.post("/me/media")
@@ -68,8 +65,7 @@ def upsert_my_media():
     if not public_id or not secure_url:
         return jsonify({"error": "public_id and secure_url are required."}), 400
 
-    conn, cur = get_cursor()
-    try:
+    with transaction() as cur:
         # Deactivate existing active media for this kind
         cur.execute(
             """
@@ -93,10 +89,7 @@ def upsert_my_media():
             (user_id, kind, resource_type, public_id, secure_url, fmt, size_bytes),
         )
         row = cur.fetchone()
-        conn.commit()
-        return jsonify(row), 201
-    finally:
-        release_connection(conn)
+    return jsonify(row), 201
 
 
 @user_media.delete("/me/media/<kind>")
@@ -108,8 +101,7 @@ def delete_my_media(kind):
     if not kind:
         return jsonify({"error": "Invalid kind."}), 400
 
-    conn, cur = get_cursor()
-    try:
+    with transaction() as cur:
         cur.execute(
             """
             UPDATE user_media
@@ -122,9 +114,6 @@ def delete_my_media(kind):
             (user_id, kind),
         )
         row = cur.fetchone()
-        conn.commit()
-        if not row:
-            return jsonify({"error": "No active media found for that kind."}), 404
-        return jsonify({"ok": True}), 200
-    finally:
-        release_connection(conn)
\ No newline at end of file
+    if not row:
+        return jsonify({"error": "No active media found for that kind."}), 404
+    return jsonify({"ok": True}), 200
\ No newline at end of file
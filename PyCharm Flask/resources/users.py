@@ -1,9 +1,11 @@
-import bcrypt
+from datetime import datetime
+
 from flask import request, jsonify, Blueprint
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import transaction, with_cursor
 from marshmallow import ValidationError
 from flask_jwt_extended import jwt_required, create_access_token, create_refresh_token, get_jwt_identity, get_jwt
 
+from resources.passwords import PasswordHashingBusy, check_password, hash_password, needs_rehash
 from resources.validations.request import validate_json
 from resources.validations.schemas import UserLoginSchema, UserRegisterSchema, UserUpdateMeSchema
 
@@ -11,9 +13,17 @@ import psycopg2
 
 users = Blueprint('users', __name__)
 
+
+@users.errorhandler(PasswordHashingBusy)
+def password_hashing_busy(e):
+    response = jsonify(status="error", msg="server busy, please try again")
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 @users.route('/register', methods=['POST'])
 def register_user():
-    data, err, status = validate_json(UserRegisterSchema())
+    data, err, status = validate_json(UserRegisterSchema)
     if err:
         return err, status
 
@@ -21,52 +31,61 @@ def register_user():
     email = data["email"]
     dob = data["date_of_birth"]
     password = data["password"]
-    conn, cursor = get_cursor()
 
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(12))
+    # Hash before checking out a connection so the pool isn't held during bcrypt.
+    password_hash = hash_password(password)
     try:
-        cursor.execute(
-            """
-            INSERT INTO users (user_name, email, dob, password_hash) 
-            VALUES (%s, %s, %s, %s)
-            RETURNING user_id, user_name, email, dob
-            """
-            ,
-            (user_name, email, dob, password_hash.decode('utf-8'))
-        )
-        user = cursor.fetchone()
+        with transaction() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO users (user_name, email, dob, password_hash) 
+                VALUES (%s, %s, %s, %s)
+                RETURNING user_id, user_name, email, dob
+                """
+                ,
+                (user_name, email, dob, password_hash)
+            )
+            user = cursor.fetchone()
 
         if not user:
             return jsonify(status='error', msg='user not registered'), 401
-        conn.commit()
         return jsonify(user), 200
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
         return jsonify(status='error', msg='user already registered'), 401
-    finally:
-        release_connection(conn)
 
 @users.route('/login', methods=['POST'])
 def login_user():
-    data, err, status = validate_json(UserLoginSchema())
+    data, err, status = validate_json(UserLoginSchema)
     if err:
         return err, status
 
     email = data["email"]
     password = data["password"]
-    conn, cursor = get_cursor()
-    cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-    results = cursor.fetchone()
-    release_connection(conn)
+    with transaction() as cursor:
+        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+        results = cursor.fetchone()
 
     if not results:
         return jsonify(status='error', msg='email not registered'), 401
 
-    access = bcrypt.checkpw(password.encode('utf-8'), results['password_hash'].encode('utf-8'))
+    access = check_password(password, results['password_hash'])
 
     if not access:
         return jsonify(status='error', msg='password incorrect'), 401
 
+    if needs_rehash(results['password_hash']):
+        # BCRYPT_ROUNDS changed since this hash was made; upgrade it while we have the password.
+        try:
+            new_hash = hash_password(password)
+        except PasswordHashingBusy:
+            new_hash = None  # try again on the next login
+        if new_hash:
+            with transaction() as cursor:
+                cursor.execute(
+                    "UPDATE users SET password_hash = %s WHERE user_id = %s AND password_hash = %s",
+                    (new_hash, results['user_id'], results['password_hash'])
+                )
+
     claims = {'name': results['user_name'], 'email': email}
     user_id = str(results['user_id'])
     access_token = create_access_token(user_id, additional_claims=claims)
@@ -88,18 +107,89 @@ def refresh():
 
 @users.route('/me')
 @jwt_required()
-def me():
+@with_cursor(readonly=True)
+def me(cursor):
     user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
+    cursor.execute("SELECT dob, email, user_id, user_name FROM users WHERE user_id = %s", (user_id,))
+    results = cursor.fetchone()
+    if not results:
+        return jsonify(status='error', msg='user not registered'), 401
+    return jsonify(results), 200
+
+_BOOTSTRAP_SQL = """
+    SELECT
+        u.user_id,
+        u.user_name,
+        u.email,
+        u.dob,
+        COALESCE((
+            SELECT json_agg(ur.role_name ORDER BY ur.role_name)
+            FROM users_roles ur
+            WHERE ur.user_id = u.user_id
+        ), '[]'::json) AS roles,
+        COALESCE((
+            SELECT json_agg(us.skill_name ORDER BY us.skill_name)
+            FROM users_skills us
+            WHERE us.user_id = u.user_id
+        ), '[]'::json) AS skills,
+        {media} AS media,
+        COALESCE((
+            SELECT json_agg(json_build_object('employer_id', em.employer_id, 'member_role', em.member_role)
+                            ORDER BY em.joined_at)
+            FROM employer_members em
+            WHERE em.user_id = u.user_id
+        ), '[]'::json) AS employers
+    FROM users u
+    WHERE u.user_id = %s
+"""
+
+_BOOTSTRAP_MEDIA_SQL = """COALESCE((
+            SELECT json_object_agg(m.kind, to_json(m))
+            FROM (
+                SELECT DISTINCT ON (kind)
+                       media_id, user_id, kind, is_active,
+                       resource_type, public_id, secure_url, format, bytes, created_at
+                FROM user_media
+                WHERE user_id = u.user_id AND is_active = TRUE
+                ORDER BY kind, created_at DESC
+            ) m
+        ), '{}'::json)"""
+
+
+@users.route('/me/bootstrap')
+@jwt_required()
+@with_cursor(readonly=True)
+def me_bootstrap(cursor):
+    """Everything a dashboard needs after login, from one query.
 
+    Combines /users/me, /users-roles/myroles, /users-skills/, /users/me/media and
+    /employer-members/me (as a list, since a user can belong to several employers).
+    """
+    user_id = int(get_jwt_identity())
     try:
-        cursor.execute("SELECT dob, email, user_id, user_name FROM users WHERE user_id = %s", (user_id,))
-        results = cursor.fetchone()
-        if not results:
-            return jsonify(status='error', msg='user not registered'), 401
-        return jsonify(results), 200
-    finally:
-        release_connection(conn)
+        cursor.execute(_BOOTSTRAP_SQL.format(media=_BOOTSTRAP_MEDIA_SQL), (user_id,))
+    except psycopg2.errors.UndefinedTable:
+        # If user_media table isn't present yet in a dev DB, return without media.
+        cursor.connection.rollback()
+        cursor.execute(_BOOTSTRAP_SQL.format(media="'{}'::json"), (user_id,))
+    row = cursor.fetchone()
+    if not row:
+        return jsonify(status='error', msg='user not registered'), 401
+
+    media = {"profile_photo": None, "resume": None, "showreel": None}
+    for kind, item in (row["media"] or {}).items():
+        if kind in media:
+            # Keep timestamps in the same format as every other endpoint.
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+            media[kind] = item
+
+    return jsonify(
+        user={key: row[key] for key in ("dob", "email", "user_id", "user_name")},
+        roles=row["roles"],
+        skills=row["skills"],
+        media=media,
+        employers=row["employers"],
+    ), 200
 
 @users.route('/<user_id>', methods=['DELETE'])
 @jwt_required()
@@ -109,22 +199,18 @@ def delete_user(user_id):
     if current_user_id == user_id:
         return jsonify(status='error', msg='cannot delete self'), 401
 
-    conn, cursor = get_cursor()
-    try:
+    with transaction() as cursor:
         cursor.execute(
             """
             DELETE FROM users WHERE user_id = %s""",
             (user_id,))
-        conn.commit()
-        return jsonify(status='success', msg='user deleted'), 200
-    finally:
-        release_connection(conn)
+    return jsonify(status='success', msg='user deleted'), 200
 
 @users.route('/', methods=['PATCH'])
 @jwt_required()
 def update_me():
     user_id = int(get_jwt_identity())
-    data, err, status = validate_json(UserUpdateMeSchema(), partial=True)
+    data, err, status = validate_json(UserUpdateMeSchema, partial=True)
     if err:
         return err, status
 
@@ -132,34 +218,128 @@ def update_me():
     email = data.get("email")
     dob = data.get("date_of_birth")
 
-    conn, cursor = get_cursor()
     try:
-        cursor.execute(
-            """
-            UPDATE users
-            SET
-                user_name = COALESCE(%s, user_name),
-                email     = COALESCE(%s, email),
-                dob       = COALESCE(%s, dob)
-            WHERE user_id = %s
-            RETURNING user_id, user_name, email, dob
-            """,
-            (name, email, dob, user_id)
-        )
-
-        updated = cursor.fetchone()
+        with transaction() as cursor:
+            cursor.execute(
+                """
+                UPDATE users
+                SET
+                    user_name = COALESCE(%s, user_name),
+                    email     = COALESCE(%s, email),
+                    dob       = COALESCE(%s, dob)
+                WHERE user_id = %s
+                RETURNING user_id, user_name, email, dob
+                """,
+                (name, email, dob, user_id)
+            )
+
+            updated = cursor.fetchone()
+
         if not updated:
-            conn.rollback()
             return jsonify(status="error", msg="user not found"), 404
 
-        conn.commit()
         return jsonify(updated), 200
 
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
         return jsonify(status="error", msg="email already in use"), 409
-    finally:
-        release_connection(conn)
+
+
+MAX_PUBLIC_PROFILES = 200
+
+_PUBLIC_PROFILES_SQL = """
+    SELECT
+        u.user_id,
+        u.user_name,
+        u.email,
+        u.dob,
+        COALESCE((
+            SELECT json_agg(json_build_object('role_name', ur.role_name) ORDER BY ur.role_name)
+            FROM users_roles ur
+            WHERE ur.user_id = u.user_id
+        ), '[]'::json) AS roles,
+        COALESCE((
+            SELECT json_agg(json_build_object('skill_name', us.skill_name) ORDER BY us.skill_name)
+            FROM users_skills us
+            WHERE us.user_id = u.user_id
+        ), '[]'::json) AS skills,
+        {media} AS media
+    FROM users u
+    WHERE u.user_id = ANY(%s)
+      AND EXISTS (
+          SELECT 1
+          FROM applications a
+          JOIN gigs g ON g.gig_id = a.gig_id
+          WHERE a.user_id = u.user_id
+            AND g.posted_by_user_id = %s
+      )
+"""
+
+_ACTIVE_MEDIA_SQL = """COALESCE((
+            SELECT json_object_agg(m.kind, json_build_object(
+                       'kind', m.kind,
+                       'resource_type', m.resource_type,
+                       'public_id', m.public_id,
+                       'secure_url', m.secure_url))
+            FROM (
+                SELECT DISTINCT ON (kind) kind, resource_type, public_id, secure_url
+                FROM user_media
+                WHERE user_id = u.user_id AND is_active = TRUE
+                ORDER BY kind, created_at DESC
+            ) m
+        ), '{}'::json)"""
+
+
+def _public_profiles(cursor, current_user_id, user_ids):
+    """{user_id: profile} for the requested users the caller may see, in one statement.
+
+    Access control: the caller must have posted a gig the user applied to. Users that
+    don't exist or aren't visible are left out of the result.
+    """
+    params = (list(user_ids), current_user_id)
+    try:
+        cursor.execute(_PUBLIC_PROFILES_SQL.format(media=_ACTIVE_MEDIA_SQL), params)
+    except psycopg2.errors.UndefinedTable:
+        # If user_media table isn't present yet in a dev DB, return without media.
+        cursor.connection.rollback()
+        cursor.execute(_PUBLIC_PROFILES_SQL.format(media="'{}'::json"), params)
+
+    return {
+        row["user_id"]: {
+            "user_id": row["user_id"],
+            "name": row["user_name"],
+            "email": row["email"],
+            "dob": row["dob"],
+            "roles": row["roles"],
+            "skills": row["skills"],
+            "media": row["media"],
+        }
+        for row in cursor.fetchall()
+    }
+
+
+@users.route('/public', methods=['GET'])
+@jwt_required()
+def get_public_user_profiles():
+    """Employer-facing profiles for many applicants: GET /users/public?ids=1,2,3
+
+    Returns {user_id: profile} with the same profile shape as /users/<id>/public.
+    Ids the caller isn't allowed to see are left out.
+    """
+    raw = [part.strip() for part in request.args.get('ids', '').split(',') if part.strip()]
+    try:
+        user_ids = list(dict.fromkeys(int(part) for part in raw))
+    except ValueError:
+        return jsonify(status="error", msg="ids must be a comma separated list of integers"), 400
+    if not user_ids:
+        return jsonify(status="error", msg="ids is required"), 400
+    if len(user_ids) > MAX_PUBLIC_PROFILES:
+        return jsonify(status="error", msg=f"at most {MAX_PUBLIC_PROFILES} ids per request"), 400
+
+    current_user_id = int(get_jwt_identity())
+    with transaction(readonly=True) as cursor:
+        profiles = _public_profiles(cursor, current_user_id, user_ids)
+
+    return jsonify({str(user_id): profile for user_id, profile in profiles.items()}), 200
 
 
 @users.route('/<int:user_id>/public', methods=['GET'])
@@ -172,99 +352,11 @@ def get_public_user_profile(user_id: int):
     """
 
     current_user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
 
-    try:
-        # Authorization: current user must have at least one gig (posted_by_user_id)
-        # where the target user has an application.
-        cursor.execute(
-            """
-            SELECT 1
-            FROM gigs g
-            JOIN applications a ON a.gig_id = g.gig_id
-            WHERE g.posted_by_user_id = %s
-              AND a.user_id = %s
-            LIMIT 1
-            """,
-            (current_user_id, user_id),
-        )
-        allowed = cursor.fetchone()
-        if not allowed:
-            return jsonify({"error": "not authorized"}), 403
+    with transaction(readonly=True) as cursor:
+        profiles = _public_profiles(cursor, current_user_id, [user_id])
 
-        cursor.execute(
-            """
-            SELECT user_id, user_name, email, dob
-            FROM users
-            WHERE user_id = %s
-            """,
-            (user_id,),
-        )
-        u = cursor.fetchone()
-        if not u:
-            return jsonify({"error": "user not found"}), 404
-
-        # roles
-        cursor.execute(
-            """
-            SELECT role_name
-            FROM users_roles
-            WHERE user_id = %s
-            ORDER BY role_name
-            """,
-            (user_id,),
-        )
-        roles = cursor.fetchall() or []
-
-        # skills
-        cursor.execute(
-            """
-            SELECT skill_name
-            FROM users_skills
-            WHERE user_id = %s
-            ORDER BY skill_name
-            """,
-            (user_id,),
-        )
-        skills = cursor.fetchall() or []
-
-        # media (optional table)
-        media_by_kind = {}
-        try:
-            cursor.execute(
-                """
-                SELECT kind, resource_type, public_id, secure_url
-                FROM user_media
-                WHERE user_id = %s AND is_active = TRUE
-                """,
-                (user_id,),
-            )
-            media_rows = cursor.fetchall() or []
-            for r in media_rows:
-                k = r.get("kind")
-                if not k:
-                    continue
-                media_by_kind[k] = {
-                    "kind": k,
-                    "resource_type": r.get("resource_type"),
-                    "public_id": r.get("public_id"),
-                    "secure_url": r.get("secure_url"),
-                }
-        except Exception:
-            # If user_media table isn't present yet in a dev DB, return without media.
-            media_by_kind = {}
-
-        return jsonify(
-            {
-                "user_id": u.get("user_id"),
-                "name": u.get("user_name"),
-                "email": u.get("email"),
-                "dob": u.get("dob"),
-                "roles": roles,
-                "skills": skills,
-                "media": media_by_kind,
-            }
-        ), 200
-
-    finally:
-        release_connection(conn)
+    profile = profiles.get(user_id)
+    if not profile:
+        return jsonify({"error": "not authorized"}), 403
+    return jsonify(profile), 200
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from db.db_pool import get_cursor, release_connection
+from db.db_pool import transaction, with_cursor
 import psycopg2
 
 
@@ -14,21 +14,16 @@ def assign_skill():
     user_id = int(data["user_id"])
     skill_name = data["skill_name"].strip().lower()
 
-    conn, cursor = get_cursor()
-
     try:
-        cursor.execute(
-            "INSERT INTO users_skills (user_id, skill_name) VALUES (%s, %s)",
-            (user_id, skill_name)
-        )
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO users_skills (user_id, skill_name) VALUES (%s, %s)",
+                (user_id, skill_name)
+            )
 
     except psycopg2.errors.UniqueViolation:
-        conn.rollback()
-        release_connection(conn)
         return jsonify(status="error", msg="skill already assigned"), 400
 
-    release_connection(conn)
     return jsonify(status="ok", msg="skill assigned"), 201
 
 @users_skills.route("/skills", methods=["DELETE"])
@@ -39,25 +34,23 @@ def remove_skill():
     user_id = int(data["user_id"])
     skill_name = data["skill_name"].strip().lower()
 
-    conn, cursor = get_cursor()
-
-    cursor.execute(
-        "DELETE FROM users_skills WHERE user_id = %s AND skill_name = %s",
-        (user_id, skill_name)
-    )
-    conn.commit()
-    release_connection(conn)
+    with transaction() as cursor:
+        cursor.execute(
+            "DELETE FROM users_skills WHERE user_id = %s AND skill_name = %s",
+            (user_id, skill_name)
+        )
+        removed = cursor.rowcount
 
-    if cursor.rowcount == 0:
+    if removed == 0:
         return jsonify(status="error", msg="skill not found"), 404
 
     return jsonify(status="ok", msg="skill removed"), 200
 
 @users_skills.route("/", methods=["GET"])
 @jwt_required()
-def get_skills_for_user():
+@with_cursor(readonly=True)
+def get_skills_for_user(cursor):
     user_id = int(get_jwt_identity())
-    conn, cursor = get_cursor()
 
     cursor.execute(
         "SELECT us.skill_name FROM users_skills us WHERE us.user_id = %s ORDER BY us.skill_name",
@@ -65,7 +58,6 @@ def get_skills_for_user():
     )
 
     rows = cursor.fetchall()
-    release_connection(conn)
 
     skills = [r["skill_name"] for r in rows]
 
@@ -4,7 +4,7 @@ Usage:
   from resources.validations.schemas import UserRegisterSchema
   from resources.validations.request import validate_json
 
-  payload, errors, status = validate_json(UserRegisterSchema())
+  payload, errors, status = validate_json(UserRegisterSchema)
   if errors:
       return errors, status
 """
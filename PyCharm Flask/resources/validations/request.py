@@ -1,16 +1,27 @@
 from __future__ import annotations
 
-from typing import Any, Tuple
+import os
+import threading
+from typing import Any, Callable, Tuple, Type
 
 from flask import jsonify, request
-from marshmallow import Schema, ValidationError
+from marshmallow import EXCLUDE, INCLUDE, RAISE, Schema, ValidationError, missing
+
+# Load simple schemas with a precompiled loader instead of Schema.load (see compile_loader).
+VALIDATION_FAST_PATH = os.getenv("VALIDATION_FAST_PATH", "0") == "1"
+
+Loader = Callable[[Any], Any]
+
+_loaders: dict[tuple, Loader] = {}
+_loaders_lock = threading.Lock()
 
 
 def validate_json(
-    schema: Schema,
+    schema: Type[Schema] | Schema,
     *,
     partial: bool = False,
     allow_unknown: bool = False,
+    many: bool = False,
 ) -> Tuple[dict[str, Any] | None, Any | None, int]:
     """Validate request JSON against a Marshmallow schema.
 
@@ -20,18 +31,129 @@ def validate_json(
       - Returns (data, error_response, status_code).
 
     `allow_unknown=False` will reject unknown fields by default.
+
+    Pass the schema class (`validate_json(GigCreateSchema)`) so the schema, or its
+    compiled loader, is built once per configuration instead of once per request.
+    Schema instances are still accepted and used as they are.
     """
 
     data = request.get_json(silent=True)
     if data is None:
         return None, jsonify({"status": "error", "msg": "Invalid or missing JSON body"}), 400
 
+    unknown = "INCLUDE" if allow_unknown else "RAISE"
+    if isinstance(schema, Schema):
+        load = lambda value: schema.load(value, partial=partial, unknown=unknown)  # noqa: E731
+    else:
+        load = get_loader(schema, many=many, partial=partial, unknown=unknown)
+
     try:
-        loaded = schema.load(
-            data,
-            partial=partial,
-            unknown=("INCLUDE" if allow_unknown else "RAISE"),
-        )
+        loaded = load(data)
         return loaded, None, 200
     except ValidationError as err:
         return None, jsonify({"status": "error", "msg": "Validation error", "errors": err.messages}), 422
+
+
+def get_loader(
+    schema_class: Type[Schema],
+    *,
+    many: bool = False,
+    partial: bool = False,
+    unknown: str = RAISE,
+    fast: bool | None = None,
+) -> Loader:
+    """A cached function equivalent to `schema_class(many=many).load(data, partial=..., unknown=...)`."""
+    # Imported here so validation doesn't depend on resources.metrics, and through it db.db_pool.
+    from resources import metrics
+
+    fast = VALIDATION_FAST_PATH if fast is None else fast
+    key = (schema_class, many, partial, unknown, fast)
+    loader = _loaders.get(key)
+    if loader is None:
+        with _loaders_lock:
+            loader = _loaders.get(key)
+            if loader is None:
+                metrics.cache_miss("validation_loader")
+                schema = schema_class(many=many)
+                loader = compile_loader(schema, partial=partial, unknown=unknown) if fast else None
+                if loader is None:
+                    loader = lambda value: schema.load(value, partial=partial, unknown=unknown)  # noqa: E731
+                _loaders[key] = loader
+                return loader
+    metrics.cache_hit("validation_loader")
+    return loader
+
+
+def compile_loader(schema: Schema, *, partial: bool = False, unknown: str = RAISE) -> Loader | None:
+    """Build a loader that calls each field's `deserialize` directly.
+
+    Schema.load spends much of its time on generic machinery (hooks, error store
+    merging, partial/nested bookkeeping) that flat schemas like ours don't use. For
+    schemas without hooks this does the same work field by field and raises the same
+    ValidationError messages. Returns None for schemas it can't handle, so the caller
+    falls back to Schema.load.
+    """
+    if any(schema._hooks.values()):
+        return None
+    if any(field.attribute and "." in field.attribute for field in schema.load_fields.values()):
+        return None
+
+    # (data key, attribute to load into, field.deserialize)
+    fields = [
+        (field.data_key if field.data_key is not None else name, field.attribute or name, field.deserialize)
+        for name, field in schema.load_fields.items()
+    ]
+    known = {data_key for data_key, _, _ in fields}
+    type_error = [schema.error_messages["type"]]
+    unknown_error = [schema.error_messages["unknown"]]
+    field_kwargs = {"partial": partial}
+
+    def load_one(data):
+        if not isinstance(data, dict):
+            return {}, {"_schema": list(type_error)}
+
+        loaded = {}
+        errors = {}
+        for data_key, attribute, deserialize in fields:
+            raw = data.get(data_key, missing)
+            if raw is missing and partial:
+                continue
+            try:
+                value = deserialize(raw, data_key, data, **field_kwargs)
+            except ValidationError as err:
+                errors[data_key] = err.messages
+                # Like Schema.load, keep the valid part of a failed List/Nested value.
+                value = err.valid_data or missing
+            if value is not missing:
+                loaded[attribute] = value
+
+        if unknown != EXCLUDE:
+            for key in data.keys() - known:
+                if unknown == INCLUDE:
+                    loaded[key] = data[key]
+                elif unknown == RAISE:
+                    errors[key] = list(unknown_error)
+        return loaded, errors
+
+    if not schema.many:
+        def load(data):
+            loaded, errors = load_one(data)
+            if errors:
+                raise ValidationError(errors, data=data, valid_data=loaded)
+            return loaded
+        return load
+
+    def load_many(data):
+        if not isinstance(data, (list, tuple)):
+            raise ValidationError({"_schema": list(type_error)}, data=data, valid_data=[])
+        results = []
+        errors = {}
+        for index, item in enumerate(data):
+            loaded, item_errors = load_one(item)
+            results.append(loaded)
+            if item_errors:
+                errors[index] = item_errors
+        if errors:
+            raise ValidationError(errors, data=data, valid_data=results)
+        return results
+    return load_many
@@ -21,19 +21,21 @@ class UserUpdateMeSchema(Schema):
     date_of_birth = fields.Date(required=False, allow_none=True)
 
 
+# Lengths follow the columns (SQL Commands/DanceCentralTableCreation.sql), so a value
+# the table would reject is a 422 for that field rather than a DataError.
 class GigCreateSchema(Schema):
-    gig_name = fields.String(required=True, validate=validate.Length(min=1, max=200))
+    gig_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
     gig_date = fields.Date(required=True)
     gig_details = fields.String(required=True, validate=validate.Length(min=1, max=4000))
-    type_name = fields.String(required=True, validate=validate.Length(min=1, max=120))
+    type_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
     employer_id = fields.Integer(required=True, strict=True)
 
 
 class GigUpdateSchema(Schema):
-    gig_name = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=200))
+    gig_name = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=50))
     gig_date = fields.Date(required=False, allow_none=True)
     gig_details = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=4000))
-    type_name = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=120))
+    type_name = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=50))
     employer_id = fields.Integer(required=False, allow_none=True, strict=True)
 
 
@@ -65,22 +67,36 @@ class ApplicationUpdateStatusSchema(Schema):
     status = fields.String(required=True, validate=validate.Length(min=1, max=50))
 
 
+class ApplicationBulkStatusSchema(Schema):
+    application_id = fields.Integer(required=True, strict=True)
+    status = fields.String(required=True, validate=validate.Length(min=1, max=50))
+
+
 class GigRoleCreateSchema(Schema):
     gig_id = fields.Integer(required=True, strict=True)
-    role_name = fields.String(required=True, validate=validate.Length(min=1, max=120))
+    role_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
     needed_count = fields.Integer(required=True, strict=True, validate=validate.Range(min=1, max=10000))
-    pay_amount = fields.Float(required=True)
-    pay_currency = fields.String(required=True, validate=validate.Length(min=1, max=10))
+    pay_amount = fields.Float(required=True, validate=validate.Range(max=99999999.99))
+    pay_currency = fields.String(required=True, validate=validate.Length(equal=3))
     pay_unit = fields.String(required=True, validate=validate.Length(min=1, max=50))
 
 
+class GigBulkCreateSchema(GigCreateSchema):
+    """One item of POST /gigs/bulk: a gig plus the roles to create with it."""
+    roles = fields.List(fields.Nested(GigRoleCreateSchema(exclude=("gig_id",))), load_default=list)
+
+
 class GigRoleDeleteSchema(Schema):
     role_name = fields.String(required=True, validate=validate.Length(min=1, max=120))
 
 
+class GigRoleLookupSchema(Schema):
+    gig_ids = fields.List(fields.Integer(strict=True), required=True, validate=validate.Length(min=1, max=200))
+
+
 class GigRoleUpdateSchema(Schema):
-    role_name = fields.String(required=True, validate=validate.Length(min=1, max=120))
+    role_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
     needed_count = fields.Integer(required=False, allow_none=True, strict=True, validate=validate.Range(min=1, max=10000))
-    pay_amount = fields.Float(required=False, allow_none=True)
-    pay_currency = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=10))
+    pay_amount = fields.Float(required=False, allow_none=True, validate=validate.Range(max=99999999.99))
+    pay_currency = fields.String(required=False, allow_none=True, validate=validate.Length(equal=3))
     pay_unit = fields.String(required=False, allow_none=True, validate=validate.Length(min=1, max=50))
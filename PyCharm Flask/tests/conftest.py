@@ -0,0 +1,78 @@
+"""Shared fixtures for endpoint tests that run without a database.
+
+A test module opts in by defining two fixtures:
+
+  @pytest.fixture
+  def transaction_modules():
+      return [gigs_module]      # modules whose `transaction` the `cursor` fixture replaces
+
+  @pytest.fixture
+  def blueprint():
+      return gigs, "/gigs"      # what the `client` fixture registers, and where
+
+`cursor` is then a ScriptedCursor every patched transaction() yields, and `client`
+a test client authenticated as user 7.
+"""
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class ScriptedCursor:
+    """Returns the scripted results in order, one per execute(); an exception is raised instead."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.executed = []
+        self.rows = []
+        self.connection = FakeConnection()
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        self.rows = result
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+@pytest.fixture
+def cursor(monkeypatch, transaction_modules):
+    cursor = ScriptedCursor()
+
+    @contextmanager
+    def transaction(readonly=False, tuples=False):
+        yield cursor
+
+    for module in transaction_modules:
+        monkeypatch.setattr(module, "transaction", transaction)
+    return cursor
+
+
+@pytest.fixture
+def client(blueprint):
+    blueprint, url_prefix = blueprint
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-enough-bytes"
+    JWTManager(app)
+    app.register_blueprint(blueprint, url_prefix=url_prefix)
+    with app.app_context():
+        token = create_access_token(identity="7")
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
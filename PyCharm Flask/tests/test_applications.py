@@ -0,0 +1,87 @@
+import psycopg2
+import pytest
+
+from resources import applications as applications_module
+from resources.applications import applications
+from resources.pagination import encode_cursor
+
+
+@pytest.fixture
+def transaction_modules():
+    return [applications_module]
+
+
+@pytest.fixture
+def blueprint():
+    return applications, "/applications"
+
+
+def test_database_error_is_a_500_not_an_empty_list(cursor, client, caplog):
+    cursor.results = [psycopg2.OperationalError("server closed the connection")]
+
+    response = client.get("/applications/")
+
+    assert response.status_code == 500
+    assert response.json["status"] == "error"
+    assert "could not list applications" in caplog.text
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    calls = []
+
+    def execute_values(cursor, sql, argslist, template=None, page_size=100, fetch=False):
+        calls.append(list(argslist))
+        return [{"application_id": application_id, "status": status} for application_id, status in argslist]
+
+    monkeypatch.setattr(applications_module, "execute_values", execute_values)
+    return calls
+
+
+def test_bulk_update_reports_each_item(cursor, client, updates):
+    # Caller 7 posted the gigs behind applications 1 and 3; 2 belongs to someone else.
+    cursor.results = [[
+        {"application_id": 1, "posted_by_user_id": 7},
+        {"application_id": 2, "posted_by_user_id": 8},
+        {"application_id": 3, "posted_by_user_id": 7},
+    ]]
+
+    response = client.patch("/applications/bulk", json=[
+        {"application_id": 1, "status": "shortlisted"},
+        {"application_id": 9, "status": "accepted"},
+        {"application_id": 2, "status": "accepted"},
+        {"application_id": 3, "status": "withdrawn"},
+        {"application_id": 1, "status": "rejected"},
+        # The first copy of 3 was rejected; the repeat must not slip through.
+        {"application_id": 3, "status": "accepted"},
+    ])
+
+    assert response.status_code == 200
+    assert [(r["application_id"], r["status"], r.get("error")) for r in response.json["results"]] == [
+        (1, "ok", None),
+        (9, "error", "Application not found"),
+        (2, "error", "not authorized"),
+        (3, "error", "Employers cannot set status 'withdrawn'"),
+        (1, "error", "Application listed more than once"),
+        (3, "error", "Application listed more than once"),
+    ]
+    assert response.json["results"][0]["application"] == {"application_id": 1, "status": "shortlisted"}
+    assert updates == [[(1, "shortlisted")]]
+
+
+def test_bulk_update_with_nothing_allowed_runs_no_update(cursor, client, updates):
+    cursor.results = [[]]
+
+    response = client.patch("/applications/bulk", json=[{"application_id": 9, "status": "accepted"}])
+
+    assert response.json["results"] == [
+        {"application_id": 9, "status": "error", "error": "Application not found"}
+    ]
+    assert updates == []
+
+
+def test_tampered_applicants_cursor_is_a_400(cursor, client):
+    response = client.get(f"/applications/?gig_id=3&cursor={encode_cursor('x', 'y')}")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
@@ -0,0 +1,214 @@
+import threading
+import time
+
+import psycopg2.extensions
+import psycopg2.extras
+import pytest
+
+from db import db_pool
+from db.db_pool import ConnectionPool, PoolTimeout, transaction, with_cursor
+
+
+class FakeInfo:
+    transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, cursor_factory=None):
+        self.cursor_factory = cursor_factory
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.info = FakeInfo()
+        self.rollbacks = 0
+        self.commits = 0
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(cursor_factory)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+def _pool(minconn=0, maxconn=2, **kwargs):
+    kwargs.setdefault("timeout", 0.2)
+    return ConnectionPool(minconn, maxconn, connect=FakeConnection, **kwargs)
+
+
+def test_min_connections_are_opened_up_front():
+    pool = _pool(minconn=2, maxconn=3)
+    assert pool.stats()["size"] == 2
+    assert pool.stats()["idle"] == 2
+
+
+def test_connections_are_reused():
+    pool = _pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+
+
+def test_checkout_times_out_when_exhausted():
+    pool = _pool(maxconn=1)
+    pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05)
+    assert pool.stats()["waiting"] == 0
+
+
+def test_waiter_gets_connection_released_by_other_thread():
+    pool = _pool(maxconn=1, timeout=2)
+    conn = pool.getconn()
+    got = []
+
+    t = threading.Thread(target=lambda: got.append(pool.getconn()))
+    t.start()
+    time.sleep(0.05)
+    assert pool.stats()["waiting"] == 1
+
+    pool.putconn(conn)
+    t.join(1)
+    assert got == [conn]
+
+
+def test_reserve_keeps_connections_for_other_callers():
+    pool = _pool(maxconn=2)
+    pool.getconn(reserve=1)
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05, reserve=1)
+    # A caller without a reserve can still use the held-back connection.
+    assert pool.getconn(timeout=0.05, reserve=0) is not None
+
+
+def test_unreserved_caller_skips_queued_reserved_waiters():
+    pool = _pool(maxconn=3, timeout=2)
+    held = [pool.getconn(), pool.getconn()]
+    got = []
+
+    t = threading.Thread(target=lambda: got.append(pool.getconn(reserve=1)))
+    t.start()
+    time.sleep(0.05)
+    assert pool.stats()["waiting"] == 1
+
+    # The queued waiter can't use the last connection, but this caller can.
+    cheap = pool.getconn(timeout=0.05)
+    pool.putconn(cheap)
+    pool.putconn(held.pop())
+    t.join(1)
+    assert len(got) == 1
+
+
+def test_open_transaction_is_rolled_back_on_release():
+    pool = _pool()
+    conn = pool.getconn()
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_expired_connections_are_replaced():
+    pool = _pool(max_lifetime=0.01)
+    conn = pool.getconn()
+    time.sleep(0.02)
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.getconn() is not conn
+
+
+def test_idle_connections_above_minimum_are_recycled():
+    pool = _pool(minconn=0, max_idle=0.01)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    time.sleep(0.02)
+    assert pool.getconn() is not conn
+    assert conn.closed
+
+
+def test_unknown_connection_is_rejected():
+    pool = _pool()
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.putconn(FakeConnection())
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = _pool()
+    monkeypatch.setattr(db_pool, "pool", pool)
+    return pool
+
+
+@pytest.fixture
+def fake_replica(monkeypatch, fake_pool):
+    replica = _pool()
+    monkeypatch.setenv("DB_REPLICA_HOST", "replica")
+    monkeypatch.setattr(db_pool, "replica_pool", replica)
+    return replica
+
+
+def test_transaction_commits_and_releases(fake_pool):
+    with transaction() as cursor:
+        assert fake_pool.stats()["in_use"] == 1
+    conn = fake_pool.getconn()
+    assert conn.commits == 1
+    assert conn.rollbacks == 0
+
+
+def test_transaction_rolls_back_and_releases_on_error(fake_pool):
+    with pytest.raises(RuntimeError):
+        with transaction():
+            raise RuntimeError("boom")
+    assert fake_pool.stats()["in_use"] == 0
+    conn = fake_pool.getconn()
+    assert conn.commits == 0
+    assert conn.rollbacks == 1
+
+
+def test_with_cursor_passes_cursor_and_view_args(fake_pool):
+    @with_cursor
+    def view(cursor, gig_id):
+        return cursor, gig_id
+
+    cursor, gig_id = view(gig_id=7)
+    assert isinstance(cursor, FakeCursor)
+    assert gig_id == 7
+    assert fake_pool.stats()["in_use"] == 0
+
+
+def test_tuples_transaction_uses_plain_cursor(fake_pool):
+    with transaction() as cursor:
+        assert issubclass(cursor.cursor_factory, psycopg2.extras.RealDictCursor)
+    with transaction(tuples=True) as cursor:
+        assert not issubclass(cursor.cursor_factory, psycopg2.extras.RealDictCursor)
+
+
+def test_readonly_transaction_uses_replica(fake_pool, fake_replica):
+    with transaction(readonly=True):
+        assert fake_replica.stats()["in_use"] == 1
+        assert fake_pool.stats()["in_use"] == 0
+    assert fake_replica.stats()["idle"] == 1
+
+    with transaction():
+        assert fake_pool.stats()["in_use"] == 1
+
+
+def test_reads_stick_to_primary_when_replica_not_allowed(fake_pool, fake_replica):
+    token = db_pool.replica_allowed.set(lambda: False)
+    try:
+        with transaction(readonly=True):
+            assert fake_pool.stats()["in_use"] == 1
+            assert fake_replica.stats()["in_use"] == 0
+    finally:
+        db_pool.replica_allowed.reset(token)
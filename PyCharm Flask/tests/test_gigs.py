@@ -0,0 +1,278 @@
+from datetime import datetime, timezone
+
+import psycopg2
+import pytest
+
+from resources import gigs as gigs_module
+from resources.gigs import _bulk_reference_errors, gigs
+from resources.pagination import (
+    NEXT_CURSOR_HEADER,
+    cursor_float,
+    cursor_int,
+    cursor_timestamp,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+@pytest.fixture
+def transaction_modules():
+    return [gigs_module]
+
+
+@pytest.fixture
+def blueprint():
+    return gigs, "/gigs"
+
+
+def _search_row(gig_id, rank):
+    return {"gig_id": gig_id, "gig_name": f"Salsa night {gig_id}", "rank": rank, "snippet": "<mark>salsa</mark>"}
+
+
+def test_search_requires_a_query(cursor, client):
+    response = client.get("/gigs/search?q=%20")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
+
+
+def test_search_rejects_a_bad_cursor(cursor, client):
+    response = client.get("/gigs/search?q=salsa&cursor=not-a-cursor")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
+
+
+def test_search_pages_by_rank_then_gig_id(cursor, client):
+    cursor.results = [[_search_row(9, 0.9), _search_row(5, 0.5), _search_row(4, 0.5)]]
+
+    response = client.get("/gigs/search?q=salsa&limit=2")
+
+    [(sql, params)] = cursor.executed
+    assert "(r.rank, r.gig_id) <" not in sql
+    assert params == ("salsa", 3)
+    assert [row["gig_id"] for row in response.json] == [9, 5]
+    # The next page starts after the last row shown, not the extra one fetched.
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER], cursor_float, cursor_int) == [0.5, 5]
+
+
+def test_search_continues_after_the_cursor(cursor, client):
+    cursor.results = [[_search_row(4, 0.5)]]
+
+    response = client.get(f"/gigs/search?q=salsa&limit=2&cursor={encode_cursor(0.5, 5)}")
+
+    [(sql, params)] = cursor.executed
+    assert "WHERE (r.rank, r.gig_id) < (%s::float8, %s::bigint)" in sql
+    assert params == ("salsa", 0.5, 5, 3)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_search_page_size_is_capped(cursor, client):
+    cursor.results = [[]]
+
+    client.get("/gigs/search?q=salsa&limit=500")
+
+    assert cursor.executed[0][1][-1] == 51
+
+
+def _feed_row(gig_id, created_at):
+    return {"gig_id": gig_id, "gig_name": f"Gig {gig_id}", "created_at": created_at, "roles": [], "my_application": None}
+
+
+def test_feed_filters_on_any_of_the_roles(cursor, client):
+    cursor.results = [[]]
+
+    response = client.get("/gigs/feed?role=Dancer, singer,,&type_name=wedding")
+
+    assert response.status_code == 200
+    [(sql, params)] = cursor.executed
+    assert "fr.role_name = ANY(%s)" in sql
+    # The caller's id for the applications join comes first, the page size last.
+    assert params == (7, "wedding", ["dancer", "singer"], 51)
+
+
+def test_feed_without_roles_has_no_role_filter(cursor, client):
+    cursor.results = [[]]
+
+    client.get("/gigs/feed")
+
+    [(sql, params)] = cursor.executed
+    assert "WHERE" not in sql.split("LEFT JOIN applications")[1]
+    assert params == (7, 51)
+
+
+def test_feed_pages_by_created_at_then_gig_id(cursor, client):
+    created_at = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    cursor.results = [[_feed_row(3, created_at), _feed_row(2, created_at)]]
+
+    response = client.get(f"/gigs/feed?limit=1&cursor={encode_cursor(created_at, 4)}")
+
+    [(sql, params)] = cursor.executed
+    assert "(g.created_at, g.gig_id) < (%s::timestamptz, %s::bigint)" in sql
+    assert params == (7, created_at, 4, 2)
+    assert [row["gig_id"] for row in response.json] == [3]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER], cursor_timestamp, cursor_int) == [created_at, 3]
+
+
+@pytest.mark.parametrize("values", [(0.5,), ("x", "y"), ("2025-03-01T12:30:00+00:00", "4")])
+def test_feed_rejects_a_cursor_of_the_wrong_shape(cursor, client, values):
+    response = client.get(f"/gigs/feed?cursor={encode_cursor(*values)}")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
+
+
+def test_search_rejects_a_tampered_cursor(cursor, client):
+    response = client.get(f"/gigs/search?q=salsa&cursor={encode_cursor('high', 5)}")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
+
+
+def _bulk_item(gig_name, type_name="wedding", employer_id=3, roles=()):
+    return {"gig_name": gig_name, "gig_date": "2025-06-01", "gig_details": "Evening set", "type_name": type_name,
+            "employer_id": employer_id,
+            "roles": [{"role_name": role, "needed_count": 2, "pay_amount": 80.0, "pay_currency": "SGD",
+                       "pay_unit": "gig"} for role in roles]}
+
+
+def _known(types=("wedding",), employers=(3,), roles=("dancer", "singer")):
+    """Results for the three lookups _bulk_reference_errors makes."""
+    return [
+        [{"type_name": t} for t in types],
+        [{"employer_id": e} for e in employers],
+        [{"role_name": r} for r in roles],
+    ]
+
+
+def test_bulk_reference_errors_are_keyed_by_item_and_role_index(cursor):
+    cursor.results = _known()
+    items = [
+        _bulk_item("ok", roles=["dancer", "singer"]),
+        _bulk_item("bad type", type_name="rave"),
+        _bulk_item("bad employer and roles", employer_id=99, roles=["dancer", "juggler", "dancer"]),
+    ]
+
+    errors = _bulk_reference_errors(cursor, items)
+
+    assert errors == {
+        1: {"type_name": ["Unknown event type."]},
+        2: {
+            "employer_id": ["Unknown employer."],
+            "roles": {1: {"role_name": ["Unknown role."]}, 2: {"role_name": ["Role listed twice."]}},
+        },
+    }
+    # One query per reference table, whatever the batch size.
+    assert [sorted(params[0]) for _, params in cursor.executed] == [
+        ["rave", "wedding"], [3, 99], ["dancer", "juggler", "singer"]
+    ]
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    calls = []
+
+    def execute_values(cursor, sql, argslist, page_size=100):
+        calls.append((sql, list(argslist)))
+
+    monkeypatch.setattr(gigs_module, "execute_values", execute_values)
+    return calls
+
+
+def test_bulk_create_reports_every_bad_item_and_inserts_nothing(cursor, client, inserts):
+    cursor.results = _known()
+
+    response = client.post("/gigs/bulk", json=[
+        _bulk_item("ok"), _bulk_item("bad", type_name="rave", roles=["juggler"]),
+    ])
+
+    assert response.status_code == 422
+    # JSON object keys are strings, so the item and role indexes come back as "1" and "0".
+    assert response.json["errors"] == {
+        "1": {"type_name": ["Unknown event type."], "roles": {"0": {"role_name": ["Unknown role."]}}}
+    }
+    assert inserts == []
+
+
+def test_bulk_create_schema_errors_are_keyed_by_item(cursor, client, inserts):
+    response = client.post("/gigs/bulk", json=[_bulk_item("ok"), {"gig_name": "missing fields"}])
+
+    assert response.status_code == 422
+    assert list(response.json["errors"]) == ["1"]
+    assert cursor.executed == []
+
+
+def test_bulk_create_ties_roles_to_gigs_by_id(cursor, client, inserts):
+    cursor.results = _known() + [[{"gig_id": 41}, {"gig_id": 42}]]
+
+    response = client.post("/gigs/bulk", json=[
+        _bulk_item("first", roles=["dancer"]), _bulk_item("second", roles=["singer", "dancer"]),
+    ])
+
+    assert response.status_code == 201
+    assert response.json["gig_ids"] == [41, 42]
+    sql, params = cursor.executed[-1]
+    assert "nextval(pg_get_serial_sequence('gigs', 'gig_id'))" in sql
+    assert params == (2,)
+
+    (gig_sql, gig_rows), (_, role_rows) = inserts
+    assert "INSERT INTO gigs (gig_id," in gig_sql
+    assert [(row[0], row[1]) for row in gig_rows] == [(41, "first"), (42, "second")]
+    assert [(row[0], row[1]) for row in role_rows] == [(41, "dancer"), (42, "singer"), (42, "dancer")]
+
+
+def test_bulk_create_rejects_values_too_long_for_their_columns(cursor, client, inserts):
+    oversized = _bulk_item("x" * 51, roles=["dancer"])
+    oversized["roles"][0]["pay_currency"] = "SGDX"
+
+    response = client.post("/gigs/bulk", json=[_bulk_item("ok"), oversized])
+
+    assert response.status_code == 422
+    assert set(response.json["errors"]["1"]) == {"gig_name", "roles"}
+    assert "pay_currency" in response.json["errors"]["1"]["roles"]["0"]
+    assert cursor.executed == []
+
+
+def test_bulk_create_data_errors_are_not_a_500(cursor, client, monkeypatch):
+    def execute_values(cursor, sql, argslist, page_size=100):
+        raise psycopg2.errors.StringDataRightTruncation("value too long for type character varying(50)")
+
+    monkeypatch.setattr(gigs_module, "execute_values", execute_values)
+    cursor.results = _known() + [[{"gig_id": 41}]]
+
+    response = client.post("/gigs/bulk", json=[_bulk_item("ok")])
+
+    assert response.status_code == 422
+    assert response.json["status"] == "error"
+
+
+class RecordingStream:
+    """Stands in for RowStream: remembers the statement instead of running it."""
+
+    executed = []
+
+    def __init__(self, readonly=False):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.executed.append(params)
+
+
+@pytest.mark.parametrize("query, limit", [("&limit=500", 500), ("", None)])
+def test_streamed_gigs_are_not_clamped_to_a_page(cursor, client, monkeypatch, query, limit):
+    RecordingStream.executed = []
+    monkeypatch.setattr(gigs_module, "RowStream", RecordingStream)
+    monkeypatch.setattr(gigs_module, "stream_response", lambda stream, fmt: ("", 200))
+
+    assert client.get(f"/gigs/?stream=ndjson{query}").status_code == 200
+    assert RecordingStream.executed == [(limit,)]
+
+
+def test_streamed_gigs_reject_a_zero_limit(cursor, client):
+    assert client.get("/gigs/?stream=json&limit=0").status_code == 400
@@ -0,0 +1,83 @@
+import pytest
+
+from resources import gigs_roles as gigs_roles_module
+from resources.gigs_roles import gigs_roles
+from resources.validations import request as validation_request
+from resources.validations.schemas import GigRoleLookupSchema
+
+
+@pytest.fixture
+def transaction_modules():
+    return [gigs_roles_module]
+
+
+@pytest.fixture
+def blueprint():
+    return gigs_roles, "/gigs-roles"
+
+
+def _role(gig_id, role_name):
+    return {"gig_id": gig_id, "role_name": role_name, "needed_count": 2, "pay_amount": "120.00",
+            "pay_currency": "SGD", "pay_unit": "gig"}
+
+
+def test_roles_are_grouped_by_gig_in_one_query(cursor, client):
+    cursor.results = [[_role(1, "dancer"), _role(1, "singer"), _role(3, "dj")]]
+
+    response = client.get("/gigs-roles/?gig_ids=3,1,2,3")
+
+    assert response.status_code == 200
+    [(sql, params)] = cursor.executed
+    assert "gig_id = ANY(%s)" in sql
+    assert params == ([3, 1, 2],)
+    # Keys are strings, since JSON object keys are, and a gig without roles is an empty list.
+    assert response.json == {
+        "1": [_role(1, "dancer"), _role(1, "singer")],
+        "2": [],
+        "3": [_role(3, "dj")],
+    }
+
+
+def test_post_lookup_matches_the_query_string_version(cursor, client):
+    cursor.results = [[_role(5, "dj")]]
+
+    response = client.post("/gigs-roles/lookup", json={"gig_ids": [5, 6]})
+
+    assert response.status_code == 200
+    assert response.json == {"5": [_role(5, "dj")], "6": []}
+
+
+@pytest.mark.parametrize("gig_ids", ["1,two", "1.5"])
+def test_non_integer_ids_are_a_400(cursor, client, gig_ids):
+    response = client.get(f"/gigs-roles/?gig_ids={gig_ids}")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
+
+
+@pytest.mark.parametrize("gig_ids", ["", ",".join(str(i) for i in range(201))])
+def test_empty_or_too_many_ids_are_a_422(cursor, client, gig_ids):
+    response = client.get(f"/gigs-roles/?gig_ids={gig_ids}")
+
+    assert response.status_code == 422
+    assert "gig_ids" in response.json["errors"]
+    assert cursor.executed == []
+
+
+def test_post_lookup_limits_the_list_too(cursor, client):
+    response = client.post("/gigs-roles/lookup", json={"gig_ids": list(range(201))})
+
+    assert response.status_code == 422
+    assert cursor.executed == []
+
+
+def test_query_string_lookup_uses_the_cached_loader(cursor, client, monkeypatch):
+    monkeypatch.setattr(validation_request, "_loaders", {})
+    cursor.results = [[], []]
+
+    client.get("/gigs-roles/?gig_ids=1")
+    loaders = dict(validation_request._loaders)
+    client.get("/gigs-roles/?gig_ids=2")
+
+    assert [key[0] for key in loaders] == [GigRoleLookupSchema]
+    assert validation_request._loaders == loaders
@@ -0,0 +1,141 @@
+import logging
+
+import pytest
+from flask import Flask
+
+from db import db_pool, instrumentation
+from db.db_pool import ConnectionPool, transaction
+from db.instrumentation import RequestQueries, _Instrumented, current_queries, fingerprint
+
+
+class FakeBaseCursor:
+    rowcount = -1
+
+    def __init__(self, cursor_factory=None):
+        pass
+
+    def execute(self, query, vars=None):
+        self.rowcount = 2
+
+    def executemany(self, query, vars_list):
+        self.rowcount = len(vars_list)
+
+    def close(self):
+        pass
+
+
+class FakeCursor(_Instrumented, FakeBaseCursor):
+    pass
+
+
+class FakeConnection:
+    closed = 0
+
+    class info:
+        transaction_status = 0  # TRANSACTION_STATUS_IDLE
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ConnectionPool(0, 2, connect=FakeConnection, timeout=0.2)
+    monkeypatch.setattr(db_pool, "pool", pool)
+    monkeypatch.delenv("DB_REPLICA_HOST", raising=False)
+    return pool
+
+
+@pytest.fixture
+def app(pool):
+    app = Flask(__name__)
+    instrumentation.init_app(app)
+
+    @app.get("/gigs")
+    def gigs():
+        with transaction() as cursor:
+            cursor.execute("SELECT gig_id FROM gigs WHERE employer_id = %s", (1,))
+            for gig_id in range(3):
+                cursor.execute("SELECT * FROM gigs_roles WHERE gig_id = %s", (gig_id,))
+        return {"ok": True}
+
+    return app
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT *\n  FROM gigs WHERE gig_id = %s", "SELECT * FROM gigs WHERE gig_id = ?"),
+    ("SELECT * FROM users WHERE email = 'a''b@c.com' AND user_id = 42", "SELECT * FROM users WHERE email = ? AND user_id = ?"),
+    ("UPDATE t SET x = %(x)s WHERE id = %(id)s", "UPDATE t SET x = ? WHERE id = ?"),
+    ("INSERT INTO gigs_roles VALUES (1,'Dancer',2),(1,'DJ',1) RETURNING gig_id",
+     "INSERT INTO gigs_roles VALUES (...) RETURNING gig_id"),
+    ("SELECT col1, t2.x FROM t2", "SELECT col1, t2.x FROM t2"),
+])
+def test_fingerprint(sql, expected):
+    assert fingerprint(sql) == expected
+
+
+def test_statements_with_inlined_values_skip_the_fingerprint_cache():
+    rows = ",".join(f"({i},'Dancer',2)" for i in range(200))
+    sql = f"INSERT INTO gigs_roles VALUES {rows}"
+    before = instrumentation._cached_fingerprint.cache_info()
+
+    assert fingerprint(sql) == "INSERT INTO gigs_roles VALUES (...)"
+    assert instrumentation._cached_fingerprint.cache_info() == before
+
+
+def test_cursor_records_queries_only_inside_a_request():
+    cursor = FakeCursor()
+    cursor.execute("SELECT 1")
+
+    queries = RequestQueries("GET /x")
+    token = current_queries.set(queries)
+    try:
+        cursor.execute("SELECT * FROM gigs WHERE gig_id = %s", (1,))
+        cursor.executemany("DELETE FROM gigs WHERE gig_id = %s", [(1,), (2,), (3,)])
+    finally:
+        current_queries.reset(token)
+
+    assert [(q.fingerprint, q.rows) for q in queries.queries] == [
+        ("SELECT * FROM gigs WHERE gig_id = ?", 2),
+        ("DELETE FROM gigs WHERE gig_id = ?", 3),
+    ]
+    assert all(q.duration >= 0 and q.started >= 0 for q in queries.queries)
+
+
+def test_repeated_statement_warns_once(monkeypatch, caplog, app):
+    monkeypatch.setattr(instrumentation, "REPEAT_WARN", 2)
+    with caplog.at_level(logging.WARNING, logger="db.instrumentation"):
+        app.test_client().get("/gigs")
+    warnings = [r.getMessage() for r in caplog.records]
+    assert len(warnings) == 1
+    assert "GET /gigs" in warnings[0] and "SELECT * FROM gigs_roles WHERE gig_id = ?" in warnings[0]
+
+
+def test_server_timing_header(monkeypatch, app):
+    monkeypatch.setattr(instrumentation, "QUERY_HEADER", True)
+    header = app.test_client().get("/gigs").headers["Server-Timing"]
+    assert 'desc="4 queries"' in header
+    assert "db-wait;dur=" in header
+
+
+def test_checkout_wait_and_hold_time_are_recorded(pool, app):
+    seen = []
+
+    @app.after_request
+    def grab(response):
+        seen.append(current_queries.get())
+        return response
+
+    app.test_client().get("/gigs")
+    queries = seen[0]
+    assert queries.checkouts == 1
+    assert queries.checkout_wait >= 0
+    assert queries.held >= queries.db_time
+    assert queries.repeated() == {"SELECT * FROM gigs_roles WHERE gig_id = ?": 3}
+    assert current_queries.get() is None
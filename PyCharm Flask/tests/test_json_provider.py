@@ -0,0 +1,114 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+
+from resources import json_provider
+from db.records import to_records
+from resources.json_provider import OrjsonProvider, StdlibProvider
+
+SGT = timezone(timedelta(hours=8))
+
+
+def _row(**values):
+    row = RealDictRow()
+    row.update(values)
+    return row
+
+
+ROWS = [
+    _row(gig_id=7, gig_name="Summer showcase", gig_date=date(2026, 7, 1),
+         created_at=datetime(2026, 5, 2, 9, 30, 15, 123456, tzinfo=SGT), type_name="Concert",
+         employer_id=3, posted_by_user_id=None, pay_amount=Decimal("150.00"),
+         roles=[{"role_name": "Dancer", "pay_amount": "150.00"}]),
+    _row(gig_id=8, gig_name="Café opening ✨", gig_date=None,
+         created_at=datetime(2026, 5, 1, 23, 0, tzinfo=timezone.utc), type_name="Private",
+         employer_id=4, posted_by_user_id=11, pay_amount=Decimal("0.5"), roles=[]),
+]
+
+
+def _app(provider_class):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+
+    @app.get("/rows")
+    def rows():
+        return jsonify(ROWS)
+
+    @app.get("/errors")
+    def errors():
+        return jsonify(status="error", errors={0: {"status": ["Missing data for required field."]}, 2: {}})
+
+    return app
+
+
+@pytest.mark.parametrize("path", ["/rows", "/errors"])
+def test_responses_decode_to_the_same_values_as_flask_default(path):
+    default = _app(DefaultJSONProvider).test_client().get(path)
+    fast = _app(OrjsonProvider).test_client().get(path)
+    assert fast.status_code == default.status_code == 200
+    assert fast.mimetype == default.mimetype
+    assert json.loads(fast.data) == json.loads(default.data)
+    assert fast.data.endswith(b"\n")
+
+
+def test_ascii_response_is_byte_identical_to_flask_default():
+    value = {"b": [date(2026, 7, 1), Decimal("12.30")], "a": ROWS[0]["created_at"]}
+    bodies = []
+    for provider_class in (DefaultJSONProvider, OrjsonProvider):
+        app = _app(provider_class)
+        with app.app_context():
+            bodies.append(app.json.response(value).data)
+    assert bodies[0] == bodies[1] == (
+        b'{"a":"Sat, 02 May 2026 01:30:15 GMT","b":["Wed, 01 Jul 2026 00:00:00 GMT","12.30"]}\n'
+    )
+
+
+def test_debug_responses_are_indented():
+    app = _app(OrjsonProvider)
+    app.debug = True
+    assert b'\n  "status": "error"' in app.test_client().get("/errors").data
+
+
+def test_request_bodies_are_parsed():
+    app = _app(OrjsonProvider)
+
+    @app.post("/echo")
+    def echo():
+        return jsonify(request_json=app.json.loads(b'{"gig_id": 1}'))
+
+    assert app.test_client().post("/echo").get_json() == {"request_json": {"gig_id": 1}}
+
+
+def test_default_provider_can_be_selected(monkeypatch):
+    monkeypatch.setenv("JSON_PROVIDER", "default")
+    app = Flask(__name__)
+    json_provider.init_app(app)
+    assert type(app.json) is StdlibProvider
+
+    monkeypatch.delenv("JSON_PROVIDER")
+    json_provider.init_app(app)
+    assert isinstance(app.json, OrjsonProvider)
+
+
+def test_stdlib_provider_is_used_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_provider, "orjson", None)
+    app = Flask(__name__)
+    json_provider.init_app(app)
+    assert type(app.json) is StdlibProvider
+
+
+def test_stdlib_provider_encodes_records_without_asdict(monkeypatch):
+    def asdict(obj):
+        raise AssertionError("records should not be deep-copied")
+
+    monkeypatch.setattr(json_provider.dataclasses, "asdict", asdict)
+    records = to_records([(7, date(2026, 7, 1), Decimal("150.00"))], ("gig_id", "gig_date", "pay_amount"))
+    app = _app(StdlibProvider)
+    with app.app_context():
+        body = app.json.response(records).data
+    assert body == b'[{"gig_date":"Wed, 01 Jul 2026 00:00:00 GMT","gig_id":7,"pay_amount":"150.00"}]\n'
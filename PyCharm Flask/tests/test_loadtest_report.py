@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.loadtest import report, traffic
+
+
+def make_result(**endpoints):
+    recorder = traffic.Recorder()
+    recorder.recording = True
+    for label, (latencies_ms, errors) in endpoints.items():
+        for i, ms in enumerate(latencies_ms):
+            recorder.add(label, ms / 1000, i >= errors)
+    return report.summarize(recorder, elapsed=10.0)
+
+
+def test_summarize_reports_percentiles_per_endpoint():
+    result = make_result(**{"GET /gigs/feed": (list(range(1, 101)), 0), "POST /users/login": ([250.0] * 10, 2)})
+
+    feed = result["endpoints"]["GET /gigs/feed"]
+    assert feed["requests"] == 100
+    assert feed["rps"] == 10.0
+    assert (feed["p50_ms"], feed["p95_ms"], feed["p99_ms"], feed["max_ms"]) == (51.0, 96.0, 100.0, 100.0)
+    assert result["endpoints"]["POST /users/login"]["errors"] == 2
+    assert result["total"]["requests"] == 110
+    assert result["total"]["errors"] == 2
+
+
+def test_compare_flags_slower_endpoints_but_not_noise():
+    baseline = make_result(**{"GET /gigs/feed": ([10.0] * 100, 0), "GET /meta": ([1.0] * 100, 0)})
+    current = make_result(**{"GET /gigs/feed": ([10.0] * 90 + [30.0] * 10, 0), "GET /meta": ([2.5] * 100, 0)})
+
+    rows, regressions = report.compare(baseline, current, threshold=10, min_ms=2)
+
+    # /meta is 150% slower, but only by 1.5ms.
+    assert [r for r in regressions if not r.startswith("TOTAL")] == [
+        "GET /gigs/feed: p95_ms 10.0 -> 30.0",
+        "GET /gigs/feed: p99_ms 10.0 -> 30.0",
+    ]
+    assert "GET /gigs/feed" in report.format_comparison(rows)
+
+
+def test_compare_flags_lost_throughput_and_new_errors():
+    baseline = make_result(**{"POST /applications/": ([5.0] * 100, 0)})
+    current = make_result(**{"POST /applications/": ([5.0] * 80, 3)})
+
+    _, regressions = report.compare(baseline, current, threshold=10)
+
+    assert regressions == [
+        "POST /applications/: rps 10.0 -> 8.0",
+        "POST /applications/: errors 0 -> 3",
+        "TOTAL: rps 10.0 -> 8.0",
+        "TOTAL: errors 0 -> 3",
+    ]
+
+
+def test_compare_notes_endpoints_in_only_one_run():
+    baseline = make_result(**{"GET /gigs/": ([5.0], 0)})
+    current = make_result(**{"GET /gigs/feed": ([5.0], 0)})
+
+    rows, regressions = report.compare(baseline, current)
+
+    assert [row.get("note") for row in rows] == ["only in baseline", "new", None]
+    assert regressions == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("login", {"login": 1}),
+    ("dashboard=70, login=30", {"dashboard": 70.0, "login": 30.0}),
+])
+def test_parse_mix(text, expected):
+    assert traffic.parse_mix(text) == expected
+
+
+@pytest.mark.parametrize("text", ["browse=1", "login=fast", "login=0"])
+def test_parse_mix_rejects_bad_mixes(text):
+    with pytest.raises(ValueError):
+        traffic.parse_mix(text)
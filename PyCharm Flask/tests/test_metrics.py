@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from db import db_pool
+from db.db_pool import ConnectionPool
+from resources import metrics, passwords
+from resources.metrics import Counter, Gauge, Histogram, render
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(metrics, "REGISTRY", [])
+    return metrics.REGISTRY
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    metrics.init_app(app)
+    app.register_blueprint(metrics.metrics, url_prefix="/metrics")
+
+    @app.get("/gigs/<int:gig_id>")
+    def get_gig(gig_id):
+        return {"gig_id": gig_id}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def test_counter_adds_up_stripes_across_threads(registry):
+    counter = Counter("jobs_total", "Jobs.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counter.value("a") == 8000
+
+
+def test_text_exposition(registry):
+    counter = Counter("jobs_total", "Jobs done.", ("kind",))
+    gauge = Gauge("queue_depth", "Queued jobs.")
+    histogram = Histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1))
+    counter.inc('say "hi"', amount=2)
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(3, "a")
+
+    assert render() == (
+        "# HELP jobs_total Jobs done.\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{kind="say \\"hi\\""} 2\n'
+        "# HELP queue_depth Queued jobs.\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 1\n"
+        "# HELP job_seconds Job time.\n"
+        "# TYPE job_seconds histogram\n"
+        'job_seconds_bucket{kind="a",le="0.1"} 1\n'
+        'job_seconds_bucket{kind="a",le="1"} 2\n'
+        'job_seconds_bucket{kind="a",le="+Inf"} 3\n'
+        'job_seconds_sum{kind="a"} 3.55\n'
+        'job_seconds_count{kind="a"} 3\n'
+    )
+
+
+def test_requests_are_timed_per_endpoint_and_status(app):
+    client = app.test_client()
+    before_ok = metrics.REQUEST_LATENCY.count("get_gig", "GET", "200")
+    before_missing = metrics.REQUEST_LATENCY.count("unmatched", "GET", "404")
+    before_error = metrics.REQUEST_LATENCY.count("boom", "GET", "500")
+
+    client.get("/gigs/1")
+    client.get("/nope")
+    assert client.get("/boom").status_code == 500
+
+    assert metrics.REQUEST_LATENCY.count("get_gig", "GET", "200") == before_ok + 1
+    assert metrics.REQUEST_LATENCY.count("unmatched", "GET", "404") == before_missing + 1
+    assert metrics.REQUEST_LATENCY.count("boom", "GET", "500") == before_error + 1
+    assert metrics.IN_FLIGHT.value("get_gig") == 0
+    assert metrics.IN_FLIGHT.value("boom") == 0
+
+
+def test_metrics_endpoint_reports_pool_gauges(app, monkeypatch):
+    class FakeConnection:
+        closed = 0
+
+    monkeypatch.setattr(db_pool, "pool", ConnectionPool(1, 4, connect=FakeConnection))
+    monkeypatch.setattr(db_pool, "replica_pool", None)
+    response = app.test_client().get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'db_pool_connections{pool="primary",state="size"} 1' in body
+    assert 'db_pool_max{pool="primary"} 4' in body
+    assert 'db_pool_waiting{pool="primary"} 0' in body
+    assert "http_request_duration_seconds_bucket" in body
+
+
+def test_metrics_token(app, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_bcrypt_calls_are_timed(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_WORKERS", 0)
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+    before = metrics.BCRYPT_DURATION.count("check")
+    password_hash = passwords.hash_password("pw")
+    passwords.check_password("pw", password_hash)
+    assert metrics.BCRYPT_DURATION.count("check") == before + 1
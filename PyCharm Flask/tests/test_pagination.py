@@ -0,0 +1,88 @@
+import base64
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask
+
+from resources.pagination import (
+    NEXT_CURSOR_HEADER,
+    PaginationError,
+    cursor_float,
+    cursor_int,
+    cursor_timestamp,
+    decode_cursor,
+    encode_cursor,
+    page_response,
+    page_size,
+    split_page,
+)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    token = encode_cursor(created_at, 42)
+    assert decode_cursor(token, cursor_timestamp, cursor_int) == [created_at, 42]
+
+
+def test_missing_cursor_is_none():
+    assert decode_cursor(None, cursor_timestamp, cursor_int) is None
+    assert decode_cursor("", cursor_timestamp, cursor_int) is None
+
+
+@pytest.mark.parametrize("token", [
+    "not-base64!",
+    encode_cursor(1, 2, 3),
+    encode_cursor("x"),
+    # Right length, wrong types: these would otherwise fail the ::timestamptz / ::bigint casts.
+    encode_cursor("x", "y"),
+    encode_cursor("2026-01-02T03:04:05+00:00", "42"),
+    encode_cursor("2026-01-02T03:04:05+00:00", 1.5),
+    encode_cursor("2026-01-02T03:04:05+00:00", True),
+    encode_cursor("2026-01-02T03:04:05+00:00", 2**63),
+    encode_cursor(1767323045, 42),
+])
+def test_invalid_cursor_raises(token):
+    with pytest.raises(PaginationError):
+        decode_cursor(token, cursor_timestamp, cursor_int)
+
+
+@pytest.mark.parametrize("raw", [b'["0.5", 1]', b'[NaN, 1]', b'[Infinity, 1]'])
+def test_invalid_rank_cursor_raises(raw):
+    token = base64.urlsafe_b64encode(raw).decode("ascii")
+    with pytest.raises(PaginationError):
+        decode_cursor(token, cursor_float, cursor_int)
+    assert decode_cursor(encode_cursor(0.5, 1), cursor_float, cursor_int) == [0.5, 1]
+
+
+def test_page_size_is_clamped():
+    app = Flask(__name__)
+    with app.test_request_context("/?limit=100000"):
+        assert page_size(maximum=200) == 200
+    with app.test_request_context("/?limit=0"):
+        assert page_size() == 1
+    with app.test_request_context("/"):
+        assert page_size(default=25) == 25
+    with app.test_request_context("/?limit=abc"):
+        with pytest.raises(PaginationError):
+            page_size()
+
+
+def test_page_response_sets_cursor_only_when_more_rows():
+    app = Flask(__name__)
+    rows = [{"id": 3}, {"id": 2}, {"id": 1}]
+    with app.app_context():
+        response, _ = page_response(rows, 2, lambda r: (r["id"],))
+        assert response.get_json() == rows[:2]
+        assert decode_cursor(response.headers[NEXT_CURSOR_HEADER], cursor_int) == [2]
+
+        response, _ = page_response(rows, 3, lambda r: (r["id"],))
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_split_page_returns_rows_and_cursor():
+    rows = [{"id": 3}, {"id": 2}, {"id": 1}]
+    page, cursor = split_page(rows, 2, lambda r: (r["id"],))
+    assert page == rows[:2]
+    assert decode_cursor(cursor, cursor_int) == [2]
+
+    assert split_page(rows, 3, lambda r: (r["id"],)) == (rows, None)
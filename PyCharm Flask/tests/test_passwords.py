@@ -0,0 +1,74 @@
+import threading
+import time
+
+import bcrypt
+import pytest
+
+from resources import passwords
+from resources.passwords import PasswordHashingBusy, check_password, hash_password, needs_rehash
+
+
+@pytest.fixture
+def inline(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(passwords, "BCRYPT_WORKERS", 0)
+
+
+@pytest.fixture
+def worker_pool(monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(passwords, "BCRYPT_WORKERS", 1)
+    monkeypatch.setattr(passwords, "BCRYPT_QUEUE", 0)
+    monkeypatch.setattr(passwords, "BCRYPT_TIMEOUT", 10)
+    passwords.shutdown()
+    yield
+    passwords.shutdown()
+
+
+def test_hash_and_check_inline(inline):
+    password_hash = hash_password("correct horse")
+    assert password_hash.startswith("$2b$04$")
+    assert check_password("correct horse", password_hash)
+    assert not check_password("wrong", password_hash)
+
+
+def test_hash_and_check_on_worker_pool(worker_pool):
+    password_hash = hash_password("correct horse")
+    assert check_password("correct horse", password_hash)
+    assert not check_password("wrong", password_hash)
+
+
+def test_needs_rehash_when_cost_changes(inline):
+    old = bcrypt.hashpw(b"pw", bcrypt.gensalt(5)).decode()
+    assert needs_rehash(old)
+    assert not needs_rehash(hash_password("pw"))
+    assert not needs_rehash("not a bcrypt hash")
+
+
+def test_full_queue_fails_fast(worker_pool):
+    passwords._run(time.sleep, 0)  # start the worker before timing anything
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        passwords._run(time.sleep, 0.5)
+
+    t = threading.Thread(target=slow)
+    t.start()
+    started.wait()
+    time.sleep(0.05)
+
+    began = time.monotonic()
+    with pytest.raises(PasswordHashingBusy):
+        passwords._run(time.sleep, 0)
+    assert time.monotonic() - began < 0.2
+    t.join()
+
+    # The slot is given back once the slow call finishes.
+    passwords._run(time.sleep, 0)
+
+
+def test_slow_call_times_out(worker_pool, monkeypatch):
+    monkeypatch.setattr(passwords, "BCRYPT_TIMEOUT", 0.1)
+    with pytest.raises(PasswordHashingBusy):
+        passwords._run(time.sleep, 1)
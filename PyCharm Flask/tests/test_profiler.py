@@ -0,0 +1,107 @@
+import json
+import time
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from db import instrumentation
+from db.instrumentation import current_queries
+from resources import admin, profiler
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiler, "PROFILE_SECRET", "s3cret")
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_N", 0)
+
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-that-is-long-enough"
+    JWTManager(app)
+    instrumentation.init_app(app)
+    profiler.init_app(app)
+
+    @app.get("/applications/<int:application_id>")
+    def get_application(application_id):
+        queries = current_queries.get()
+        for _ in range(2):
+            started = time.perf_counter()
+            time.sleep(0.005)
+            queries.record("SELECT * FROM applications WHERE application_id = %s", started,
+                           time.perf_counter() - started, 1)
+        return {"application_id": application_id}
+
+    return app
+
+
+def _files(tmp_path):
+    return sorted(path.name.split(".", 1)[1] for path in tmp_path.iterdir())
+
+
+def test_unprofiled_requests_write_nothing(app, tmp_path):
+    response = app.test_client().get("/applications/12")
+    assert profiler.PROFILE_ID_HEADER not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_signed_request_writes_folded_stacks_and_sql_timeline(app, tmp_path):
+    signature = profiler.sign("GET", "/applications/12")
+    response = app.test_client().get("/applications/12", headers={profiler.SIGNATURE_HEADER: signature})
+    profile_id = response.headers[profiler.PROFILE_ID_HEADER]
+    assert "get_application" in profile_id
+    assert _files(tmp_path) == ["folded", "sql.json"]
+
+    folded = (tmp_path / f"{profile_id}.folded").read_text()
+    assert "get_application (" in folded
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+    timeline = json.loads((tmp_path / f"{profile_id}.sql.json").read_text())
+    assert timeline["request"] == "GET /applications/12"
+    assert timeline["query_count"] == 2
+    assert timeline["repeated"] == {"SELECT * FROM applications WHERE application_id = ?": 2}
+    assert timeline["queries"][1]["start_ms"] >= timeline["queries"][0]["start_ms"]
+
+
+@pytest.mark.parametrize("signature", [
+    profiler.sign("GET", "/applications/99", secret="s3cret"),
+    profiler.sign("GET", "/applications/12", secret="wrong"),
+    profiler.sign("GET", "/applications/12", ttl=-5, secret="s3cret"),
+    "garbage",
+])
+def test_bad_signatures_are_ignored(app, tmp_path, signature):
+    response = app.test_client().get("/applications/12", headers={profiler.SIGNATURE_HEADER: signature})
+    assert profiler.PROFILE_ID_HEADER not in response.headers
+
+
+def test_query_flag_is_admin_only(app, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_USER_IDS", {"1"})
+    with app.app_context():
+        admin_token = create_access_token("1")
+        other = create_access_token("2")
+    client = app.test_client()
+
+    def profiled(token, query="?profile=1"):
+        response = client.get(f"/applications/12{query}", headers={"Authorization": f"Bearer {token}"})
+        return profiler.PROFILE_ID_HEADER in response.headers
+
+    assert profiled(admin_token)
+    assert not profiled(admin_token, query="")
+    assert not profiled(other)
+
+
+def test_sampling_and_cprofile_mode(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_N", 1)
+    monkeypatch.setattr(profiler, "PROFILE_MODE", "cprofile")
+    response = app.test_client().get("/applications/12")
+    assert profiler.PROFILE_ID_HEADER in response.headers
+    assert _files(tmp_path) == ["prof", "sql.json"]
+
+
+def test_only_one_request_is_profiled_at_a_time(app, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_N", 1)
+    with profiler._busy:
+        response = app.test_client().get("/applications/12")
+    assert profiler.PROFILE_ID_HEADER not in response.headers
+    assert profiler.PROFILE_ID_HEADER in app.test_client().get("/applications/12").headers
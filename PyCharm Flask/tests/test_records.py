@@ -0,0 +1,81 @@
+import json
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+
+from db.records import fetch_records, record_type, to_records
+from resources.json_provider import OrjsonProvider, StdlibProvider
+from resources.pagination import split_page
+
+Column = namedtuple("Column", "name")
+
+COLUMNS = ("gig_id", "gig_name", "gig_date", "created_at", "pay_amount", "posted_by_user_id")
+ROWS = [
+    (2, "Showcase", date(2026, 7, 1), datetime(2026, 5, 2, 1, 30, tzinfo=timezone.utc), Decimal("150.00"), None),
+    (1, "Café", None, datetime(2026, 5, 1, tzinfo=timezone.utc), Decimal("0.50"), 11),
+]
+
+
+class FakeCursor:
+    description = [Column(name) for name in COLUMNS]
+
+    def fetchall(self):
+        return list(ROWS)
+
+
+def _dict_rows():
+    rows = []
+    for values in ROWS:
+        row = RealDictRow()
+        row.update(zip(COLUMNS, values))
+        rows.append(row)
+    return rows
+
+
+def test_records_read_like_rows():
+    record = fetch_records(FakeCursor())[0]
+    assert record["gig_name"] == record.gig_name == "Showcase"
+    assert dict(record) == _dict_rows()[0]
+    with pytest.raises(KeyError):
+        record["missing"]
+
+
+def test_record_types_are_made_once_per_column_list():
+    assert record_type(COLUMNS) is type(fetch_records(FakeCursor())[0])
+
+
+def test_to_records_picks_fields_from_wider_rows():
+    records = to_records(ROWS, COLUMNS, ("gig_id", "created_at"))
+    assert [dict(r) for r in records] == [
+        {"gig_id": 2, "created_at": ROWS[0][3]},
+        {"gig_id": 1, "created_at": ROWS[1][3]},
+    ]
+    assert [r.gig_id for r in to_records(ROWS, COLUMNS, ("gig_id",))] == [2, 1]
+
+
+def test_unusable_columns_are_rejected():
+    with pytest.raises(ValueError):
+        record_type(("gig_id", "gig_id"))
+    with pytest.raises(ValueError):
+        record_type(("?column?",))
+
+
+@pytest.mark.parametrize("provider_class", [DefaultJSONProvider, StdlibProvider, OrjsonProvider])
+def test_records_serialize_like_dict_rows(provider_class):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    with app.app_context():
+        records = jsonify(fetch_records(FakeCursor())).data
+        dicts = jsonify(_dict_rows()).data
+    assert json.loads(records) == json.loads(dicts)
+
+
+def test_records_work_with_keyset_pages():
+    page, cursor = split_page(fetch_records(FakeCursor()), 1, lambda r: (r["created_at"], r["gig_id"]))
+    assert [r.gig_id for r in page] == [2]
+    assert cursor
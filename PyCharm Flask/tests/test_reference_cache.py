@@ -0,0 +1,132 @@
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from resources import metrics, reference_cache
+from resources.application_status import application_status
+from resources.meta import meta
+from resources.reference_cache import Snapshot, reference_response
+
+DATA = {
+    "roles": ["choreographer", "dancer", "employer"],
+    "skills": ["ballet", "jazz"],
+    "event_types": ["wedding"],
+    "member_types": ["owner"],
+    "application_status": [{"status": "applied"}],
+}
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    def fake_load():
+        calls.append(1)
+        return Snapshot(dict(DATA))
+
+    monkeypatch.setattr(reference_cache, "_load", fake_load)
+    reference_cache.invalidate()
+    yield calls
+    reference_cache.invalidate()
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.add_url_rule("/roles/", "roles", lambda: reference_response("roles"))
+    return app.test_client()
+
+
+def test_serves_snapshot_with_etag_and_cache_control(loads, client):
+    response = client.get("/roles/")
+    assert response.status_code == 200
+    assert response.get_json() == DATA["roles"]
+    assert response.headers["ETag"].startswith('"')
+    assert "max-age=" in response.headers["Cache-Control"]
+    assert "public" in response.headers["Cache-Control"]
+
+
+def test_matching_if_none_match_gets_304(loads, client):
+    etag = client.get("/roles/").headers["ETag"]
+    response = client.get("/roles/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    response = client.get("/roles/", headers={"If-None-Match": '"something-else"'})
+    assert response.status_code == 200
+
+
+def test_snapshot_is_loaded_once_until_ttl_or_invalidate(loads, client, monkeypatch):
+    client.get("/roles/")
+    client.get("/roles/")
+    assert len(loads) == 1
+
+    reference_cache.invalidate()
+    client.get("/roles/")
+    assert len(loads) == 2
+
+    monkeypatch.setattr(reference_cache, "REFERENCE_CACHE_TTL", -1)
+    client.get("/roles/")
+    assert len(loads) == 3
+
+
+def test_failed_reload_keeps_serving_previous_snapshot(loads, client, monkeypatch):
+    client.get("/roles/")
+
+    def broken_load():
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(reference_cache, "_load", broken_load)
+    monkeypatch.setattr(reference_cache, "REFERENCE_CACHE_TTL", -1)
+    response = client.get("/roles/")
+    assert response.status_code == 200
+    assert response.get_json() == DATA["roles"]
+
+
+def test_etag_changes_with_content():
+    first = Snapshot(dict(DATA))
+    second = Snapshot(dict(DATA, roles=["dancer"]))
+    assert first.etags["skills"] == second.etags["skills"]
+    assert first.etags["roles"] != second.etags["roles"]
+    assert first.version != second.version
+
+
+def test_meta_returns_everything_and_honours_version(loads):
+    app = Flask(__name__)
+    app.register_blueprint(meta, url_prefix="/meta")
+    client = app.test_client()
+
+    body = client.get("/meta").get_json()
+    assert body["roles"] == DATA["roles"]
+    assert body["application_status"] == DATA["application_status"]
+
+    version = body["version"]
+    assert client.get(f"/meta?version={version}").status_code == 304
+    assert client.get("/meta", headers={"If-None-Match": f'"{version}"'}).status_code == 304
+    assert client.get("/meta?version=stale").status_code == 200
+
+
+def test_hits_and_misses_are_counted(loads, client):
+    hits = metrics.CACHE_REQUESTS.value("reference", "hit")
+    misses = metrics.CACHE_REQUESTS.value("reference", "miss")
+    client.get("/roles/")
+    client.get("/roles/")
+    assert metrics.CACHE_REQUESTS.value("reference", "miss") == misses + 1
+    assert metrics.CACHE_REQUESTS.value("reference", "hit") == hits + 1
+
+
+@pytest.mark.parametrize("statuses, status_code", [([], 400), (DATA["application_status"], 200)])
+def test_application_status_is_a_400_while_the_table_is_empty(monkeypatch, statuses, status_code):
+    monkeypatch.setattr(reference_cache, "_load", lambda: Snapshot(dict(DATA, application_status=statuses)))
+    reference_cache.invalidate()
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-enough-bytes"
+    JWTManager(app)
+    app.register_blueprint(application_status, url_prefix="/application-status")
+    with app.app_context():
+        token = create_access_token(identity="7")
+
+    response = app.test_client().get("/application-status/", headers={"Authorization": f"Bearer {token}"})
+    reference_cache.invalidate()
+
+    assert response.status_code == status_code
@@ -0,0 +1,73 @@
+import pytest
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+
+from db import db_pool, routing
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("DB_REPLICA_HOST", "replica")
+    monkeypatch.setenv("DB_REPLICA_STICKY_SECONDS", "5")
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-enough-bytes"
+    JWTManager(app)
+    routing.init_app(app)
+
+    @app.post("/gigs")
+    @jwt_required()
+    def create():
+        return jsonify(ok=True), 201
+
+    @app.post("/fails")
+    @jwt_required()
+    def fails():
+        return jsonify(ok=False), 400
+
+    @app.get("/gigs")
+    @jwt_required()
+    def read():
+        return jsonify(replica=db_pool.replica_allowed.get()())
+
+    return app
+
+
+def _auth(app, identity):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity=identity)}"}
+
+
+def test_reads_after_a_write_stay_on_the_primary(app):
+    client = app.test_client()
+    headers = _auth(app, "7")
+
+    assert client.get("/gigs", headers=headers).json == {"replica": True}
+    response = client.post("/gigs", headers=headers)
+    assert routing.STICKY_COOKIE in response.headers["Set-Cookie"]
+
+    # A fresh client with just the cookie stands in for a request on another worker.
+    other_worker = app.test_client()
+    other_worker.set_cookie(routing.STICKY_COOKIE, client.get_cookie(routing.STICKY_COOKIE).value)
+    assert other_worker.get("/gigs", headers=headers).json == {"replica": False}
+
+
+def test_sticky_cookie_is_bound_to_the_user(app):
+    client = app.test_client()
+    client.post("/gigs", headers=_auth(app, "7"))
+
+    assert client.get("/gigs", headers=_auth(app, "8")).json == {"replica": True}
+
+
+def test_failed_writes_and_expired_or_forged_cookies_use_the_replica(app):
+    client = app.test_client()
+    headers = _auth(app, "7")
+    response = client.post("/fails", headers=headers)
+    assert "Set-Cookie" not in response.headers
+    assert client.get("/gigs", headers=headers).json == {"replica": True}
+
+    client.set_cookie(routing.STICKY_COOKIE, "7.forged.signature")
+    assert client.get("/gigs", headers=headers).json == {"replica": True}
+
+    client.post("/gigs", headers=headers)
+    app.config["DB_REPLICA_STICKY_SECONDS"] = -1
+    assert client.get("/gigs", headers=headers).json == {"replica": True}
@@ -0,0 +1,218 @@
+import json
+import time
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from db import db_pool, instrumentation, slow_queries
+from db.instrumentation import _Instrumented
+from resources import admin
+
+
+class FakeBaseCursor:
+    rowcount = -1
+
+    def __init__(self, connection=None):
+        self.connection = connection
+
+    def execute(self, query, vars=None):
+        if "slow" in query:
+            time.sleep(0.02)
+        self.rowcount = 1
+
+    def mogrify(self, query, vars=None):
+        if vars is None:
+            return query.encode()
+        return (query % tuple(repr(v) for v in vars)).encode()
+
+
+class FakeCursor(_Instrumented, FakeBaseCursor):
+    pass
+
+
+class ExplainCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, vars=None):
+        self.connection.executed.append(query)
+
+    def fetchall(self):
+        return [("Seq Scan on gigs",), ("  Buffers: shared hit=4",)]
+
+
+class ExplainConnection:
+    closed = 0
+
+    def __init__(self):
+        self.executed = []
+        self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None):
+        return ExplainCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = []
+
+    def connect(self):
+        connection = ExplainConnection()
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def slow_log(monkeypatch, tmp_path):
+    path = tmp_path / "slow.log"
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 10.0)
+    monkeypatch.setattr(slow_queries, "SLOW_LOG", str(path))
+    monkeypatch.setattr(slow_queries, "_file_log", None)
+    monkeypatch.setattr(slow_queries, "EXPLAINS_PER_MINUTE", 6)
+    monkeypatch.setattr(slow_queries, "EXPLAIN_COOLDOWN", 300.0)
+    slow_queries.reset()
+    yield path
+    slow_queries._jobs.join()
+    slow_queries.reset()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(db_pool, "pool", pool)
+    monkeypatch.setattr(db_pool, "replica_pool", None)
+    return pool
+
+
+def entries(path):
+    slow_queries._jobs.join()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_only_statements_over_the_threshold_are_logged(slow_log, pool):
+    cursor = FakeCursor()
+    cursor.execute("SELECT * FROM gigs WHERE gig_id = %s", (1,))
+    cursor.execute("SELECT * FROM gigs WHERE slow AND gig_id = %s", (2,))
+
+    [entry] = entries(slow_log)
+    assert entry["fingerprint"] == "SELECT * FROM gigs WHERE slow AND gig_id = ?"
+    assert entry["sql"] == "SELECT * FROM gigs WHERE slow AND gig_id = 2"
+    assert entry["params"] == [2]
+    assert entry["duration_ms"] >= 10
+    assert entry["plan"] == "Seq Scan on gigs\n  Buffers: shared hit=4"
+
+
+def test_reads_get_explain_analyze_in_a_rolled_back_transaction(slow_log, pool):
+    FakeCursor().execute("SELECT * FROM gigs WHERE slow AND gig_id = %s", (2,))
+    entries(slow_log)
+
+    [connection] = pool.connections
+    assert connection.executed[-1] == "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM gigs WHERE slow AND gig_id = 2"
+    assert "statement_timeout" in connection.executed[0]
+    assert connection.rollbacks == 1
+
+
+@pytest.mark.parametrize("sql", [
+    "UPDATE gigs SET title = 'x' WHERE slow",
+    "SELECT * FROM gigs WHERE slow FOR UPDATE",
+    "WITH moved AS (DELETE FROM gigs WHERE slow RETURNING *) SELECT * FROM moved",
+    "SELECT nextval(pg_get_serial_sequence('gigs', 'gig_id')) FROM generate_series(1, 100) WHERE slow",
+    "SELECT setval('gigs_gig_id_seq', 10) WHERE slow",
+    "SELECT pg_advisory_lock(1) WHERE slow",
+])
+def test_writes_are_explained_without_running_them(slow_log, pool, sql):
+    FakeCursor().execute(sql)
+    entries(slow_log)
+
+    assert pool.connections[0].executed[-1] == f"EXPLAIN (COSTS) {sql}"
+
+
+def test_password_statements_are_redacted_and_not_explained(slow_log, pool):
+    FakeCursor().execute("SELECT user_id FROM users WHERE slow AND password = %s", ("hunter2",))
+
+    [entry] = entries(slow_log)
+    assert entry["params"] == "[redacted]"
+    assert "hunter2" not in entry["sql"]
+    assert entry["plan"] is None
+    assert pool.connections == []
+
+
+def test_explains_are_rate_limited(slow_log, pool, monkeypatch):
+    monkeypatch.setattr(slow_queries, "EXPLAINS_PER_MINUTE", 2)
+    cursor = FakeCursor()
+    for table in ("gigs", "gigs", "employers", "users"):
+        cursor.execute(f"SELECT * FROM {table} WHERE slow")
+
+    logged = entries(slow_log)
+    assert len(logged) == 4
+    planned = [entry["fingerprint"] for entry in logged if entry["plan"]]
+    # The second gigs query is inside its cooldown, and users is past the per-minute cap.
+    assert sorted(planned) == ["SELECT * FROM employers WHERE slow", "SELECT * FROM gigs WHERE slow"]
+
+
+def test_summary_groups_by_fingerprint(slow_log, pool):
+    cursor = FakeCursor()
+    for gig_id in (1, 2, 3):
+        cursor.execute("SELECT * FROM gigs WHERE slow AND gig_id = %s", (gig_id,))
+    cursor.execute("SELECT * FROM employers WHERE slow")
+    entries(slow_log)
+
+    first, second = slow_queries.summary()
+    assert first["fingerprint"] == "SELECT * FROM gigs WHERE slow AND gig_id = ?"
+    assert first["count"] == 3
+    assert first["max_ms"] >= first["mean_ms"] >= 10
+    assert first["last_plan"].startswith("Seq Scan")
+    assert second["count"] == 1
+
+
+def test_nothing_is_captured_when_disabled(slow_log, pool, monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 0.0)
+    FakeCursor().execute("SELECT * FROM gigs WHERE slow")
+
+    assert not slow_log.exists()
+    assert slow_queries.summary() == []
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_USER_IDS", {"1"})
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-enough-bytes"
+    JWTManager(app)
+    app.register_blueprint(admin.admin, url_prefix="/admin")
+    with app.app_context():
+        tokens = {user_id: create_access_token(identity=user_id) for user_id in ("1", "2")}
+    return app.test_client(), tokens
+
+
+def test_slow_query_summary_is_admin_only(slow_log, pool, client):
+    client, tokens = client
+    FakeCursor().execute("SELECT * FROM gigs WHERE slow")
+    entries(slow_log)
+
+    assert client.get("/admin/slow-queries").status_code == 401
+    forbidden = client.get("/admin/slow-queries", headers={"Authorization": f"Bearer {tokens['2']}"})
+    assert forbidden.status_code == 403
+
+    response = client.get("/admin/slow-queries", headers={"Authorization": f"Bearer {tokens['1']}"})
+    assert response.status_code == 200
+    assert response.json["threshold_ms"] == 10.0
+    assert [row["fingerprint"] for row in response.json["queries"]] == ["SELECT * FROM gigs WHERE slow"]
+
+
+def test_slow_query_summary_is_disabled_without_instrumented_cursors(slow_log, client, monkeypatch):
+    client, tokens = client
+    monkeypatch.setattr(instrumentation, "INSTRUMENT_QUERIES", False)
+
+    response = client.get("/admin/slow-queries", headers={"Authorization": f"Bearer {tokens['1']}"})
+    assert response.json["enabled"] is False
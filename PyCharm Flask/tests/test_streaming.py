@@ -0,0 +1,183 @@
+import json
+from collections import namedtuple
+from datetime import date
+
+import pytest
+from flask import Flask, request
+
+from db import db_pool
+from db.db_pool import ConnectionPool
+from db.streaming import RowStream
+from resources.json_provider import OrjsonProvider
+from resources.pagination import PaginationError
+from resources.streaming import stream_format, stream_limit, stream_response
+
+Column = namedtuple("Column", "name")
+
+ROWS = [(i, f"Studio {i}", date(2026, 1, 1 + i)) for i in range(7)]
+
+
+class FakeInfo:
+    transaction_status = 0  # TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, rows, fail_after=None):
+        self.rows = list(rows)
+        self.fail_after = fail_after
+        self.description = None
+        self.closed = False
+        self.fetches = []
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+
+    def fetchmany(self, size):
+        if self.fail_after is not None and len(self.fetches) >= self.fail_after:
+            raise RuntimeError("connection lost")
+        self.description = [Column("employer_id"), Column("employer_name"), Column("created_at")]
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.fetches.append(len(batch))
+        return batch
+
+    def fetchone(self):
+        return {"gig_id": 1}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    rows = ROWS
+    fail_after = None
+
+    def __init__(self):
+        self.closed = 0
+        self.info = FakeInfo()
+        self.commits = 0
+        self.rollbacks = 0
+        self.named = []
+
+    def cursor(self, name=None, cursor_factory=None):
+        cursor = FakeCursor(self.rows if name else [], self.fail_after)
+        if name:
+            self.named.append(cursor)
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ConnectionPool(0, 2, connect=FakeConnection, timeout=0.2)
+    monkeypatch.setattr(db_pool, "pool", pool)
+    monkeypatch.delenv("DB_REPLICA_HOST", raising=False)
+    return pool
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+
+    @app.get("/employers")
+    def employers():
+        with RowStream(readonly=True, batch_size=3) as stream:
+            stream.execute("SELECT ...")
+        return stream_response(stream, stream_format())
+
+    @app.get("/applicants")
+    def applicants():
+        with RowStream(readonly=True, batch_size=3) as stream:
+            stream.cursor().fetchone()
+            if request.args.get("deny"):
+                return {"error": "not authorized"}, 403
+            stream.execute("SELECT ...")
+        return stream_response(stream, stream_format(), envelope={"gig": {"gig_id": 1}, "counts": {"total": 7}},
+                               key="applicants")
+
+    return app
+
+
+def _expected():
+    return [{"employer_id": i, "employer_name": name, "created_at": day.strftime("%a, %d %b %Y 00:00:00 GMT")}
+            for i, name, day in ROWS]
+
+
+def test_json_stream_is_the_same_array_sent_in_batches(pool, app):
+    response = app.test_client().get("/employers?stream=json")
+    assert response.mimetype == "application/json"
+    assert json.loads(response.data) == _expected()
+    assert pool.stats()["in_use"] == 0
+    conn = pool.getconn()
+    assert conn.named[0].fetches == [3, 3, 1]
+    assert conn.commits == 1
+
+
+def test_ndjson_stream_has_one_row_per_line(pool, app):
+    response = app.test_client().get("/employers", headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in response.data.splitlines()] == _expected()
+
+
+def test_envelope_keeps_buffered_shape(pool, app):
+    body = json.loads(app.test_client().get("/applicants?stream=json").data)
+    assert body == {"gig": {"gig_id": 1}, "counts": {"total": 7}, "applicants": _expected()}
+
+    lines = app.test_client().get("/applicants?stream=ndjson").data.splitlines()
+    assert json.loads(lines[0]) == {"gig": {"gig_id": 1}, "counts": {"total": 7}}
+    assert [json.loads(line) for line in lines[1:]] == _expected()
+
+
+def test_empty_result(pool, app, monkeypatch):
+    monkeypatch.setattr(FakeConnection, "rows", [])
+    assert app.test_client().get("/employers?stream=json").data == b"[]\n"
+    assert app.test_client().get("/employers?stream=ndjson").data == b""
+    assert pool.stats()["in_use"] == 0
+
+
+def test_leaving_before_execute_releases_connection(pool, app):
+    response = app.test_client().get("/applicants?stream=json&deny=1")
+    assert response.status_code == 403
+    assert pool.stats()["in_use"] == 0
+
+
+def test_unread_response_releases_connection(pool, app):
+    with app.test_request_context("/employers?stream=json"):
+        response = app.view_functions["employers"]()
+        assert pool.stats()["in_use"] == 1
+        response.close()
+    assert pool.stats()["in_use"] == 0
+
+
+def test_error_mid_stream_rolls_back_and_releases(pool, app, monkeypatch):
+    monkeypatch.setattr(FakeConnection, "fail_after", 1)
+    with app.test_request_context("/employers?stream=ndjson"):
+        response = app.view_functions["employers"]()
+        with pytest.raises(RuntimeError):
+            list(response.response)
+    assert pool.stats()["in_use"] == 0
+    conn = pool.getconn()
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_stream_limit_is_not_clamped_to_a_page():
+    app = Flask(__name__)
+    with app.test_request_context("/?limit=5000"):
+        assert stream_limit() == 5000
+    with app.test_request_context("/"):
+        assert stream_limit() is None
+
+
+@pytest.mark.parametrize("limit", ["0", "-3", "many"])
+def test_stream_limit_rejects_bad_values(limit):
+    with Flask(__name__).test_request_context(f"/?limit={limit}"):
+        with pytest.raises(PaginationError):
+            stream_limit()
@@ -0,0 +1,147 @@
+from datetime import date
+
+import psycopg2
+import pytest
+
+from db import db_pool
+from resources import users as users_module
+from resources.users import MAX_PUBLIC_PROFILES, users
+
+
+@pytest.fixture
+def transaction_modules():
+    # with_cursor looks transaction up in db_pool when the view runs.
+    return [users_module, db_pool]
+
+
+@pytest.fixture
+def blueprint():
+    return users, "/users"
+
+
+def _profile_row(user_id, media=None):
+    return {"user_id": user_id, "user_name": f"User {user_id}", "email": f"u{user_id}@example.com",
+            "dob": date(2000, 1, 2), "roles": [{"role_name": "dancer"}], "skills": [], "media": media or {}}
+
+
+def test_public_profiles_are_keyed_by_user_id(cursor, client):
+    cursor.results = [[_profile_row(4), _profile_row(9)]]
+
+    response = client.get("/users/public?ids=9, 4,9,12")
+
+    assert response.status_code == 200
+    [(sql, params)] = cursor.executed
+    assert "u.user_id = ANY(%s)" in sql
+    # Duplicates are dropped, and the caller's id is what the access check joins on.
+    assert params == ([9, 4, 12], 7)
+    # 12 isn't visible to the caller, so it's left out rather than failing the request.
+    assert sorted(response.json) == ["4", "9"]
+    assert response.json["4"] == {
+        "user_id": 4, "name": "User 4", "email": "u4@example.com", "dob": "Sun, 02 Jan 2000 00:00:00 GMT",
+        "roles": [{"role_name": "dancer"}], "skills": [], "media": {},
+    }
+
+
+@pytest.mark.parametrize("ids", ["", " , ", "1,x", "1.5"])
+def test_public_profiles_need_integer_ids(cursor, client, ids):
+    response = client.get(f"/users/public?ids={ids}")
+
+    assert response.status_code == 400
+    assert cursor.executed == []
+
+
+def test_public_profiles_are_limited_per_request(cursor, client):
+    cursor.results = [[]]
+    at_limit = ",".join(str(i) for i in range(1, MAX_PUBLIC_PROFILES + 1))
+
+    assert client.get(f"/users/public?ids={at_limit}").status_code == 200
+    response = client.get(f"/users/public?ids={at_limit},{MAX_PUBLIC_PROFILES + 1}")
+
+    assert response.status_code == 400
+    assert len(cursor.executed) == 1
+
+
+def test_public_profiles_without_the_media_table(cursor, client):
+    cursor.results = [psycopg2.errors.UndefinedTable("relation \"user_media\" does not exist"), [_profile_row(4)]]
+
+    response = client.get("/users/public?ids=4")
+
+    assert response.status_code == 200
+    assert cursor.connection.rollbacks == 1
+    assert "user_media" not in cursor.executed[1][0]
+    assert response.json["4"]["media"] == {}
+
+
+def test_single_public_profile_is_403_when_not_visible(cursor, client):
+    cursor.results = [[]]
+
+    response = client.get("/users/12/public")
+
+    assert response.status_code == 403
+    assert cursor.executed[0][1] == ([12], 7)
+
+
+def test_single_public_profile_has_the_batch_shape(cursor, client):
+    cursor.results = [[_profile_row(4)]]
+
+    response = client.get("/users/4/public")
+
+    assert response.status_code == 200
+    assert response.json["name"] == "User 4"
+
+
+def _bootstrap_row(media):
+    return {"user_id": 7, "user_name": "Ana", "email": "ana@example.com", "dob": date(2000, 1, 2),
+            "password": "never sent", "roles": [{"role_name": "dancer"}], "skills": [{"skill_name": "salsa"}],
+            "media": media, "employers": [{"employer_id": 3, "employer_role": "owner"}]}
+
+
+def test_bootstrap_combines_the_dashboard_calls(cursor, client):
+    photo = {"kind": "profile_photo", "secure_url": "https://example.com/p.jpg",
+             "created_at": "2025-03-01T12:30:00+00:00"}
+    cursor.results = [[_bootstrap_row({"profile_photo": photo})]]
+
+    response = client.get("/users/me/bootstrap")
+
+    assert response.status_code == 200
+    assert cursor.executed[0][1] == (7,)
+    body = response.json
+    assert body["user"] == {"dob": "Sun, 02 Jan 2000 00:00:00 GMT", "email": "ana@example.com",
+                            "user_id": 7, "user_name": "Ana"}
+    assert body["roles"] == [{"role_name": "dancer"}]
+    assert body["skills"] == [{"skill_name": "salsa"}]
+    assert body["employers"] == [{"employer_id": 3, "employer_role": "owner"}]
+    # Kinds without an upload are still present, and the JSON timestamp is parsed back
+    # so it's rendered like GET /users/me/media renders it.
+    assert body["media"] == {
+        "profile_photo": {"kind": "profile_photo", "secure_url": "https://example.com/p.jpg",
+                          "created_at": "Sat, 01 Mar 2025 12:30:00 GMT"},
+        "resume": None,
+        "showreel": None,
+    }
+
+
+def test_bootstrap_ignores_unknown_media_kinds(cursor, client):
+    cursor.results = [[_bootstrap_row({"avatar": {"kind": "avatar", "created_at": "not a date"}})]]
+
+    response = client.get("/users/me/bootstrap")
+
+    assert response.json["media"] == {"profile_photo": None, "resume": None, "showreel": None}
+
+
+def test_bootstrap_without_the_media_table(cursor, client):
+    cursor.results = [psycopg2.errors.UndefinedTable("relation \"user_media\" does not exist"),
+                      [_bootstrap_row({})]]
+
+    response = client.get("/users/me/bootstrap")
+
+    assert response.status_code == 200
+    assert cursor.connection.rollbacks == 1
+    assert "user_media" not in cursor.executed[1][0]
+    assert response.json["media"] == {"profile_photo": None, "resume": None, "showreel": None}
+
+
+def test_bootstrap_for_a_deleted_user(cursor, client):
+    cursor.results = [[]]
+
+    assert client.get("/users/me/bootstrap").status_code == 401
@@ -1,7 +1,23 @@
-from flask import Flask
+import os
+import subprocess
+import sys
 
-from resources.validations.request import validate_json
-from resources.validations.schemas import UserLoginSchema
+import pytest
+from flask import Flask
+from marshmallow import EXCLUDE, INCLUDE, RAISE, ValidationError
+
+from resources.validations.request import get_loader, validate_json
+from resources.validations.schemas import (
+    ApplicationBulkStatusSchema,
+    ApplicationCreateSchema,
+    GigBulkCreateSchema,
+    GigCreateSchema,
+    GigRoleLookupSchema,
+    GigUpdateSchema,
+    UserLoginSchema,
+    UserRegisterSchema,
+    UserUpdateMeSchema,
+)
 
 
 def _app():
@@ -55,3 +71,56 @@ def test_valid_payload_returns_200():
     payload = res.get_json()
     assert payload["status"] == "ok"
     assert payload["data"]["email"] == "a@b.com"
+
+
+def test_schema_class_is_built_once_per_configuration():
+    assert get_loader(UserLoginSchema) is get_loader(UserLoginSchema)
+    assert get_loader(UserLoginSchema) is not get_loader(UserLoginSchema, partial=True)
+
+
+def test_validate_json_accepts_schema_class():
+    app = Flask(__name__)
+
+    @app.post("/apply")
+    def apply():
+        data, err, status = validate_json(ApplicationCreateSchema)
+        return (err, status) if err else ({"data": data}, 200)
+
+    client = app.test_client()
+    assert client.post("/apply", json={"gig_id": 3}).get_json() == {"data": {"gig_id": 3}}
+    assert client.post("/apply", json={"gig_id": "3"}).status_code == 422
+
+
+@pytest.mark.parametrize("schema_class, many, partial, unknown, payload", [
+    (UserRegisterSchema, False, False, RAISE, {"name": "A", "email": "a@b.com", "date_of_birth": "2000-01-31", "password": "longenough"}),
+    (UserRegisterSchema, False, False, RAISE, {"name": "", "email": "nope", "date_of_birth": "31/01/2000", "extra": 1}),
+    (UserUpdateMeSchema, False, True, RAISE, {"name": None}),
+    (GigCreateSchema, False, False, RAISE, {"gig_name": "Show", "gig_date": "2026-01-01", "employer_id": "1"}),
+    (GigUpdateSchema, False, True, INCLUDE, {"gig_details": "x", "extra": [1]}),
+    (GigUpdateSchema, False, True, EXCLUDE, {"gig_details": "x", "extra": [1]}),
+    (GigRoleLookupSchema, False, False, RAISE, {"gig_ids": [1, "2"]}),
+    (ApplicationCreateSchema, False, False, RAISE, ["not", "a", "dict"]),
+    (ApplicationBulkStatusSchema, True, False, RAISE, [{"application_id": 1, "status": "Accepted"}, {"status": ""}, 5]),
+    (ApplicationBulkStatusSchema, True, False, RAISE, {"application_id": 1}),
+    (GigBulkCreateSchema, True, False, RAISE, [{"gig_name": "Show", "gig_date": "2026-01-01", "gig_details": "d",
+                                              "type_name": "Concert", "employer_id": 1,
+                                              "roles": [{"role_name": "Dancer", "needed_count": 0}]}]),
+])
+def test_compiled_loader_matches_schema_load(schema_class, many, partial, unknown, payload):
+    def outcome(load):
+        try:
+            return "ok", load(payload)
+        except ValidationError as err:
+            return "error", err.messages, err.valid_data
+
+    slow = get_loader(schema_class, many=many, partial=partial, unknown=unknown, fast=False)
+    fast = get_loader(schema_class, many=many, partial=partial, unknown=unknown, fast=True)
+    assert outcome(fast) == outcome(slow)
+
+
+def test_importing_validation_does_not_load_the_db_pool():
+    code = "import sys, resources.validations.request; print('db.db_pool' in sys.modules)"
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
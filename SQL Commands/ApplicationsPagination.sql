@@ -0,0 +1,9 @@
+-- Indexes for the employer applicant listing (GET /applications/?gig_id=).
+-- Pages are ordered by (applied_at, application_id) DESC within a gig, and the
+-- per-status totals count applications of one gig grouped by status.
+
+CREATE INDEX IF NOT EXISTS idx_applications_gig_applied
+    ON applications (gig_id, applied_at DESC, application_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_applications_gig_status
+    ON applications (gig_id, status);
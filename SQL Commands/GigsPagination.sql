@@ -0,0 +1,16 @@
+-- Keyset pagination for GET /gigs/
+-- Pages are ordered by (created_at DESC, gig_id DESC), optionally filtered by one of
+-- employer_id / type_name / posted_by_user_id. Each index below matches one of
+-- those shapes so every page is a single index range scan, however deep the page.
+
+CREATE INDEX IF NOT EXISTS idx_gigs_created_at_gig_id
+  ON gigs(created_at DESC, gig_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_gigs_employer_created_at
+  ON gigs(employer_id, created_at DESC, gig_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_gigs_type_name_created_at
+  ON gigs(type_name, created_at DESC, gig_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_gigs_posted_by_created_at
+  ON gigs(posted_by_user_id, created_at DESC, gig_id DESC);
@@ -0,0 +1,13 @@
+-- Full-text search for GET /gigs/search
+-- search_vector is a generated column, so Postgres keeps it in sync on every
+-- INSERT/UPDATE. Name matches rank above event type, which ranks above details.
+
+ALTER TABLE gigs ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(gig_name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(type_name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(gig_details, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_gigs_search_vector
+  ON gigs USING GIN (search_vector);